@@ -0,0 +1,133 @@
+# ai_worker.py
+# Background AI inference with a per-frame deadline.
+#
+# The game loop submits the latest feature vector and waits for the answer,
+# but all the ticks of one rendered frame share a single wait budget set by
+# begin_frame(). Once it is spent (first-call graph tracing, GC, a slow
+# predict) the caller gets the last probability the model produced instead,
+# or None before the first one and falls back to the heuristic, so catch-up
+# ticks never stall rendering and input one deadline at a time.
+import threading
+import time
+
+
+class AIDecisionWorker:
+    """Runs predict(feats) -> probability on a daemon thread, latest request wins."""
+
+    def __init__(self, predict, name="ai-worker"):
+        self._predict = predict
+        self._cond = threading.Condition()
+        self._pending = None   # (seq, feats, submitted_at) waiting to be picked up
+        self._result = None    # (seq, prob) of the last finished request
+        self._last = None      # most recent probability the model produced
+        self._seq = 0
+        self._stopped = False
+        self._frame_deadline = None
+        # counters (read with stats())
+        self.submitted = 0
+        self.on_time = 0
+        self.reused = 0
+        self.fallbacks = 0
+        self.errors = 0
+        self.completed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, feats):
+        """Queue feats for inference, replacing any request not yet started."""
+        with self._cond:
+            self._seq += 1
+            self._pending = (self._seq, feats.copy(), time.perf_counter())
+            self.submitted += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def begin_frame(self, budget):
+        """Start a rendered frame: the waits until the next call share budget seconds."""
+        self._frame_deadline = time.perf_counter() + budget
+
+    def wait(self, seq, timeout=None):
+        """Return the probability for request seq, or the last one produced if it missed the deadline.
+
+        The deadline is the end of the frame budget, or timeout seconds from now
+        if that comes first; with neither, wait until the answer arrives.
+        """
+        deadline = self._frame_deadline
+        if timeout is not None:
+            deadline = min(deadline or float("inf"), time.perf_counter() + timeout)
+        with self._cond:
+            while self._result is None or self._result[0] != seq:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if self._stopped or (remaining is not None and remaining <= 0):
+                    return self._stale()
+                self._cond.wait(remaining)
+            prob = self._result[1]
+            if prob is None:
+                self.fallbacks += 1
+            else:
+                self.on_time += 1
+            return prob
+
+    def _stale(self):
+        # called with the lock held; the request stays queued and its answer serves later ticks
+        if self._last is None:
+            self.fallbacks += 1
+        else:
+            self.reused += 1
+        return self._last
+
+    def decide(self, feats, timeout=None):
+        """submit + wait in one call."""
+        return self.wait(self.submit(feats), timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                seq, feats, submitted_at = self._pending
+                self._pending = None
+            try:
+                prob = float(self._predict(feats))
+            except Exception as e:
+                prob = None
+                self.errors += 1
+                if self.errors == 1:
+                    print(f"Model runtime error: {e} — using heuristic AI for affected frames")
+            latency = time.perf_counter() - submitted_at
+            with self._cond:
+                self.completed += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                self._result = (seq, prob)
+                if prob is not None:
+                    self._last = prob
+                self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "on_time": self.on_time,
+            "reused": self.reused,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": self.fallbacks / self.submitted if self.submitted else 0.0,
+            "errors": self.errors,
+            "mean_latency_ms": 1000.0 * self.total_latency / self.completed if self.completed else 0.0,
+            "max_latency_ms": 1000.0 * self.max_latency,
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"AI worker: {s['submitted']} decisions, {s['reused']} reused, {s['fallbacks']} heuristic fallbacks "
+              f"({100.0 * s['fallback_rate']:.1f}%), {s['errors']} errors, "
+              f"latency mean {s['mean_latency_ms']:.2f} ms / max {s['max_latency_ms']:.2f} ms")
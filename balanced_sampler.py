@@ -0,0 +1,170 @@
+# balanced_sampler.py
+# Class-balanced minibatches for imitation training, without copying data.
+#
+# Recorded gameplay is ~96% "no jump" frames, so plain shuffled batches
+# spend most of every epoch on near-identical glide frames. A ClassIndex
+# holds the row numbers of each class (built once, in chunks, so it also
+# works on a memory-mapped .fcol dataset). BalancedBatchSampler shuffles
+# each class's rows once, in place, and fills every batch with a fixed share
+# per class, walking each shuffled list cyclically across epochs: minority
+# rows are revisited by index, never duplicated. The rows of a batch are
+# gathered from X only when the batch is produced.
+#
+# Sampling changes the class prior the model learns. prior_shift() is the
+# logit correction that brings its probabilities back to the natural class
+# mix, which the game's difficulty thresholds assume.
+import numpy as np
+
+from stream_train import CHUNK_ROWS, PREFETCH, _prefetch, iter_chunks, steps_for
+
+
+class ClassIndex:
+    """Row numbers per class: rows[offsets[k]:offsets[k + 1]] are the rows labelled classes[k]."""
+
+    def __init__(self, classes, offsets, rows):
+        self.classes = np.asarray(classes)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = rows
+
+    @property
+    def counts(self):
+        return np.diff(self.offsets)
+
+    @property
+    def total(self):
+        return int(self.offsets[-1])
+
+    def of(self, k):
+        """Rows of the k-th class (a view into the index)."""
+        return self.rows[self.offsets[k]:self.offsets[k + 1]]
+
+
+def build_class_index(y, select=None, chunk_rows=CHUNK_ROWS):
+    """Index the rows of y by label in one chunked pass.
+
+    select(start, stop) -> bool mask limits the index to some rows (e.g. the
+    training side of hash_split); by default every row is indexed.
+    """
+    parts = {}
+    for start, stop in iter_chunks(len(y), chunk_rows):
+        labels = np.asarray(y[start:stop])
+        rows = np.arange(start, stop, dtype=np.int64)
+        if select is not None:
+            keep = select(start, stop)
+            labels, rows = labels[keep], rows[keep]
+        for c in np.unique(labels):
+            parts.setdefault(int(c), []).append(rows[labels == c])
+    classes = sorted(parts)
+    if not classes:
+        raise ValueError("no rows to index")
+    dtype = np.int32 if len(y) < 2**31 else np.int64
+    chunks = [np.concatenate(parts[c]).astype(dtype) for c in classes]
+    offsets = np.concatenate([[0], np.cumsum([len(c) for c in chunks])])
+    return ClassIndex(classes, offsets, np.concatenate(chunks))
+
+
+def class_shares(counts, alpha=0.0):
+    """Fraction of each batch per class: counts ** alpha, normalized (0 = equal, 1 = natural mix)."""
+    w = np.asarray(counts, dtype=np.float64) ** alpha
+    return w / w.sum()
+
+
+class BalancedBatchSampler:
+    """Yields arrays of row numbers, one per minibatch, with a fixed share of rows per class.
+
+    Each class's rows are shuffled once (in place in the index) and then read
+    cyclically, so consecutive epochs continue where the last one stopped. An
+    epoch is steps_per_epoch batches, the same number of steps as a pass over
+    the unbalanced data.
+    """
+
+    def __init__(self, index, batch_size=64, alpha=0.0, seed=42, steps_per_epoch=None):
+        self.index = index
+        self.batch_size = int(batch_size)
+        self.shares = class_shares(index.counts, alpha)
+        self.steps_per_epoch = steps_per_epoch or steps_for(index.total, batch_size)
+        rng = np.random.default_rng(seed)
+        for k in range(len(index.classes)):
+            rng.shuffle(index.of(k))
+        self._pos = np.zeros(len(index.classes), dtype=np.int64)
+        self._carry = np.zeros(len(index.classes))
+
+    def _quotas(self):
+        # largest-remainder rounding; the leftover fractions carry into the next batch,
+        # so the shares hold exactly over a run of batches
+        exact = self.shares * self.batch_size + self._carry
+        quotas = np.floor(exact).astype(np.int64)
+        short = self.batch_size - int(quotas.sum())
+        if short > 0:
+            quotas[np.argsort(quotas - exact)[:short]] += 1
+        self._carry = exact - quotas
+        return quotas
+
+    def next_batch(self):
+        picks = []
+        for k, n in enumerate(self._quotas()):
+            if n == 0:
+                continue
+            rows = self.index.of(k)
+            taken = np.arange(self._pos[k], self._pos[k] + n) % len(rows)
+            self._pos[k] = (self._pos[k] + n) % len(rows)
+            picks.append(rows[taken])
+        # sorted rows read a memory-mapped dataset front to back; order within a batch doesn't matter
+        return np.sort(np.concatenate(picks))
+
+    def epoch(self):
+        for _ in range(self.steps_per_epoch):
+            yield self.next_batch()
+
+    def describe(self):
+        """One line per class: rows, batch share and how often each row is seen per epoch."""
+        draws = self.shares * self.batch_size * self.steps_per_epoch
+        return "\n".join(
+            f"  class {c}: {n} rows, {100 * share:.1f}% of each batch, {d / n:.2f} visits per row per epoch"
+            for c, n, share, d in zip(self.index.classes, self.index.counts, self.shares, draws))
+
+
+def _gather(X, y, sampler, mean, scale, epochs):
+    epoch = 0
+    while epochs is None or epoch < epochs:
+        for rows in sampler.epoch():
+            xb = np.asarray(X[rows], dtype=np.float32)
+            if mean is not None:
+                xb = (xb - mean) / scale
+            yield xb, np.asarray(y[rows], dtype=np.float32)
+        epoch += 1
+
+
+def balanced_batches(X, y, sampler, scaler=None, epochs=None, prefetch=PREFETCH):
+    """Yield (x, y) float32 minibatches drawn by sampler, forever unless epochs is set.
+
+    X may be a memory map; only the rows of the current batches are read.
+    scaler (a fitted StandardScaler) is applied per batch if given.
+    """
+    mean = scale = None
+    if scaler is not None:
+        mean, scale = scaler.mean_.astype(np.float32), scaler.scale_.astype(np.float32)
+    yield from _prefetch(_gather(X, y, sampler, mean, scale, epochs), prefetch)
+
+
+def prior_shift(counts, shares):
+    """Logit to add to a binary model trained at the sampled class mix to recover the natural one."""
+    natural = np.asarray(counts, dtype=np.float64) / np.sum(counts)
+    shares = np.asarray(shares, dtype=np.float64)
+    return float(np.log(natural[1] / natural[0]) - np.log(shares[1] / shares[0]))
+
+
+def calibrated_log_loss(p, y, shift=0.0):
+    """Binary cross-entropy of probabilities p after moving their logits by shift."""
+    p = np.clip(np.asarray(p, dtype=np.float64).ravel(), 1e-7, 1 - 1e-7)
+    z = np.log(p) - np.log1p(-p) + shift
+    y = np.asarray(y, dtype=np.float64).ravel()
+    return float(np.mean(np.maximum(z, 0) - z * y + np.log1p(np.exp(-np.abs(z)))))
+
+
+def epochs_to_reach(losses, target):
+    """First epoch (1-based) whose loss is at or below target; None if it never gets there."""
+    for epoch, loss in enumerate(losses, 1):
+        if loss <= target:
+            return epoch
+    return None
@@ -0,0 +1,368 @@
+# bench.py
+# Headless benchmark suite. Writes machine-readable JSON so runs on two
+# commits can be compared (--compare old.json).
+#
+# Sections:
+#   frames     per-frame cost of each player_vs_ai.main state (SDL dummy driver)
+#   inference  single-row and batched AI decision latency (heuristic, NumPy MLP, Keras)
+#   sim        game physics steps/sec (GameState, the game's own update, and vectorized BatchSim)
+#   training   rows/sec of train_model.py data loading and model.fit
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sim_engine import BatchSim, heuristic_policy
+import game_core
+import sim_engine
+
+RESULTS_FILE = "bench_results.json"
+
+
+def _percentiles(samples):
+    a = np.asarray(samples, dtype=np.float64) * 1000.0
+    if not len(a):
+        return {"count": 0}
+    return {
+        "count": int(len(a)),
+        "mean_ms": float(a.mean()),
+        "p50_ms": float(np.percentile(a, 50)),
+        "p95_ms": float(np.percentile(a, 95)),
+        "p99_ms": float(np.percentile(a, 99)),
+        "max_ms": float(a.max()),
+    }
+
+
+def _time_per_call(fn, min_time=0.2, min_calls=10):
+    """Mean seconds per call, repeating until min_time has elapsed."""
+    fn()  # warm-up
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if calls >= min_calls and elapsed >= min_time:
+            return elapsed / calls
+
+
+# ============================================================================
+# FRAME COST PER GAME STATE
+# ============================================================================
+
+class _StateScript:
+    """frame_hook for player_vs_ai.main that walks through every app state."""
+
+    def __init__(self, frames_per_state):
+        import pygame
+        self.pygame = pygame
+        self.n = frames_per_state
+        self.samples = {}
+        self.frame = 0
+
+    def _key(self, key):
+        self.pygame.event.post(self.pygame.event.Event(self.pygame.KEYDOWN, key=key, unicode="", mod=0))
+
+    def __call__(self, state, seconds):
+        pg = self.pygame
+        self.frame += 1
+        self.samples.setdefault(state, []).append(seconds)
+        count = {s: len(v) for s, v in self.samples.items()}
+        if state == "menu":
+            if count.get("high_scores", 0) < self.n:
+                if count["menu"] >= self.n:
+                    self._key(pg.K_h)
+            elif count.get("name_input", 0) < self.n:
+                self._key(pg.K_c)
+            else:
+                self._key(pg.K_s)
+        elif state == "high_scores" and count[state] % self.n == 0:
+            self._key(pg.K_m)
+        elif state == "name_input" and count[state] % self.n == 0:
+            self._key(pg.K_RETURN)
+        elif state == "game" and count[state] % 12 == 1:
+            # start, keep flapping, and leave for game_over once the round ends
+            self._key(pg.K_SPACE)
+        elif state == "game_over" and count[state] >= self.n:
+            if count.get("game", 0) >= self.n:
+                return False
+            self._key(pg.K_p)
+        return self.frame < 50 * self.n
+
+
+def bench_frames(frames_per_state=300, no_model=True):
+    import player_vs_ai
+    from score_store import ScoreStore
+
+    # never touch the real highscores.json
+    tmpdir = tempfile.mkdtemp(prefix="flappy-bench-")
+    scores_path = os.path.join(tmpdir, "highscores.json")
+    if os.path.exists(player_vs_ai.HIGHSCORES_FILE):
+        shutil.copy(player_vs_ai.HIGHSCORES_FILE, scores_path)
+    player_vs_ai.score_store = ScoreStore(scores_path, player_vs_ai.MAX_SCORES)
+
+    script = _StateScript(frames_per_state)
+    # lockstep ticks: one physics tick per frame, as before the fixed-timestep loop
+    # and never write replays into the working directory
+    argv = ["--fps", "0", "--sim-speed", "0", "--no-replays"] + (["--no-model"] if no_model else [])
+    try:
+        player_vs_ai.main(argv, frame_hook=script)
+    except SystemExit:
+        pass
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return {state: _percentiles(samples) for state, samples in script.samples.items()}
+
+
+# ============================================================================
+# AI DECISION LATENCY
+# ============================================================================
+
+def _random_mlp():
+    """Untrained MLP with the train_model.py architecture (7-128-64-32-1) for timing only."""
+    from numpy_mlp import NumpyMLP
+    rng = np.random.default_rng(0)
+    sizes = [7, 128, 64, 32, 1]
+    weights = [rng.standard_normal((a, b)) * 0.1 for a, b in zip(sizes, sizes[1:])]
+    biases = [np.zeros(b) for b in sizes[1:]]
+    return NumpyMLP(np.zeros(7), np.ones(7), weights, biases, ["relu", "relu", "relu", "sigmoid"])
+
+
+def bench_inference(batch=1024):
+    from numpy_mlp import BUNDLE_FILE, MODEL_FILE, SCALER_FILE, load_bundle
+
+    results = {}
+    sim = BatchSim(batch, seed=0)
+    feats = sim.features()
+    row = feats[0].copy()
+    bird_y, pipe_top = float(row[0]), float(row[1])
+    pipe_bottom = pipe_top + sim_engine.PIPE_GAP
+
+    def heuristic_single():
+        return bird_y > (pipe_top + pipe_bottom) / 2.0 + 20.0
+
+    policy = heuristic_policy(20.0)
+    results["heuristic"] = {
+        "single_us": 1e6 * _time_per_call(heuristic_single),
+        "batch": batch,
+        "batch_us": 1e6 * _time_per_call(lambda: policy(sim)),
+    }
+
+    mlp = load_bundle(BUNDLE_FILE)
+    source = BUNDLE_FILE if mlp is not None else "random weights"
+    if mlp is None:
+        mlp = _random_mlp()
+    results["numpy_mlp"] = {
+        "weights": source,
+        "single_us": 1e6 * _time_per_call(lambda: mlp.predict_proba(row)),
+        "batch": batch,
+        "batch_us": 1e6 * _time_per_call(lambda: mlp.predict_proba(feats)),
+    }
+
+    try:
+        import joblib
+        from model_loader import _import_load_model
+        load_model = _import_load_model()
+        if load_model is None or not os.path.exists(MODEL_FILE):
+            raise RuntimeError("TensorFlow or tf_model.h5 not available")
+        model = load_model(MODEL_FILE)
+        scaler = joblib.load(SCALER_FILE)
+        single = scaler.transform(row.reshape(1, -1))
+        batched = scaler.transform(feats)
+        results["keras"] = {
+            "single_us": 1e6 * _time_per_call(lambda: model.predict(single, verbose=0), min_calls=20),
+            "batch": batch,
+            "batch_us": 1e6 * _time_per_call(lambda: model.predict(batched, verbose=0), min_calls=5),
+        }
+    except Exception as e:
+        results["keras"] = {"skipped": str(e)}
+    return results
+
+
+# ============================================================================
+# SIMULATION THROUGHPUT
+# ============================================================================
+
+def _game_steps(frames, seed=0):
+    """frames ticks of game_core.GameState.step, the update player_vs_ai runs (AI bird only, heuristic AI)."""
+    def ai_jump(game):
+        _, pipe_top = game.nearest_pipe(game_core.AI_BIRD_X)
+        return game.a_bird_y > pipe_top + game_core.PIPE_GAP / 2.0
+
+    game = None
+    for _ in range(frames):
+        if game is None or not game.ai_alive:
+            game = game_core.new_game(seed)
+            game.player_alive = False
+            seed += 1
+        game.step(ai_jump)
+        game.apply_collisions()
+
+
+def bench_sim(lane_counts=(1, 1024, 16384), steps=500):
+    results = {}
+    frames = 200000
+    start = time.perf_counter()
+    _game_steps(frames)
+    results["game_state"] = {"frames_per_s": frames / (time.perf_counter() - start)}
+
+    policy = heuristic_policy(0.0)
+    for n in lane_counts:
+        sim = BatchSim(n, seed=0)
+        done = 0
+        start = time.perf_counter()
+        for _ in range(steps):
+            done += int(sim.alive.sum())
+            sim.step(policy(sim))
+            dead = ~sim.alive
+            if dead.any():
+                sim.reset(dead)
+        elapsed = time.perf_counter() - start
+        results[f"batch_{n}"] = {"steps_per_s": steps / elapsed, "frames_per_s": done / elapsed}
+    return results
+
+
+# ============================================================================
+# TRAINING SPEED
+# ============================================================================
+
+def bench_training(epochs=2):
+    results = {}
+    from columnar_dataset import convert_csv, open_dataset
+    csvs = [p for p in ("training_data_improved.csv", "training_data.csv") if os.path.exists(p)]
+    if not csvs:
+        return {"skipped": "no training CSVs"}
+
+    try:
+        import pandas as pd  # train_model.load_csv and the converter need it
+    except Exception as e:
+        return {"skipped": f"pandas not available: {e}"}
+
+    from columnar_dataset import derive_features, FEATURES
+    for path in csvs:
+        start = time.perf_counter()
+        df = derive_features(pd.read_csv(path))
+        X = df[FEATURES].astype(float).values
+        elapsed = time.perf_counter() - start
+        results[f"load_csv:{path}"] = {"rows": len(X), "rows_per_s": len(X) / elapsed}
+
+    tmpdir = tempfile.mkdtemp(prefix="flappy-bench-")
+    try:
+        fcol = os.path.join(tmpdir, "bench.fcol")
+        start = time.perf_counter()
+        convert_csv(csvs, fcol)
+        elapsed = time.perf_counter() - start
+        ds = open_dataset(fcol)
+        results["convert_csv_to_fcol"] = {"rows": len(ds), "rows_per_s": len(ds) / elapsed}
+        start = time.perf_counter()
+        ds = open_dataset(fcol)
+        X, y = ds.X, ds.y
+        checksum = float(np.asarray(X, dtype=np.float64).sum())  # touch every page
+        elapsed = time.perf_counter() - start
+        results["load_fcol"] = {"rows": len(ds), "rows_per_s": len(ds) / elapsed, "checksum": checksum}
+
+        try:
+            import train_model
+        except Exception as e:
+            results["fit"] = {"skipped": f"TensorFlow stack not available: {e}"}
+            return results
+        from sklearn.preprocessing import StandardScaler
+        Xs = StandardScaler().fit_transform(np.asarray(X, dtype=np.float32))
+        model = train_model.build_model(Xs.shape[1])
+        start = time.perf_counter()
+        model.fit(Xs, np.asarray(y, dtype=np.float32), epochs=epochs, batch_size=64, verbose=0)
+        elapsed = time.perf_counter() - start
+        results["fit"] = {"rows": len(Xs), "epochs": epochs, "rows_per_s": len(Xs) * epochs / elapsed}
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
+
+
+# ============================================================================
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = v
+    return out
+
+
+def compare(old, new):
+    """Print metrics present in both result files with the new/old ratio."""
+    a, b = _flatten(old["results"]), _flatten(new["results"])
+    print(f"{'metric':60s} {'old':>12s} {'new':>12s} {'new/old':>8s}")
+    for key in sorted(set(a) & set(b)):
+        if a[key]:
+            print(f"{key:60s} {a[key]:12.4g} {b[key]:12.4g} {b[key] / a[key]:8.2f}")
+
+
+SECTIONS = {
+    "sim": bench_sim,
+    "inference": bench_inference,
+    "training": bench_training,
+    "frames": bench_frames,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless performance benchmarks (JSON output).")
+    parser.add_argument("--only", nargs="+", choices=list(SECTIONS), help="run a subset of sections")
+    parser.add_argument("--out", default=RESULTS_FILE)
+    parser.add_argument("--compare", metavar="OLD_JSON", help="print ratios against an earlier result file")
+    parser.add_argument("--frames-per-state", type=int, default=300)
+    parser.add_argument("--with-model", action="store_true", help="frame section: let the game load its model")
+    args = parser.parse_args(argv)
+
+    results = {}
+    # frames last: player_vs_ai.main shuts pygame down when it returns
+    for name in [s for s in SECTIONS if not args.only or s in args.only]:
+        print(f"== {name}")
+        start = time.perf_counter()
+        if name == "frames":
+            results[name] = bench_frames(args.frames_per_state, no_model=not args.with_model)
+        else:
+            results[name] = SECTIONS[name]()
+        print(f"   done in {time.perf_counter() - start:.1f}s")
+
+    report = {"meta": _meta(), "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# columnar_dataset.py
+# Binary, columnar, memory-mappable training dataset (.fcol).
+#
+# Layout (little endian):
+#   b"FCOL" + uint32 header length + JSON header (padded to 64 bytes)
+#   feature block: float32, shape (n_features, rows) — one column after another
+#   label block:   uint8,   shape (rows,)
+# The header records the schema (feature names, dtypes, byte offsets), so a
+# reader can memory-map the file and get the feature matrix as a zero-copy
+# (rows, n_features) view.
+import argparse
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"FCOL"
+VERSION = 1
+ALIGN = 64
+
+FEATURES = ["bird_y", "top_pipe_y", "bottom_pipe_y", "pipe_x", "distance_to_pipe", "gap_center", "gap_size"]
+LABEL = "action"
+BIRD_X = 50
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def derive_features(df):
+    """Fill in derived and legacy-named columns of a recorder DataFrame (in place)."""
+    if "top_pipe_y" not in df.columns and "pipe_top" in df.columns:
+        df["top_pipe_y"] = df["pipe_top"]
+    if "bottom_pipe_y" not in df.columns and "pipe_bottom" in df.columns:
+        df["bottom_pipe_y"] = df["pipe_bottom"]
+    if "distance_to_pipe" not in df.columns:
+        df["distance_to_pipe"] = df["pipe_x"] - BIRD_X
+    if "gap_center" not in df.columns:
+        df["gap_center"] = (df["top_pipe_y"] + df["bottom_pipe_y"]) / 2.0
+    if "gap_size" not in df.columns:
+        df["gap_size"] = df["bottom_pipe_y"] - df["top_pipe_y"]
+    return df
+
+
+def _build_header(rows, features, extra=None):
+    feature_bytes = rows * len(features) * 4
+    header = {
+        "version": VERSION,
+        "rows": int(rows),
+        "features": list(features),
+        "feature_dtype": "<f4",
+        "label": LABEL,
+        "label_dtype": "u1",
+        "layout": "columnar",
+        "meta": extra or {},
+    }
+    # offsets depend on the header size, so size it with placeholder offsets first
+    header["feature_offset"] = 0
+    header["label_offset"] = 0
+    while True:
+        blob = json.dumps(header).encode("utf-8")
+        data_start = _align(len(MAGIC) + 4 + len(blob))
+        if data_start == header["feature_offset"]:
+            return header, blob
+        header["feature_offset"] = data_start
+        header["label_offset"] = _align(data_start + feature_bytes)
+
+
+def create_dataset(path, rows, features=FEATURES, meta=None):
+    """Allocate an .fcol file and return (feature_block, labels) writable memmaps.
+
+    feature_block has shape (n_features, rows); fill it column by column.
+    """
+    header, blob = _build_header(rows, features, meta)
+    total = header["label_offset"] + rows
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(blob)))
+        f.write(blob)
+        f.truncate(total)
+    block = np.memmap(path, dtype="<f4", mode="r+", offset=header["feature_offset"],
+                      shape=(len(features), rows)) if rows else np.empty((len(features), 0), dtype="<f4")
+    labels = np.memmap(path, dtype="u1", mode="r+", offset=header["label_offset"],
+                       shape=(rows,)) if rows else np.empty(0, dtype="u1")
+    return block, labels
+
+
+def write_dataset(path, X, y, features=FEATURES, meta=None):
+    """Write an in-memory (rows, n_features) matrix and label vector to path."""
+    X = np.asarray(X)
+    block, labels = create_dataset(path, len(X), features, meta)
+    block[:] = X.T
+    labels[:] = y
+    if isinstance(block, np.memmap):
+        block.flush()
+        labels.flush()
+    return path
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path} is not an .fcol dataset")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported .fcol version {header.get('version')}")
+    return header
+
+
+class ColumnarDataset:
+    """Read-only memory-mapped view of an .fcol file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self.rows = self.header["rows"]
+        self.features = self.header["features"]
+        n = len(self.features)
+        if self.rows:
+            self._block = np.memmap(path, dtype=self.header["feature_dtype"], mode="r",
+                                    offset=self.header["feature_offset"], shape=(n, self.rows))
+            self.y = np.memmap(path, dtype=self.header["label_dtype"], mode="r",
+                               offset=self.header["label_offset"], shape=(self.rows,))
+        else:
+            self._block = np.empty((n, 0), dtype=np.float32)
+            self.y = np.empty(0, dtype=np.uint8)
+
+    @property
+    def X(self):
+        """(rows, n_features) float32 view over the mapped columns (no copy)."""
+        return self._block.T
+
+    def column(self, name):
+        return self._block[self.features.index(name)]
+
+    def __len__(self):
+        return self.rows
+
+
+def open_dataset(path):
+    return ColumnarDataset(path)
+
+
+def _csv_chunks(path, chunk_rows):
+    """Complete recorder rows of one CSV, in chunks of FEATURES + LABEL columns.
+
+    pandas skips blank lines and reads a line cut short (a crash while
+    recording leaves one at the end) with NaN in its missing columns; such
+    rows, and any with a non-numeric value, are dropped here. Counting and
+    writing both go through this, so they always agree.
+    """
+    import pandas as pd
+
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        chunk = derive_features(chunk.apply(pd.to_numeric, errors="coerce"))
+        yield chunk[FEATURES + [LABEL]].dropna()
+
+
+def _count_csv_rows(path, chunk_rows=200000):
+    """Rows of one CSV as convert_csv will write them (a parsing pass; files are converted once)."""
+    return sum(len(chunk) for chunk in _csv_chunks(path, chunk_rows))
+
+
+def convert_csv(csv_paths, out_path, chunk_rows=200000):
+    """Convert one or more recorder CSVs (any legacy schema) into a single .fcol file."""
+    if isinstance(csv_paths, str):
+        csv_paths = [csv_paths]
+    total = sum(_count_csv_rows(p, chunk_rows) for p in csv_paths)
+    block, labels = create_dataset(out_path, total, FEATURES, meta={"sources": [os.path.basename(p) for p in csv_paths]})
+    pos = 0
+    for path in csv_paths:
+        for chunk in _csv_chunks(path, chunk_rows):
+            n = len(chunk)
+            for i, col in enumerate(FEATURES):
+                block[i, pos:pos + n] = chunk[col].to_numpy(dtype=np.float32)
+            labels[pos:pos + n] = chunk[LABEL].to_numpy(dtype=np.uint8)
+            pos += n
+    if pos != total:
+        raise ValueError(f"row count mismatch while converting: expected {total}, wrote {pos}")
+    if isinstance(block, np.memmap):
+        block.flush()
+        labels.flush()
+    print(f"Wrote {total} rows from {len(csv_paths)} file(s) to {out_path}")
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert recorded CSVs to the columnar .fcol training format.")
+    parser.add_argument("csv", nargs="+", help="input CSV file(s), merged in order")
+    parser.add_argument("-o", "--out", default="training_data.fcol", help="output .fcol path")
+    args = parser.parse_args(argv)
+    convert_csv(args.csv, args.out)
+
+
+if __name__ == "__main__":
+    main()
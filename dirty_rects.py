@@ -0,0 +1,93 @@
+# dirty_rects.py
+# Dirty-rectangle presentation for the game window.
+#
+# Instead of blitting the whole background and pushing the whole window to
+# the display every frame, the renderer remembers what was drawn where:
+#   * a new scene (state change, edited text, window exposed) is drawn once
+#     in full and presented with a full update;
+#   * moving things (birds, pipes, score text) are registered with mark();
+#     next frame only those rectangles are restored from the background;
+#   * buttons are redrawn only when their hover state flips.
+# display.update() then receives just the rectangles that changed this frame
+# plus the ones vacated since the last frame.
+import pygame
+
+
+class DirtyRectRenderer:
+    """Tracks changed screen regions; disabled, it degrades to full redraws."""
+
+    def __init__(self, surface, background, enabled=True):
+        self.surface = surface
+        self.background = background
+        self.enabled = enabled
+        self._scene = None
+        self._full = True
+        self._prev = []   # transient rects drawn last frame (restored this frame)
+        self._dirty = []  # transient rects drawn this frame
+        self._touched = []  # persistent changes this frame (not restored later)
+        self._hover = {}
+        self.frames = 0
+        self.full_frames = 0
+        self.pixels = 0
+
+    def invalidate(self):
+        """Force a full redraw and full display update next frame."""
+        self._scene = None
+
+    def begin_frame(self, scene_key):
+        """Prepare the back buffer. Returns True when the caller must draw the whole scene."""
+        if not self.enabled or scene_key != self._scene:
+            self._scene = scene_key
+            self._full = True
+            self._prev = []
+            self._hover.clear()
+            self.surface.blit(self.background, (0, 0))
+            return True
+        self._full = False
+        for rect in self._prev:
+            self.surface.blit(self.background, rect, rect)
+        return False
+
+    def mark(self, rect):
+        """Register something drawn this frame that moves or changes (erased next frame)."""
+        if rect:
+            self._dirty.append(pygame.Rect(rect))
+        return rect
+
+    def touch(self, rect):
+        """Register a persistent change (e.g. a button redraw) to present this frame."""
+        if rect:
+            self._touched.append(pygame.Rect(rect))
+        return rect
+
+    def draw_buttons(self, buttons, redraw):
+        """Draw buttons on a full redraw, otherwise only those whose hover state changed."""
+        for button in buttons:
+            if redraw or self._hover.get(button) != button.hover:
+                button.draw(self.surface)
+                self._hover[button] = button.hover
+                self.touch(button.rect)
+
+    def present(self):
+        """Push this frame's changes to the display."""
+        self.frames += 1
+        if self._full:
+            pygame.display.update()
+            self.full_frames += 1
+            self.pixels += self.surface.get_width() * self.surface.get_height()
+        else:
+            rects = self._prev + self._dirty + self._touched
+            if rects:
+                pygame.display.update(rects)
+                bounds = self.surface.get_rect()
+                self.pixels += sum(c.width * c.height for c in (r.clip(bounds) for r in rects))
+        self._prev = self._dirty
+        self._dirty = []
+        self._touched = []
+
+    def report(self, name="Dirty-rect renderer"):
+        if not self.enabled or not self.frames:
+            return
+        area = self.surface.get_width() * self.surface.get_height()
+        print(f"{name}: {self.frames} frames, {self.full_frames} full updates, "
+              f"{100.0 * self.pixels / (self.frames * area):.1f}% of the window updated per frame on average")
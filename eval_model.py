@@ -0,0 +1,163 @@
+# eval_model.py
+# Closed-loop evaluation of the AI: play it, don't just score single frames.
+#
+# Validation accuracy in train_model.py says how often the model copies a
+# recorded action; it says little about how long the AI survives once its
+# own decisions drive the game. This plays the trained policy in headless
+# BatchSim games (same rules as player_vs_ai, see sim_engine.py) across a
+# process pool, for every AI_DIFFICULTY threshold and many seeds, and
+# reports the score and survival distributions plus throughput. Seeds are
+# shared across difficulties, so the thresholds are compared on the same
+# pipe sequences. --min-mean-score turns it into a pass/fail gate.
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+
+from policy_table import DIFFICULTY_THRESHOLDS, TABLE_FILE, load_table, table_policy
+from sim_engine import BatchSim, heuristic_policy, model_policy
+
+HEURISTIC_MARGINS = {"easy": 20.0, "normal": 0.0, "hard": -10.0}  # keep in sync with player_vs_ai.py
+MAX_FRAMES = 20000
+CHUNK_GAMES = 256
+
+_policy_source = None  # per-process: predict_batch (model) or PolicyTable (table)
+
+
+def _load_source(backend, table_path, quiet=False):
+    """predict_batch for 'model', a PolicyTable for 'table', None for 'heuristic'."""
+    if backend == "heuristic":
+        return None
+    out = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(out):
+        if backend == "table":
+            return load_table(table_path)
+        from model_loader import load_model_and_scaler, make_batch_predictor
+        return make_batch_predictor(*load_model_and_scaler())
+
+
+def _init_worker(backend, table_path):
+    global _policy_source
+    _policy_source = _load_source(backend, table_path, quiet=True)
+
+
+def _make_policy(backend, difficulty):
+    if backend == "heuristic":
+        return heuristic_policy(HEURISTIC_MARGINS[difficulty])
+    threshold = DIFFICULTY_THRESHOLDS[difficulty]
+    if backend == "table":
+        return table_policy(_policy_source, threshold)
+    return model_policy(_policy_source, threshold)
+
+
+def play_chunk(task):
+    """Worker entry point: play task['games'] games to the end (or max_frames)."""
+    start = time.perf_counter()
+    sim = BatchSim(task["games"], seed=task["seed"])
+    scores, frames = sim.run(_make_policy(task["backend"], task["difficulty"]), max_frames=task["max_frames"])
+    return task["difficulty"], scores, frames, time.perf_counter() - start
+
+
+def summarize(values):
+    values = np.asarray(values)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"mean": float(values.mean()), "std": float(values.std()), "min": int(values.min()),
+            "p50": float(p50), "p90": float(p90), "p99": float(p99), "max": int(values.max())}
+
+
+def evaluate(backend="model", difficulties=None, games=4096, seed=0, workers=None,
+             max_frames=MAX_FRAMES, chunk_games=CHUNK_GAMES, table_path=TABLE_FILE):
+    """Play `games` games per difficulty in parallel; returns the report dict."""
+    difficulties = list(difficulties or DIFFICULTY_THRESHOLDS)
+    workers = workers or os.cpu_count() or 1
+    if backend != "heuristic" and _load_source(backend, table_path) is None:
+        raise SystemExit(f"No {backend} available to evaluate (train_model.py / policy_table.py first).")
+
+    tasks = []
+    for difficulty in difficulties:
+        for i, first in enumerate(range(0, games, chunk_games)):
+            tasks.append({"backend": backend, "difficulty": difficulty, "seed": seed * 1_000_003 + i,
+                          "games": min(chunk_games, games - first), "max_frames": max_frames})
+
+    start = time.perf_counter()
+    results = {d: ([], []) for d in difficulties}
+    busy = 0.0
+    with mp.Pool(min(workers, len(tasks)), initializer=_init_worker, initargs=(backend, table_path)) as pool:
+        for difficulty, scores, frames, seconds in pool.imap_unordered(play_chunk, tasks):
+            results[difficulty][0].append(scores)
+            results[difficulty][1].append(frames)
+            busy += seconds
+    wall = time.perf_counter() - start
+
+    report = {"backend": backend, "games_per_difficulty": games, "seed": seed, "max_frames": max_frames,
+              "workers": workers, "difficulties": {}}
+    total_frames = 0
+    for difficulty in difficulties:
+        scores = np.concatenate(results[difficulty][0])
+        frames = np.concatenate(results[difficulty][1])
+        total_frames += int(frames.sum())
+        report["difficulties"][difficulty] = {
+            "threshold": DIFFICULTY_THRESHOLDS[difficulty],
+            "score": summarize(scores),
+            "frames": summarize(frames),
+            "capped": float(np.mean(frames >= max_frames)),
+        }
+    report["throughput"] = {"wall_s": wall, "frames": total_frames, "frames_per_s": total_frames / wall,
+                            "games_per_s": games * len(difficulties) / wall, "cpu_s": busy}
+    return report
+
+
+def format_report(report):
+    lines = [f"Closed-loop evaluation: {report['backend']} backend, {report['games_per_difficulty']} games "
+             f"per difficulty, seed {report['seed']}, cap {report['max_frames']} frames"]
+    lines.append(f"{'difficulty':<10s} {'thr':>5s} | {'score mean':>10s} {'p50':>6s} {'p90':>6s} {'p99':>6s} {'max':>6s} "
+                 f"| {'frames mean':>11s} {'p50':>7s} {'p90':>7s} | capped")
+    for difficulty, r in report["difficulties"].items():
+        s, f = r["score"], r["frames"]
+        lines.append(f"{difficulty:<10s} {r['threshold']:>5.2f} | {s['mean']:>10.2f} {s['p50']:>6.0f} {s['p90']:>6.0f} "
+                     f"{s['p99']:>6.0f} {s['max']:>6d} | {f['mean']:>11.0f} {f['p50']:>7.0f} {f['p90']:>7.0f} "
+                     f"| {100.0 * r['capped']:5.1f}%")
+    t = report["throughput"]
+    lines.append(f"{t['frames']:,} frames in {t['wall_s']:.2f}s on {report['workers']} workers "
+                 f"({t['frames_per_s']:,.0f} frames/s, {t['games_per_s']:,.0f} games/s)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play the trained AI in headless games and report survival.")
+    parser.add_argument("--backend", choices=["model", "table", "heuristic"], default="model")
+    parser.add_argument("--policy-table", default=TABLE_FILE, help="table file for --backend table")
+    parser.add_argument("--difficulty", action="append", choices=list(DIFFICULTY_THRESHOLDS),
+                        help="difficulty to evaluate (repeatable; default: all)")
+    parser.add_argument("--games", type=int, default=4096, help="games per difficulty")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES, help="stop a game after this many frames")
+    parser.add_argument("--chunk-games", type=int, default=CHUNK_GAMES, help="games stepped together per task")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    parser.add_argument("--min-mean-score", type=float,
+                        help="exit with status 1 if any evaluated difficulty has a lower mean score")
+    args = parser.parse_args(argv)
+
+    report = evaluate(args.backend, args.difficulty, args.games, args.seed, args.workers,
+                      args.max_frames, args.chunk_games, args.policy_table)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.min_mean_score is not None:
+        failed = [d for d, r in report["difficulties"].items() if r["score"]["mean"] < args.min_mean_score]
+        if failed:
+            print(f"FAIL: mean score below {args.min_mean_score} on {', '.join(failed)}")
+            sys.exit(1)
+        print(f"PASS: mean score >= {args.min_mean_score} on every difficulty")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# evolve.py
+# Neuroevolution trainer for the AI policy (evolution strategies).
+#
+# An alternative to imitating recorded keypresses (train_model.py): the
+# policy is optimized directly for how long it survives. Each generation
+# perturbs the flat parameter vector of the same 7-feature MLP with
+# antithetic Gaussian noise, plays every perturbation in headless BatchSim
+# games (player_vs_ai rules, see sim_engine.py) on a process pool, and moves
+# the parameters along the rank-weighted noise (OpenAI-ES with Adam).
+#
+# Only noise seeds travel to the workers; each worker regenerates the noise
+# itself. All genomes in a generation play the same pipe sequences, so the
+# fitness differences come from the genomes, not the luck of the draw.
+# The best genome is exported as a NumPy bundle (see numpy_mlp.py), the
+# format the game loads.
+#
+#   python evolve.py --generations 200
+#   python evolve.py --resume                 # continue from the checkpoint
+#   python evolve.py --out tf_model.npz       # make the game play it
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from numpy_mlp import NumpyMLP, save_bundle
+from policy_table import sample_states
+from sim_engine import N_FEATURES, BatchSim, model_policy, state_features
+
+HIDDEN = (128, 64, 32)  # same layers as train_model.build_model (Dropout has no weights)
+CHECKPOINT_FILE = "evolve_checkpoint.npz"
+OUT_FILE = "evolved_model.npz"
+
+_worker = {}  # per-process config, set by _init_worker
+
+
+def layer_sizes(hidden=HIDDEN):
+    return [N_FEATURES, *hidden, 1]
+
+
+def activations_for(sizes):
+    return ["relu"] * (len(sizes) - 2) + ["sigmoid"]
+
+
+def n_params(sizes):
+    return sum(a * b + b for a, b in zip(sizes, sizes[1:]))
+
+
+def unflatten(theta, sizes):
+    """Split a flat parameter vector into per-layer (kernel, bias) lists."""
+    weights, biases, pos = [], [], 0
+    for a, b in zip(sizes, sizes[1:]):
+        weights.append(theta[pos:pos + a * b].reshape(a, b))
+        pos += a * b
+        biases.append(theta[pos:pos + b])
+        pos += b
+    return weights, biases
+
+
+def init_params(sizes, rng):
+    """Glorot-uniform kernels and zero biases, like a fresh Keras Dense stack."""
+    parts = []
+    for a, b in zip(sizes, sizes[1:]):
+        limit = np.sqrt(6.0 / (a + b))
+        parts.append(rng.uniform(-limit, limit, size=a * b))
+        parts.append(np.zeros(b))
+    return np.concatenate(parts).astype(np.float32)
+
+
+def input_scaler(n=200_000, seed=0):
+    """Feature mean/scale over uniformly sampled states (stands in for the fitted StandardScaler)."""
+    X = state_features(*sample_states(n, seed))
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0  # gap_size is constant, as StandardScaler would treat it
+    return X.mean(axis=0), scale
+
+
+def build_mlp(theta, sizes, mean, scale):
+    weights, biases = unflatten(theta, sizes)
+    return NumpyMLP(mean, scale, weights, biases, activations_for(sizes))
+
+
+def fitness(theta, sizes, mean, scale, games, seed, max_frames, threshold):
+    """(mean frames survived, mean score) of the genome over `games` seeded games."""
+    sim = BatchSim(games, seed=seed)
+    scores, frames = sim.run(model_policy(build_mlp(theta, sizes, mean, scale).predict_proba, threshold), max_frames)
+    return float(frames.mean()), float(scores.mean())
+
+
+def noise(seed, n):
+    return np.random.default_rng(seed).standard_normal(n, dtype=np.float32)
+
+
+def _init_worker(config):
+    _worker.update(config)
+
+
+def _evaluate(task):
+    """Worker entry point: fitness of theta +/- sigma * noise(seed) for each seed, or of theta itself."""
+    c = _worker
+    theta, game_seed = task["theta"], task["game_seed"]
+    run = lambda params: fitness(params, c["sizes"], c["mean"], c["scale"], c["games"], game_seed,
+                                 c["max_frames"], c["threshold"])
+    if task["seeds"] is None:
+        return "center", run(theta)
+    out = []
+    for s in task["seeds"]:
+        eps = c["sigma"] * noise(s, theta.size)
+        out.append((s, run(theta + eps), run(theta - eps)))
+    return "pairs", out
+
+
+def centered_ranks(x):
+    """Fitness shaping: ranks mapped to [-0.5, 0.5] (robust to outliers and scale)."""
+    ranks = np.empty(x.size, dtype=np.float64)
+    ranks[x.ravel().argsort()] = np.arange(x.size)
+    return (ranks / (x.size - 1) - 0.5).reshape(x.shape)
+
+
+class Adam:
+    def __init__(self, n, lr=0.01, beta1=0.9, beta2=0.999, eps=1e-8):
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.m = np.zeros(n, dtype=np.float32)
+        self.v = np.zeros(n, dtype=np.float32)
+        self.t = 0
+
+    def step(self, grad):
+        """Return the ascent step for grad."""
+        self.t += 1
+        self.m = self.beta1 * self.m + (1 - self.beta1) * grad
+        self.v = self.beta2 * self.v + (1 - self.beta2) * grad * grad
+        a = self.lr * np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        return a * self.m / (np.sqrt(self.v) + self.eps)
+
+
+def save_checkpoint(path, state):
+    """Atomically write the trainer state (arrays + JSON config)."""
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, theta=state["theta"], best_theta=state["best_theta"], m=state["adam"].m, v=state["adam"].v,
+             meta=np.array(json.dumps({
+                 "generation": state["generation"], "adam_t": state["adam"].t, "best": state["best"],
+                 "rng": state["rng"].bit_generator.state, "config": state["config"],
+             })))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    with np.load(path) as f:
+        meta = json.loads(str(f["meta"]))
+        config = meta["config"]
+        adam = Adam(f["theta"].size, lr=config["lr"])
+        adam.m, adam.v, adam.t = f["m"], f["v"], meta["adam_t"]
+        rng = np.random.default_rng()
+        rng.bit_generator.state = meta["rng"]
+        return {"theta": f["theta"], "best_theta": f["best_theta"], "adam": adam, "rng": rng,
+                "generation": meta["generation"], "best": meta["best"], "config": config}
+
+
+def export_genome(theta, config, out_path):
+    sizes = config["sizes"]
+    weights, biases = unflatten(np.asarray(theta, dtype=np.float32), sizes)
+    save_bundle(out_path, config["mean"], config["scale"], weights, biases, activations_for(sizes))
+
+
+def train(config, generations, workers, checkpoint=CHECKPOINT_FILE, checkpoint_every=5, state=None):
+    """Run `generations` more generations; returns the final trainer state."""
+    sizes = config["sizes"]
+    if state is None:
+        rng = np.random.default_rng(config["seed"])
+        theta = init_params(sizes, rng)
+        state = {"theta": theta, "best_theta": theta.copy(), "adam": Adam(theta.size, lr=config["lr"]), "rng": rng,
+                 "generation": 0, "best": None, "config": config}
+    print(f"Evolving {'-'.join(map(str, sizes))} MLP ({n_params(sizes):,} params): population {config['population']}, "
+          f"{config['games']} games each, sigma {config['sigma']}, lr {config['lr']}, {workers} workers")
+
+    worker_config = {k: config[k] for k in ("sizes", "games", "max_frames", "threshold", "sigma")}
+    worker_config["mean"], worker_config["scale"] = np.asarray(config["mean"]), np.asarray(config["scale"])
+    pairs = config["population"] // 2
+    with mp.Pool(workers, initializer=_init_worker, initargs=(worker_config,)) as pool:
+        for _ in range(generations):
+            start = time.perf_counter()
+            gen = state["generation"]
+            theta = state["theta"]
+            game_seed = config["seed"] * 1_000_003 + gen
+            seeds = state["rng"].integers(0, 2**31 - 1, size=pairs)
+            tasks = [{"theta": theta, "game_seed": game_seed, "seeds": None}]
+            tasks += [{"theta": theta, "game_seed": game_seed, "seeds": [int(s) for s in chunk]}
+                      for chunk in np.array_split(seeds, min(workers * 2, pairs)) if len(chunk)]
+
+            center, results = None, []
+            for kind, result in pool.imap_unordered(_evaluate, tasks):
+                if kind == "center":
+                    center = result
+                else:
+                    results.extend(result)
+
+            # the center genome is the one that gets exported; keep the best one seen
+            if state["best"] is None or center[0] > state["best"]["frames"]:
+                state["best"] = {"generation": gen, "frames": center[0], "score": center[1]}
+                state["best_theta"] = theta.copy()
+
+            f = np.array([[plus[0], minus[0]] for _, plus, minus in results])
+            shaped = centered_ranks(f)
+            grad = np.zeros(theta.size, dtype=np.float32)
+            for (s, _, _), (wp, wm) in zip(results, shaped):
+                grad += (wp - wm) * noise(s, theta.size)
+            grad /= len(results) * 2 * config["sigma"]
+            grad -= config["l2"] * theta
+            state["theta"] = theta + state["adam"].step(grad)
+            state["generation"] = gen + 1
+
+            print(f"gen {gen:4d}  center {center[0]:7.0f} frames / {center[1]:6.2f} score  "
+                  f"pop mean {f.mean():7.0f} max {f.max():7.0f}  best {state['best']['frames']:7.0f} "
+                  f"(gen {state['best']['generation']})  {time.perf_counter() - start:.1f}s")
+            if checkpoint and state["generation"] % checkpoint_every == 0:
+                save_checkpoint(checkpoint, state)
+    if checkpoint:
+        save_checkpoint(checkpoint, state)
+    return state
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the AI policy with evolution strategies on headless games.")
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--population", type=int, default=64, help="genomes per generation (antithetic pairs)")
+    parser.add_argument("--games", type=int, default=32, help="games per genome evaluation")
+    parser.add_argument("--max-frames", type=int, default=3000, help="fitness cap per game")
+    parser.add_argument("--sigma", type=float, default=0.05, help="noise std-dev")
+    parser.add_argument("--lr", type=float, default=0.02)
+    parser.add_argument("--l2", type=float, default=0.005, help="weight decay")
+    parser.add_argument("--threshold", type=float, default=0.5, help="jump if output > threshold")
+    parser.add_argument("--hidden", default=",".join(map(str, HIDDEN)), help="hidden layer sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--checkpoint-every", type=int, default=5, help="generations between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from --checkpoint (its config wins)")
+    parser.add_argument("--out", default=OUT_FILE, help="bundle to export the best genome to")
+    args = parser.parse_args(argv)
+
+    if args.generations < 0:
+        parser.error("--generations must be >= 0")
+    state = None
+    if args.resume and os.path.exists(args.checkpoint):
+        state = load_checkpoint(args.checkpoint)
+        config = state["config"]
+        print(f"Resuming from {args.checkpoint} at generation {state['generation']}")
+    else:
+        if args.generations < 1:
+            # nothing evaluated yet: there is no best genome to export
+            parser.error("--generations must be at least 1 without a checkpoint to --resume from")
+        mean, scale = input_scaler()
+        config = {
+            "sizes": layer_sizes(tuple(int(h) for h in args.hidden.split(",") if h)),
+            "population": max(2, args.population - args.population % 2),
+            "games": args.games, "max_frames": args.max_frames, "sigma": args.sigma, "lr": args.lr,
+            "l2": args.l2, "threshold": args.threshold, "seed": args.seed,
+            "mean": mean.tolist(), "scale": scale.tolist(),
+        }
+
+    state = train(config, args.generations, args.workers, args.checkpoint, args.checkpoint_every, state)
+    export_genome(state["best_theta"], config, args.out)
+    best = state["best"]
+    print(f"Exported best genome (gen {best['generation']}: {best['frames']:.0f} frames, "
+          f"{best['score']:.2f} score) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
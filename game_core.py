@@ -0,0 +1,284 @@
+# game_core.py
+# Rules of a player-vs-AI match, without pygame.
+#
+# A match is a GameState. Everything random in it (the pipe heights) comes
+# from the match's own seeded generator, and every input is applied at a
+# physics tick, so a match is fully determined by its seed, the rule
+# constants and the ticks at which each bird jumped. player_vs_ai.py plays
+# matches on screen; replay.py re-runs recorded ones headless.
+#
+# Pipes live in a fixed-size ring buffer of screen x positions. Every live
+# pipe moves left by the pipe speed each tick, the same float subtraction
+# sim_engine.BatchSim does, so the two stay tick-for-tick identical.
+#
+# That is a deliberate trade: moving pipes costs one subtraction per live
+# pipe, not one per tick. Keeping spawn positions and subtracting a running
+# scroll would be constant cost, but after the first PIPE_SPEED_STEP the
+# speed is no longer an integer, and WIDTH - (s1 + s2 + ...) does not round
+# like ((WIDTH - s1) - s2) - ...; the collision and recycle tests then land
+# an ulp off BatchSim's and matches drift apart. We keep bit-exact parity
+# and pay for it with the loop, which the buffer bounds: at most
+# pipe_capacity() pipes are alive (3 at the default spacing, 6 at the
+# tightest), so a tick still costs the same however long the match runs.
+#
+# The whole physics state (birds, pipes, scroll, generator) is one flat
+# array('d'), so snapshot() and restore() are a single memory copy; search
+# and rollback can clone a match millions of times.
+import math
+import random
+import time
+from array import array
+
+# game rules (keep in sync with player_vs_ai.py)
+WIDTH, HEIGHT = 400, 600
+BIRD_X = 50
+AI_BIRD_X = BIRD_X + 40
+GRAVITY = 0.4
+JUMP = -7
+PIPE_GAP = 150
+PIPE_WIDTH = 60
+PIPE_SPEED = 5
+PIPE_SPEED_STEP = 0.15
+PIPE_TOP_MIN, PIPE_TOP_MAX = 60, 350
+BIRD_RADIUS = 15
+# a new pipe enters at the right edge once the newest one is this far in;
+# WIDTH + PIPE_WIDTH is the classic one-pipe-at-a-time game
+PIPE_SPACING = WIDTH + PIPE_WIDTH
+MIN_PIPE_SPACING = PIPE_WIDTH + 4 * BIRD_RADIUS
+
+RULES = {"gravity": GRAVITY, "jump": JUMP, "pipe_gap": PIPE_GAP, "pipe_width": PIPE_WIDTH,
+         "pipe_speed": PIPE_SPEED, "pipe_speed_step": PIPE_SPEED_STEP,
+         "pipe_top": [PIPE_TOP_MIN, PIPE_TOP_MAX], "width": WIDTH, "height": HEIGHT}
+
+# pipe heights come from a 48-bit LCG (java.util.Random's constants): its state
+# is exact in a double, so it lives in the state array with everything else
+_LCG_MULT, _LCG_ADD, _LCG_MASK = 0x5DEECE66D, 0xB, (1 << 48) - 1
+
+# state array layout: scalar fields, then the ring buffer (x slots, then top slots)
+(_TICK, _SCORE, _P_Y, _P_VEL, _A_Y, _A_VEL, _P_ALIVE, _A_ALIVE,
+ _SPEED, _SCROLL, _HEAD, _TAIL, _SCORED, _RNG, _N_JUMPS, _N_AI_JUMPS, _PIPES) = range(17)
+
+
+def new_seed():
+    return random.SystemRandom().randrange(2**32)
+
+
+def pipe_capacity(spacing):
+    """Most pipes that can be alive at once (on screen or just off its left edge)."""
+    return math.ceil((WIDTH + PIPE_WIDTH) / spacing) + 2
+
+
+def _field(index, cast=None):
+    if cast is None:
+        def get(self):
+            return self._s[index]
+    else:
+        def get(self):
+            return cast(self._s[index])
+
+    def set(self, value):
+        self._s[index] = value
+    return property(get, set)
+
+
+class GameState:
+    """One match: physics in a flat array('d'), UI flags and the jump log as plain slots.
+
+    Pipes head..tail-1 are alive, in ring slots pipe number % capacity,
+    holding their screen x and top. `scroll` is the total distance the
+    pipes have moved (for drawing). Pipes from `pipe_scored` on haven't
+    been passed yet.
+    """
+
+    __slots__ = ("_s", "seed", "pipe_spacing", "capacity", "started", "paused", "end_time", "saved",
+                 "jumps", "ai_jumps")
+
+    tick = _field(_TICK, int)
+    score = _field(_SCORE, int)
+    p_bird_y = _field(_P_Y)
+    p_velocity = _field(_P_VEL)
+    a_bird_y = _field(_A_Y)
+    a_velocity = _field(_A_VEL)
+    player_alive = _field(_P_ALIVE, bool)
+    ai_alive = _field(_A_ALIVE, bool)
+    pipe_speed = _field(_SPEED)
+    scroll = _field(_SCROLL)
+    pipe_head = _field(_HEAD, int)
+    pipe_tail = _field(_TAIL, int)
+    pipe_scored = _field(_SCORED, int)
+
+    def __init__(self, seed=None, pipe_spacing=PIPE_SPACING):
+        if pipe_spacing < MIN_PIPE_SPACING:
+            raise ValueError(f"pipe_spacing must be at least {MIN_PIPE_SPACING}, got {pipe_spacing}")
+        self.seed = new_seed() if seed is None else seed
+        self.pipe_spacing = pipe_spacing
+        self.capacity = pipe_capacity(pipe_spacing)
+        self._s = s = array("d", bytes(8 * (_PIPES + 2 * self.capacity)))
+        s[_P_Y] = s[_A_Y] = HEIGHT // 2
+        s[_P_ALIVE] = s[_A_ALIVE] = 1.0
+        s[_SPEED] = PIPE_SPEED
+        s[_RNG] = (self.seed ^ _LCG_MULT) & _LCG_MASK
+        # UI/game state
+        self.started = False
+        self.paused = False
+        self.end_time = None
+        self.saved = False
+        # replay log: tick of every jump
+        self.jumps = []
+        self.ai_jumps = []
+        self._spawn_pipe()
+
+    # --- snapshots ---
+
+    def snapshot(self):
+        """Copy of the physics state (one memcpy); see restore()."""
+        return self._s[:]
+
+    def restore(self, snap):
+        """Roll the match back to one of its own snapshots; the jump log is cut to match."""
+        s = self._s
+        s[:] = snap
+        del self.jumps[int(s[_N_JUMPS]):]
+        del self.ai_jumps[int(s[_N_AI_JUMPS]):]
+        if s[_P_ALIVE] and s[_A_ALIVE]:
+            self.end_time = None
+
+    def copy(self):
+        """Independent clone of the match, for search."""
+        other = object.__new__(GameState)
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other._s = self._s[:]
+        other.jumps = list(self.jumps)
+        other.ai_jumps = list(self.ai_jumps)
+        return other
+
+    # --- pipes ---
+
+    def _randint(self, lo, hi):
+        """Uniform integer in [lo, hi], like random.randint."""
+        s = self._s
+        state, bound = int(s[_RNG]), hi - lo + 1
+        while True:
+            state = (state * _LCG_MULT + _LCG_ADD) & _LCG_MASK
+            bits = state >> 17
+            value = bits % bound
+            if bits - value + bound - 1 < (1 << 31):
+                s[_RNG] = state
+                return lo + value
+
+    def _spawn_pipe(self):
+        s = self._s
+        slot = int(s[_TAIL]) % self.capacity
+        s[_PIPES + slot] = WIDTH
+        s[_PIPES + self.capacity + slot] = self._randint(PIPE_TOP_MIN, PIPE_TOP_MAX)
+        s[_TAIL] += 1
+
+    def pipe_at(self, i):
+        """(screen x, top) of pipe number i."""
+        s = self._s
+        slot = i % self.capacity
+        return s[_PIPES + slot], s[_PIPES + self.capacity + slot]
+
+    def pipes(self):
+        """(screen x, top) of every live pipe, leftmost first."""
+        return [self.pipe_at(i) for i in range(self.pipe_head, self.pipe_tail)]
+
+    def nearest_pipe(self, bird_x):
+        """(screen x, top) of the first pipe the bird at bird_x can still hit; the AI features use it."""
+        s, cap = self._s, self.capacity
+        for i in range(int(s[_HEAD]), int(s[_TAIL])):
+            slot = _PIPES + i % cap
+            if s[slot] + PIPE_WIDTH > bird_x - BIRD_RADIUS:
+                return s[slot], s[slot + cap]
+        return self.pipe_at(int(s[_TAIL]) - 1)
+
+    # --- rules ---
+
+    def player_jump(self):
+        """Flap the player's bird; it takes effect at the next tick."""
+        s = self._s
+        s[_P_VEL] = JUMP
+        tick = int(s[_TICK])
+        if not self.jumps or self.jumps[-1] != tick:
+            self.jumps.append(tick)
+            s[_N_JUMPS] += 1
+
+    def step(self, ai_jump):
+        """Advance a round by one physics tick. ai_jump(game) -> True makes the AI flap."""
+        s = self._s
+        # player physics
+        if s[_P_ALIVE]:
+            s[_P_VEL] += GRAVITY
+            s[_P_Y] += s[_P_VEL]
+
+        # ai decision + physics
+        if s[_A_ALIVE]:
+            if ai_jump(self):
+                s[_A_VEL] = JUMP
+                self.ai_jumps.append(int(s[_TICK]))
+                s[_N_AI_JUMPS] += 1
+            s[_A_VEL] += GRAVITY
+            s[_A_Y] += s[_A_VEL]
+
+        # pipe movement: x -= speed on every live pipe, exactly like BatchSim; a running
+        # scroll would be O(1) but rounds differently (see the header), so parity wins
+        speed, cap = s[_SPEED], self.capacity
+        s[_SCROLL] += speed
+        for i in range(int(s[_HEAD]), int(s[_TAIL])):
+            s[_PIPES + i % cap] -= speed
+        # scoring: when bird passes pipe
+        while s[_SCORED] < s[_TAIL] and s[_PIPES + int(s[_SCORED]) % cap] + PIPE_WIDTH < BIRD_X:
+            s[_SCORE] += 1
+            s[_SCORED] += 1
+
+        # drop pipes that left the screen, then let the next one in
+        while s[_HEAD] < s[_TAIL] and s[_PIPES + int(s[_HEAD]) % cap] < -PIPE_WIDTH:
+            s[_HEAD] += 1
+        # written as x < WIDTH - spacing: at the default spacing that is BatchSim's x < -PIPE_WIDTH, bit for bit
+        if s[_PIPES + (int(s[_TAIL]) - 1) % cap] < WIDTH - self.pipe_spacing:
+            self._spawn_pipe()
+            # gradually increase difficulty
+            s[_SPEED] += PIPE_SPEED_STEP
+        s[_TICK] += 1
+
+    def check_collision(self, bird_x, bird_y):
+        # bird represented as a circle with radius 15
+        r = BIRD_RADIUS
+        bird_top = bird_y - r
+        bird_bottom = bird_y + r
+        bird_left = bird_x - r
+        bird_right = bird_x + r
+
+        # out of bounds if bird touches floor or ceiling
+        if (bird_bottom >= HEIGHT) or (bird_top <= 0):
+            return True
+
+        # pipes are ordered by x, so only those from the head up to the bird's right
+        # edge can overlap it horizontally; the rest of the buffer is never looked at
+        s, cap = self._s, self.capacity
+        for i in range(int(s[_HEAD]), int(s[_TAIL])):
+            slot = _PIPES + i % cap
+            pipe_left, pipe_top = s[slot], s[slot + cap]
+            if pipe_left >= bird_right:
+                break
+            if pipe_left + PIPE_WIDTH <= bird_left:
+                continue
+            # vertical overlap with pipes (true if bird is above bottom of top pipe OR below top of bottom pipe)
+            if (bird_top < pipe_top) or (bird_bottom > pipe_top + PIPE_GAP):
+                return True
+        return False
+
+    def apply_collisions(self):
+        """Mark crashed birds dead and end the round on the first crash."""
+        s = self._s
+        if s[_P_ALIVE] and self.check_collision(BIRD_X, s[_P_Y]):
+            s[_P_ALIVE] = 0.0
+            self.end_time = time.time()
+        if s[_A_ALIVE] and self.check_collision(AI_BIRD_X, s[_A_Y]):
+            s[_A_ALIVE] = 0.0
+            self.end_time = time.time()
+
+
+def new_game(seed=None, pipe_spacing=PIPE_SPACING):
+    return GameState(seed, pipe_spacing)
@@ -0,0 +1,127 @@
+# gen_data.py
+# Headless synthetic training data, generated across a process pool.
+#
+# Every worker runs a BatchSim (the player_vs_ai rules, see sim_engine.py)
+# uncapped, driven by a noisy version of the gap-center heuristic, and
+# writes the same columns as record_game.py (7 features + action). Each row
+# holds the features the policy saw before a tick and the action it took on
+# them, which is how the game's AI uses the model: it decides each tick
+# from the state before that tick.
+# Output is one shard per worker, in generated/ by default: CSV (which
+# ingest.py merges from there) or .fcol.
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from columnar_dataset import FEATURES, LABEL, create_dataset
+from ingest import GENERATED_DIR
+from sim_engine import BatchSim
+from stream_recorder import StreamingRecorder
+
+OUT_DIR = GENERATED_DIR
+
+
+def noisy_expert(sim, rng, margin=0.0, margin_noise=15.0, epsilon=0.02):
+    """Gap-center heuristic with a per-frame jittered margin and epsilon random flips."""
+    gap_center = (sim.pipe_top + sim.pipe_bottom) / 2.0
+    jitter = rng.normal(margin, margin_noise, size=sim.n) if margin_noise else margin
+    jump = sim.bird_y > gap_center + jitter
+    if epsilon:
+        flip = rng.random(sim.n) < epsilon
+        jump = np.where(flip, ~jump, jump)
+    return jump
+
+
+def generate_shard(spec):
+    """Worker entry point: stream spec['frames'] labeled rows into one shard file."""
+    seed, frames, lanes, out_path, fmt = spec["seed"], spec["frames"], spec["lanes"], spec["out"], spec["format"]
+    rng = np.random.default_rng(seed)
+    sim = BatchSim(lanes, seed=seed)
+    if fmt == "fcol":
+        block, labels = create_dataset(out_path, frames, FEATURES, meta={"generator": "gen_data", "seed": seed})
+    else:
+        if os.path.exists(out_path):
+            os.remove(out_path)  # shards are regenerated, never resumed
+        recorder = StreamingRecorder(out_path, chunk_size=65536, header=FEATURES + [LABEL])
+    n = 0
+    episodes = 0
+    jumps = 0
+    while n < frames:
+        feats = sim.features()
+        jump = noisy_expert(sim, rng, spec["margin"], spec["margin_noise"], spec["epsilon"])
+        rows = np.flatnonzero(sim.alive)[:frames - n]
+        if fmt == "fcol":
+            block[:, n:n + len(rows)] = feats[rows].T
+            labels[n:n + len(rows)] = jump[rows]
+        else:
+            recorder.extend(feats[rows], jump[rows])
+        jumps += int(jump[rows].sum())
+        n += len(rows)
+        sim.step(jump)
+        # restart finished (or overly long) episodes so every lane keeps producing
+        done = ~sim.alive | (sim.frames >= spec["max_episode_frames"])
+        if done.any():
+            episodes += int(done.sum())
+            sim.reset(done)
+
+    if fmt == "fcol":
+        if isinstance(block, np.memmap):
+            block.flush()
+            labels.flush()
+    else:
+        recorder.close()
+    return out_path, n, episodes, jumps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate labeled frames with a scripted expert, in parallel.")
+    parser.add_argument("--frames", type=int, default=1_000_000, help="total rows to generate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lanes", type=int, default=1024, help="games stepped together per worker")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--margin", type=float, default=0.0, help="heuristic margin below gap center")
+    parser.add_argument("--margin-noise", type=float, default=15.0, help="std-dev of per-frame margin jitter")
+    parser.add_argument("--epsilon", type=float, default=0.02, help="probability of flipping the expert action")
+    parser.add_argument("--max-episode-frames", type=int, default=20000)
+    parser.add_argument("--format", choices=["csv", "fcol"], default="csv")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    per_worker = -(-args.frames // args.workers)
+    specs = []
+    remaining = args.frames
+    for i in range(args.workers):
+        frames = min(per_worker, remaining)
+        if frames <= 0:
+            break
+        remaining -= frames
+        specs.append({
+            "seed": args.seed * 10007 + i,
+            "frames": frames,
+            "lanes": args.lanes,
+            "margin": args.margin,
+            "margin_noise": args.margin_noise,
+            "epsilon": args.epsilon,
+            "max_episode_frames": args.max_episode_frames,
+            "format": args.format,
+            "out": os.path.join(args.out_dir, f"synthetic_s{args.seed}_{i:03d}.{args.format}"),
+        })
+
+    start = time.perf_counter()
+    with mp.Pool(len(specs)) as pool:
+        results = pool.map(generate_shard, specs)
+    elapsed = time.perf_counter() - start
+
+    total = sum(r[1] for r in results)
+    jumps = sum(r[3] for r in results)
+    episodes = sum(r[2] for r in results)
+    print(f"Generated {total} rows ({jumps} jumps, {episodes} episodes) in {elapsed:.1f}s "
+          f"({total / elapsed:,.0f} rows/s) -> {args.out_dir}/")
+
+
+if __name__ == "__main__":
+    main()
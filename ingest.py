@@ -0,0 +1,154 @@
+# ingest.py
+# Merge every gameplay recording in a directory into one training dataset.
+#
+# Recordings are the recorder CSVs in the directory and in its generated/
+# subdirectory, where gen_data.py writes its shards. Each CSV is normalized (legacy 5-column files get distance_to_pipe,
+# gap_center and gap_size derived) and converted to a columnar .fcol file
+# once, cached under its SHA-256 content hash. Re-running only parses files
+# that are new or changed; unchanged inputs are reused straight from the
+# cache, and the merged dataset itself is reused when no input changed.
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from columnar_dataset import FEATURES, LABEL, convert_csv, create_dataset, open_dataset
+
+CACHE_DIR = ".ingest_cache"
+GENERATED_DIR = "generated"  # gen_data.py's default output, relative to the data directory
+MANIFEST = "manifest.json"
+
+
+def file_sha256(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def is_recording(path):
+    """True if the CSV header looks like a recorder file (has an action column)."""
+    try:
+        with open(path, "r", newline="") as f:
+            header = f.readline().strip().split(",")
+    except OSError:
+        return False
+    return LABEL in header and "bird_y" in header
+
+
+def find_recordings(data_dir, pattern="*.csv"):
+    """Recorder CSVs in data_dir and in data_dir/generated."""
+    paths = glob.glob(os.path.join(data_dir, pattern)) + glob.glob(os.path.join(data_dir, GENERATED_DIR, pattern))
+    return sorted(p for p in paths if is_recording(p))
+
+
+def _load_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"files": {}, "merged": None}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: ignoring unreadable ingest manifest: {e}")
+        return {"files": {}, "merged": None}
+
+
+def _save_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _content_hash(path, known):
+    """Reuse the recorded hash when size and mtime are unchanged; otherwise rehash."""
+    st = os.stat(path)
+    if known and known.get("size") == st.st_size and known.get("mtime") == st.st_mtime:
+        return known["sha256"]
+    return file_sha256(path)
+
+
+def merge_datasets(parts, out_path):
+    """Concatenate cached .fcol files into one (binary copy, no parsing)."""
+    datasets = [open_dataset(p) for p in parts]
+    total = sum(len(d) for d in datasets)
+    block, labels = create_dataset(out_path, total, FEATURES, meta={"parts": [os.path.basename(p) for p in parts]})
+    pos = 0
+    for d in datasets:
+        n = len(d)
+        for i, col in enumerate(FEATURES):
+            block[i, pos:pos + n] = d.column(col)
+        labels[pos:pos + n] = d.y
+        pos += n
+    if isinstance(block, np.memmap):
+        block.flush()
+        labels.flush()
+    return out_path
+
+
+def ingest(data_dir=".", cache_dir=CACHE_DIR, pattern="*.csv"):
+    """Build (or reuse) the merged dataset for every recording in data_dir; returns its path."""
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+    known_files = manifest.get("files", {})
+    recordings = find_recordings(data_dir, pattern)
+    if not recordings:
+        raise SystemExit(f"No recordings found in {data_dir!r}. Run record_game.py or gen_data.py first.")
+
+    files = {}
+    parts = []
+    converted = reused = 0
+    for path in recordings:
+        key = os.path.abspath(path)
+        digest = _content_hash(path, known_files.get(key))
+        cached = os.path.join(cache_dir, f"{digest}.fcol")
+        if not os.path.exists(cached):
+            print(f"Ingesting {path}")
+            # convert under a temp name so a failed run never leaves a bad cache entry
+            tmp = cached + ".tmp"
+            convert_csv([path], tmp)
+            os.replace(tmp, cached)
+            converted += 1
+        else:
+            reused += 1
+        st = os.stat(path)
+        files[key] = {"sha256": digest, "size": st.st_size, "mtime": st.st_mtime, "rows": len(open_dataset(cached))}
+        parts.append(cached)
+
+    merged_key = hashlib.sha256("\n".join(os.path.basename(p) for p in parts).encode()).hexdigest()[:16]
+    merged = os.path.join(cache_dir, f"merged-{merged_key}.fcol")
+    if not os.path.exists(merged):
+        # merge under a temp name too: only a complete file may ever sit at the merged path
+        tmp = merged + ".tmp"
+        merge_datasets(parts, tmp)
+        os.replace(tmp, merged)
+        # drop stale merged files, cached parts no longer referenced and leftovers of crashed runs
+        keep = {os.path.basename(p) for p in parts} | {os.path.basename(merged), MANIFEST}
+        for name in os.listdir(cache_dir):
+            if name.endswith((".fcol", ".fcol.tmp")) and name not in keep:
+                os.remove(os.path.join(cache_dir, name))
+
+    manifest = {"files": files, "merged": os.path.basename(merged)}
+    _save_manifest(cache_dir, manifest)
+    rows = sum(f["rows"] for f in files.values())
+    print(f"Ingested {len(parts)} file(s): {converted} converted, {reused} from cache, {rows} rows -> {merged}")
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge all gameplay recordings into one cached training dataset.")
+    parser.add_argument("data_dir", nargs="?", default=".", help="directory with recorder CSVs (its generated/ subdirectory is included)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--pattern", default="*.csv", help="glob for recording files")
+    args = parser.parse_args(argv)
+    ingest(args.data_dir, args.cache_dir, args.pattern)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# lookahead.py
+# The "expert" AI: a bounded lookahead search with the real game physics.
+#
+# Each tick the planner searches jump/glide sequences for the AI bird up to
+# `horizon` ticks ahead. The pipes don't depend on what the bird does, so a
+# scout clone of the match (GameState.copy) is stepped ahead once per tick
+# with GameState.step and records, for every future tick, the band of bird
+# heights that doesn't collide. The search then only replays the bird's
+# update (same constants, same float operations as GameState.step) against
+# those bands. A branch is pruned the moment the bird collides, visited
+# (tick, height, velocity) states are memoized, and the search stops at a
+# hard deadline (per decision and per rendered frame), then plays the best
+# move found so far, or the gap-center heuristic if no branch finished.
+# Running the scout ahead counts against the same deadline; if it runs
+# out, the search looks only as far as the scout got.
+#
+#   python player_vs_ai.py --difficulty expert
+#   python lookahead.py --games 50      # headless survival + compute use
+import argparse
+import time
+from collections import deque
+
+from game_core import AI_BIRD_X, BIRD_RADIUS, GRAVITY, HEIGHT, JUMP, PIPE_GAP, PIPE_WIDTH, new_game
+
+EXPERT_HORIZON = 90          # ticks: two seconds of game at 45 ticks/s
+EXPERT_BUDGET_MS = 4.0       # per decision
+EXPERT_FRAME_BUDGET_MS = 8.0  # for all decisions in one rendered frame (of the 22 ms at 45 FPS)
+CHECK_EVERY = 8              # nodes between deadline checks (a node is ~2 us)
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _glide(game):
+    return False
+
+
+def _band(game):
+    """[lowest safe top edge, highest safe bottom edge, gap center ahead, next gate, memo] for the AI bird at this tick.
+
+    The next gate (the tick the bird enters the next pipe) is filled in by the planner.
+    """
+    lo, hi = 0.0, float(HEIGHT)
+    bird_left, bird_right = AI_BIRD_X - BIRD_RADIUS, AI_BIRD_X + BIRD_RADIUS
+    for pipe_x, pipe_top in game.pipes():
+        if pipe_x >= bird_right:
+            break
+        if pipe_x + PIPE_WIDTH > bird_left:
+            lo, hi = max(lo, pipe_top), min(hi, pipe_top + PIPE_GAP)
+    return [lo, hi, game.nearest_pipe(AI_BIRD_X)[1] + PIPE_GAP / 2.0, None, {}]
+
+
+class LookaheadPlanner:
+    """Chooses the AI's jump for a GameState by depth-first search over future ticks."""
+
+    def __init__(self, horizon=EXPERT_HORIZON, budget_ms=EXPERT_BUDGET_MS,
+                 frame_budget_ms=EXPERT_FRAME_BUDGET_MS, clock=time.perf_counter):
+        self.horizon = int(horizon)
+        self.budget = budget_ms / 1000.0
+        self.frame_budget = frame_budget_ms / 1000.0
+        self._clock = clock
+        self._frame_deadline = None
+        self._deadline = 0.0
+        # scout clone of the match and the bands of the ticks it has run through; each
+        # band carries the memo of that tick's visited states, dropped with the band:
+        # complex(bird_y, velocity) -> last tick survived (negated if the bird survived
+        # the horizon it was searched with). Both are exact floats of deterministic
+        # physics, so an entry is only ever reused for the very same state; a complex
+        # key, unlike a tuple, isn't tracked by the GC, so searching never triggers a
+        # collection that would overrun the deadline.
+        self._scout = None
+        self._bands = deque()
+        self._first_band = 0  # tick of self._bands[0]
+        self._match = None
+        self._reach = 0  # furthest tick reached by the branch being searched
+        # counters (read with stats())
+        self.decisions = 0
+        self.nodes = 0
+        self.memo_hits = 0
+        self.pruned = 0
+        self.bounded = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.frames = 0
+        self.max_frame_time = 0.0
+        self._frame_time = 0.0
+
+    def begin_frame(self):
+        """Start a rendered frame: the decisions made until the next call share frame_budget."""
+        self.max_frame_time = max(self.max_frame_time, self._frame_time)
+        self._frame_time = 0.0
+        self.frames += 1
+        self._frame_deadline = self._clock() + self.frame_budget
+
+    def _sync(self, game):
+        """Point the scout at this match and run it `horizon` ticks ahead of it."""
+        match = (game.seed, game.pipe_spacing)
+        tick = game.tick
+        if match != self._match or not self._first_band <= tick + 1 <= self._first_band + len(self._bands):
+            self._match = match
+            self._scout = game.copy()
+            self._scout.player_alive = self._scout.ai_alive = False
+            self._bands.clear()
+            self._first_band = tick + 1
+        while self._first_band < tick + 1:
+            self._bands.popleft()
+            self._first_band += 1
+        bands = self._bands
+        while len(bands) < self.horizon:
+            if self._clock() > self._deadline:
+                self.timeouts += 1
+                break
+            self._scout.step(_glide)
+            band = _band(self._scout)
+            # the first tick of a pipe is the gate for every earlier tick still waiting for one
+            if (band[0] > 0 or band[1] < HEIGHT) and not (bands and (bands[-1][0] > 0 or bands[-1][1] < HEIGHT)):
+                gate = self._first_band + len(bands)
+                for earlier in reversed(bands):
+                    if earlier[3] is not None:
+                        break
+                    earlier[3] = gate
+            bands.append(band)
+
+    def decide(self, game):
+        start = self._clock()
+        self._deadline = start + self.budget
+        if self._frame_deadline is not None:
+            self._deadline = min(self._deadline, self._frame_deadline)
+        self.decisions += 1
+        action = self._search(game)
+
+        elapsed = self._clock() - start
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self._frame_time += elapsed
+        return action
+
+    def _search(self, game):
+        self._sync(game)
+
+        tick, y, v = game.tick, game.a_bird_y, game.a_velocity
+        target = tick + len(self._bands)
+        if self._bands:
+            center = self._bands[0][2]
+        else:
+            center = game.nearest_pipe(AI_BIRD_X)[1] + PIPE_GAP / 2.0
+        order = (True, False) if y > center else (False, True)
+        best_action, best_value = None, -1
+        for action in order if self._bands else ():
+            # on a timeout, judge the unfinished branch by the furthest tick it reached
+            self._reach = tick
+            try:
+                value = self._branch(tick, y, v, action, target)
+            except _Timeout:
+                self.timeouts += 1
+                if self._reach > max(best_value, tick):
+                    best_action, best_value = action, self._reach
+                break
+            if value > best_value:
+                best_action, best_value = action, value
+            if value >= target:
+                break
+        if best_action is None:
+            self.fallbacks += 1
+            best_action = order[0]
+        return best_action
+
+    def _branch(self, tick, y, v, action, target):
+        """Last tick survived after taking action at this tick (target if the whole horizon is survived)."""
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and self._clock() > self._deadline:
+            raise _Timeout
+        # the AI half of GameState.step, then its collision test against this tick's band
+        v = (JUMP if action else v) + GRAVITY
+        y = y + v
+        tick += 1
+        lo, hi, center, gate, memo = self._bands[tick - self._first_band]
+        if y - BIRD_RADIUS <= 0 or y + BIRD_RADIUS >= HEIGHT or y - BIRD_RADIUS < lo or y + BIRD_RADIUS > hi:
+            self.pruned += 1
+            return tick - 1
+        if gate is not None and gate <= target:
+            # can't reach the next gap even by flapping every tick / never flapping: dead before the gate
+            k = gate - tick
+            gate_lo, gate_hi = self._bands[gate - self._first_band][:2]
+            if (y + k * v + GRAVITY / 2 * k * (k + 1) < gate_lo + BIRD_RADIUS - 1e-6
+                    or y + k * (JUMP + GRAVITY) > gate_hi - BIRD_RADIUS + 1e-6):
+                self.bounded += 1
+                return gate - 1
+        if tick > self._reach:
+            self._reach = tick
+        if tick >= target:
+            return target
+        key = complex(y, v)
+        hit = memo.get(key)
+        # a death is final; a survival only counts if it reached this search's horizon
+        if hit is not None and (hit > 0 or -hit >= target):
+            self.memo_hits += 1
+            return min(abs(hit), target)
+        best = -1
+        for child in ((True, False) if y > center else (False, True)):
+            best = max(best, self._branch(tick, y, v, child, target))
+            if best >= target:
+                break
+        memo[key] = best if best < target else -best
+        return best
+
+    def stats(self):
+        n = self.decisions
+        return {
+            "decisions": n,
+            "nodes": self.nodes,
+            "nodes_per_decision": self.nodes / n if n else 0.0,
+            "memo_hits": self.memo_hits,
+            "pruned": self.pruned,
+            "bounded": self.bounded,
+            "timeouts": self.timeouts,
+            "fallbacks": self.fallbacks,
+            "mean_ms": 1000.0 * self.total_time / n if n else 0.0,
+            "max_ms": 1000.0 * self.max_time,
+            "max_frame_ms": 1000.0 * max(self.max_frame_time, self._frame_time),
+        }
+
+    def report(self):
+        s = self.stats()
+        print(f"Lookahead AI: {s['decisions']} decisions, {s['nodes_per_decision']:.0f} nodes each, "
+              f"{s['memo_hits']} memo hits, {s['pruned']} pruned + {s['bounded']} bounded, {s['timeouts']} timeouts "
+              f"({s['fallbacks']} heuristic fallbacks), search mean {s['mean_ms']:.2f} ms / max {s['max_ms']:.2f} ms, "
+              f"max {s['max_frame_ms']:.2f} ms per frame")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play the lookahead AI in headless matches and report compute use.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--horizon", type=int, default=EXPERT_HORIZON)
+    parser.add_argument("--budget-ms", type=float, default=EXPERT_BUDGET_MS)
+    parser.add_argument("--max-ticks", type=int, default=20000, help="stop a match after this many ticks")
+    args = parser.parse_args(argv)
+
+    planner = LookaheadPlanner(args.horizon, args.budget_ms)
+    scores, ticks = [], []
+    for i in range(args.games):
+        game = new_game(args.seed + i)
+        game.player_alive = False
+        while game.ai_alive and game.tick < args.max_ticks:
+            planner.begin_frame()  # one tick per frame, like --sim-speed 0
+            game.step(planner.decide)
+            game.ai_alive = not game.check_collision(AI_BIRD_X, game.a_bird_y)
+        scores.append(game.score)
+        ticks.append(game.tick)
+    capped = sum(t >= args.max_ticks for t in ticks)
+    print(f"{args.games} matches: mean score {sum(scores) / len(scores):.1f}, mean {sum(ticks) / len(ticks):.0f} ticks "
+          f"({capped} reached the {args.max_ticks}-tick cap)")
+    planner.report()
+
+
+if __name__ == "__main__":
+    main()
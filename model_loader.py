@@ -0,0 +1,147 @@
+# model_loader.py
+# Loads the AI model once, lazily, off the main thread.
+#
+# TensorFlow and joblib are only imported inside the loader, so importing
+# the game (and opening its window) no longer waits on them. The game serves
+# the heuristic AI until `ModelLoader.ready` is set.
+import threading
+import time
+
+from numpy_mlp import BUNDLE_FILE, MODEL_FILE, SCALER_FILE, load_bundle
+
+
+def _timed(timings, key, fn):
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        if timings is not None:
+            timings[key] = time.perf_counter() - start
+
+
+def _import_load_model():
+    """Import `load_model` from TensorFlow, falling back to standalone Keras (None if neither)."""
+    try:
+        from tensorflow.keras.models import load_model
+    except Exception:
+        try:
+            from keras.models import load_model
+        except Exception:
+            load_model = None
+    return load_model
+
+
+def load_model_and_scaler(force_no_model=False, timings=None, use_bundle=True):
+    """Return (mlp, model, scaler); any of them may be None (graceful fallback to the heuristic).
+
+    Prefers the NumPy bundle (unless use_bundle is False); only imports
+    TensorFlow/joblib when it is missing.
+    """
+    if force_no_model:
+        print("Info: model loading skipped (--no-model, table backend or expert difficulty).")
+        return None, None, None
+
+    # NumPy bundle needs neither TensorFlow nor joblib (see numpy_mlp.py)
+    if use_bundle:
+        mlp = _timed(timings, "bundle_load", lambda: load_bundle(BUNDLE_FILE))
+        if mlp is not None:
+            print(f"Info: using NumPy inference bundle '{BUNDLE_FILE}'.")
+            return mlp, None, None
+
+    load_model = _timed(timings, "tf_import", _import_load_model)
+    if load_model is None:
+        print("Info: Keras/TensorFlow not available; using heuristic AI.")
+        return None, None, None
+    model = None
+    try:
+        model = _timed(timings, "model_load", lambda: load_model(MODEL_FILE))
+    except FileNotFoundError:
+        print(f"Warning: model file '{MODEL_FILE}' not found — falling back to heuristic AI.")
+    except Exception as e:
+        print(f"Warning: failed to load model: {e}\nFalling back to heuristic AI.")
+
+    scaler = None
+    try:
+        import joblib
+    except Exception:
+        print("Warning: joblib not installed; scaler cannot be loaded — heuristic AI will be used.")
+        return None, model, None
+    try:
+        scaler = _timed(timings, "scaler_load", lambda: joblib.load(SCALER_FILE))
+    except FileNotFoundError:
+        print(f"Warning: scaler file '{SCALER_FILE}' not found — heuristic AI will be used.")
+    except Exception as e:
+        print(f"Warning: failed to load scaler: {e}\nHeuristic AI will be used.")
+    return None, model, scaler
+
+
+def make_predictor(mlp, model, scaler):
+    """Return predict(feats) -> jump probability, or None when only the heuristic is available."""
+    if mlp is not None:
+        return lambda feats: mlp.predict_proba(feats)[0]
+    if model is not None and scaler is not None:
+        return lambda feats: model.predict(scaler.transform(feats.reshape(1, -1)), verbose=0)[0][0]
+    return None
+
+
+def make_batch_predictor(mlp, model, scaler, batch_size=8192):
+    """Return predict(X) -> (N,) jump probabilities for raw (N, 7) feature rows, or None."""
+    if mlp is not None:
+        return mlp.predict_proba
+    if model is not None and scaler is not None:
+        return lambda X: model.predict(scaler.transform(X), batch_size=batch_size, verbose=0)[:, 0]
+    return None
+
+
+class ModelLoader:
+    """Runs load_model_and_scaler on a daemon thread; poll `ready` from the game loop."""
+
+    def __init__(self, force_no_model=False):
+        self.force_no_model = force_no_model
+        self.timings = {}
+        self.mlp = None
+        self.model = None
+        self.scaler = None
+        self.predictor = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.mlp, self.model, self.scaler = load_model_and_scaler(self.force_no_model, self.timings)
+            self.predictor = make_predictor(self.mlp, self.model, self.scaler)
+        except Exception as e:
+            print(f"Warning: model loading failed: {e}\nFalling back to heuristic AI.")
+        finally:
+            self.timings["model_total"] = time.perf_counter() - self._started_at
+            self._ready.set()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+
+def format_startup_report(timings):
+    """One-line breakdown of startup timings (seconds in, milliseconds out)."""
+    order = [
+        ("import", "imports"),
+        ("assets", "assets"),
+        ("first_frame", "first frame"),
+        ("bundle_load", "bundle load"),
+        ("tf_import", "TF import"),
+        ("model_load", "model load"),
+        ("scaler_load", "scaler load"),
+        ("model_total", "model ready"),
+    ]
+    parts = [f"{label} {1000.0 * timings[key]:.0f} ms" for key, label in order if key in timings]
+    return "Startup timing: " + " | ".join(parts)
@@ -0,0 +1,150 @@
+# numpy_mlp.py
+# Pure-NumPy inference for the trained Keras MLP.
+#
+# `export_bundle` pulls the Dense weights out of tf_model.h5 and the
+# mean/scale out of scaler.joblib and writes them to one .npz file.
+# `NumpyMLP` runs the same forward pass with plain NumPy, so the game can
+# make AI decisions without importing TensorFlow or joblib.
+import argparse
+import os
+
+import numpy as np
+
+MODEL_FILE = "tf_model.h5"
+SCALER_FILE = "scaler.joblib"
+BUNDLE_FILE = "tf_model.npz"
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0, out=x),
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "tanh": np.tanh,
+}
+
+
+def _load_keras(model_path):
+    try:
+        from tensorflow.keras.models import load_model
+    except Exception:
+        from keras.models import load_model
+    return load_model(model_path)
+
+
+def _dense_layers(model):
+    """Yield (kernel, bias, activation name) for every Dense layer; Dropout is skipped."""
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in ("Dropout", "InputLayer"):
+            continue
+        if kind != "Dense":
+            raise ValueError(f"unsupported layer type for NumPy export: {kind}")
+        kernel, bias = layer.get_weights()
+        activation = layer.get_config().get("activation", "linear")
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"unsupported activation for NumPy export: {activation}")
+        yield kernel, bias, activation
+
+
+def export_bundle(model=MODEL_FILE, scaler=SCALER_FILE, out_path=BUNDLE_FILE):
+    """Write scaler mean/scale and Dense weights to a single .npz bundle.
+
+    model and scaler may be file paths or already-loaded objects.
+    """
+    if isinstance(model, str):
+        model = _load_keras(model)
+    if isinstance(scaler, str):
+        import joblib
+        scaler = joblib.load(scaler)
+
+    kernels, biases, activations = zip(*_dense_layers(model))
+    save_bundle(out_path, scaler.mean_, scaler.scale_, kernels, biases, activations)
+    print(f"Exported {len(activations)} Dense layers + scaler to {out_path}")
+    return out_path
+
+
+def save_bundle(out_path, mean, scale, weights, biases, activations):
+    """Write a bundle from raw arrays (scaler mean/scale, per-layer kernel/bias/activation)."""
+    arrays = {
+        "scaler_mean": np.asarray(mean, dtype=np.float64),
+        "scaler_scale": np.asarray(scale, dtype=np.float64),
+    }
+    for i, (kernel, bias) in enumerate(zip(weights, biases)):
+        arrays[f"W{i}"] = np.asarray(kernel, dtype=np.float32)
+        arrays[f"b{i}"] = np.asarray(bias, dtype=np.float32)
+    arrays["activations"] = np.array(list(activations))
+    np.savez(out_path, **arrays)
+    return out_path
+
+
+class NumpyMLP:
+    """Forward pass of the exported MLP (scaler included)."""
+
+    def __init__(self, mean, scale, weights, biases, activations):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = [ACTIVATIONS[a] for a in activations]
+        self.activation_names = list(activations)
+
+    @classmethod
+    def load(cls, path=BUNDLE_FILE):
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data["activations"]]
+            n = len(activations)
+            return cls(
+                data["scaler_mean"], data["scaler_scale"],
+                [data[f"W{i}"] for i in range(n)],
+                [data[f"b{i}"] for i in range(n)],
+                activations,
+            )
+
+    @property
+    def input_dim(self):
+        return self.weights[0].shape[0]
+
+    def predict_proba(self, X):
+        """Jump probability for raw (unscaled) feature rows; returns shape (N,)."""
+        x = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        x = ((x - self.mean) / self.scale).astype(np.float32)
+        for w, b, act in zip(self.weights, self.biases, self.activations):
+            x = act(x @ w + b)
+        return x[:, 0]
+
+
+def load_bundle(path=BUNDLE_FILE):
+    """Load the NumPy bundle, or return None (with a warning) if it is unusable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return NumpyMLP.load(path)
+    except Exception as e:
+        print(f"Warning: failed to load NumPy bundle '{path}': {e}")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export tf_model.h5 + scaler.joblib for NumPy inference.")
+    parser.add_argument("--model", default=MODEL_FILE)
+    parser.add_argument("--scaler", default=SCALER_FILE)
+    parser.add_argument("--out", default=BUNDLE_FILE)
+    parser.add_argument("--check", type=int, default=1000, metavar="N",
+                        help="compare against Keras on N random rows (0 to skip)")
+    args = parser.parse_args(argv)
+
+    import joblib
+    model = _load_keras(args.model)
+    scaler = joblib.load(args.scaler)
+    export_bundle(model, scaler, args.out)
+
+    if args.check:
+        mlp = NumpyMLP.load(args.out)
+        rng = np.random.default_rng(0)
+        X = scaler.mean_ + rng.standard_normal((args.check, mlp.input_dim)) * scaler.scale_
+        expected = model.predict(scaler.transform(X), verbose=0)[:, 0]
+        got = mlp.predict_proba(X)
+        print(f"Max |keras - numpy| over {args.check} rows: {np.max(np.abs(expected - got)):.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,24 @@
 # player_vs_ai_tf.py
+import time
+_import_start = time.perf_counter()
 import pygame
-import random
-try:
-    import joblib
-except Exception:
-    joblib = None
-    print("Warning: 'joblib' not available. Install it with: venv\\Scripts\\python.exe -m pip install joblib")
 import numpy as np
-import os
-import json
-# Try importing `load_model` from TensorFlow first, fall back to standalone Keras.
-try:
-    from tensorflow.keras.models import load_model
-except Exception:
-    try:
-        from keras.models import load_model
-    except Exception:
-        load_model = None  # changed: don't raise here, handle later
-import time
 import argparse
 import sys
+from ai_worker import AIDecisionWorker
+from model_loader import ModelLoader, load_model_and_scaler, make_predictor as _make_predictor, format_startup_report
+from render_cache import SpriteCache, FontRegistry, TextCache
+from score_store import ScoreStore
+from profiler import FrameProfiler
+from timestep import FixedTimestep, TICK_RATE, lerp
+from dirty_rects import DirtyRectRenderer
+from policy_table import TABLE_FILE, load_table
+from game_core import new_game, AI_BIRD_X, PIPE_SPACING, MIN_PIPE_SPACING
+from replay import REPLAY_DIR, save_replay
+from lookahead import LookaheadPlanner, EXPERT_BUDGET_MS
+# startup timing breakdown (seconds); model timings are added by the background loader
+startup_timings = {"import": time.perf_counter() - _import_start}
+_assets_start = time.perf_counter()
 pygame.init()
 SCREEN_WIDTH = 500
 SCREEN_HEIGHT = 700
@@ -39,57 +38,37 @@ flame_img = pygame.transform.scale(flame_img, (60, 300))  # adjust size
 
 # use flame as pipe image
 pipe_img = flame_img
+# scaled/flipped pipe surfaces, built once per pipe height instead of every frame
+pipe_cache = SpriteCache(pipe_img) if pipe_img is not None else None
 
 
 
 BIRD_X = 50
-GRAVITY = 0.4
-JUMP = -7
 PIPE_GAP = 150
 PIPE_WIDTH = 60
-PIPE_SPEED =5
-# AI difficulty: 'easy', 'normal', 'hard'
+# AI difficulty: 'easy', 'normal', 'hard', 'expert' (lookahead search, see lookahead.py)
 AI_DIFFICULTY = 'easy'
 
-# load model + scaler (graceful fallback if files are missing)
+# model + scaler are loaded lazily in a background thread (see model_loader.py);
+# the heuristic AI plays until they are ready
 model = None
 scaler = None
-try:
-    model = load_model("tf_model.h5")
-except FileNotFoundError:
-    print("Warning: model file 'tf_model.h5' not found — falling back to heuristic AI.")
-except Exception as e:
-    print(f"Warning: failed to load model: {e}\nFalling back to heuristic AI.")
-
-try:
-    scaler = joblib.load("scaler.joblib")
-except FileNotFoundError:
-    print("Warning: scaler file 'scaler.joblib' not found — heuristic AI will be used.")
-except Exception as e:
-    print(f"Warning: failed to load scaler: {e}\nHeuristic AI will be used.")
-
-def new_game():
-    return {
-        "p_bird_y": HEIGHT // 2,
-        "p_velocity": 0,
-        "a_bird_y": HEIGHT // 2,
-        "a_velocity": 0,
-        "pipe_x": WIDTH,
-        "pipe_top": random.randint(60, 350),
-        "player_alive": True,
-        "ai_alive": True,
-        "end_time": None,
-        # UI/game state
-        "started": False,
-        "paused": False,
-        "score": 0,
-        "pipe_passed": False,
-    }
-
-font = pygame.font.SysFont("Arial", 22)
-title_font = pygame.font.SysFont("Arial", 36, bold=True)
-name_font = pygame.font.SysFont("Arial", 20, bold=True)
-button_font = pygame.font.SysFont("Arial", 24, bold=True)
+mlp = None  # NumPy inference bundle (preferred over model + scaler when present)
+
+# every (face, size, bold) font is created once; rendered labels are cached
+fonts = FontRegistry()
+text_cache = TextCache()
+
+font = fonts.get("Arial", 22)
+title_font = fonts.get("Arial", 36, bold=True)
+name_font = fonts.get("Arial", 20, bold=True)
+button_font = fonts.get("Arial", 24, bold=True)
+
+def render_text(text, size, color, bold=False):
+    """Render text in Arial at the given size through the font registry and text cache."""
+    return text_cache.render(text, fonts.get("Arial", size, bold), color)
+
+startup_timings["assets"] = time.perf_counter() - _assets_start
 
 # ============================================================================
 # BUTTON CLASS FOR CLICK/TAP CONTROLS
@@ -111,7 +90,7 @@ class Button:
         pygame.draw.rect(surface, (255, 215, 0) if self.hover else (200, 200, 200), self.rect, 3)
         
         # Draw button text
-        text_surf = button_font.render(self.text, True, self.text_color)
+        text_surf = text_cache.render(self.text, button_font, self.text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
     
@@ -124,20 +103,17 @@ class Button:
         self.hover = self.rect.collidepoint(pos)
 
 def draw_outline_text(text, x, y, color):
-    for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:
-        surf = name_font.render(text, True, (0,0,0))
-        screen.blit(surf, (x+dx, y+dy))
-    surf = name_font.render(text, True, color)
-    screen.blit(surf, (x, y))
+    surf = text_cache.render_outline(text, name_font, color)
+    return screen.blit(surf, (x-1, y-1))
 
 def draw_text(text, y, color=(255,255,255)):
-    surf = font.render(text, True, color)
-    screen.blit(surf, (12, y))
+    surf = text_cache.render(text, font, color)
+    return screen.blit(surf, (12, y))
 
 def draw_center_text(text, y, color=(255,255,255)):
-    surf = title_font.render(text, True, color)
+    surf = text_cache.render(text, title_font, color)
     rect = surf.get_rect(center=(WIDTH//2, y))
-    screen.blit(surf, rect)
+    return screen.blit(surf, rect)
 
 def make_features(bird_y, pipe_top, pipe_bottom, pipe_x):
     distance_to_pipe = pipe_x - BIRD_X
@@ -146,6 +122,8 @@ def make_features(bird_y, pipe_top, pipe_bottom, pipe_x):
     return np.array([bird_y, pipe_top, pipe_bottom, pipe_x, distance_to_pipe, gap_center, gap_size], dtype=float)
 
 THRESHOLD = 0.5  # base threshold (adjusted by difficulty below)
+AI_DEADLINE_MS = 5.0  # max time a frame waits for the AI worker before using the heuristic
+FPS = 45
 
 # ============================================================================
 # HIGH SCORE MANAGEMENT FUNCTIONS
@@ -154,44 +132,24 @@ THRESHOLD = 0.5  # base threshold (adjusted by difficulty below)
 HIGHSCORES_FILE = "highscores.json"
 MAX_SCORES = 10
 
+# loaded once, kept sorted in memory, written to disk atomically in the background
+score_store = ScoreStore(HIGHSCORES_FILE, MAX_SCORES)
+
 def load_highscores():
-    """Load high scores from JSON file."""
-    if not os.path.exists(HIGHSCORES_FILE):
-        return []
-    try:
-        with open(HIGHSCORES_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Warning: Failed to load high scores: {e}")
-        return []
+    """Return the high scores (from memory after the first load)."""
+    return list(score_store.entries())
 
 def save_highscores(scores):
-    """Save high scores to JSON file."""
-    try:
-        with open(HIGHSCORES_FILE, 'w') as f:
-            json.dump(scores, f, indent=2)
-    except Exception as e:
-        print(f"Warning: Failed to save high scores: {e}")
+    """Replace the high scores and persist them to the JSON file."""
+    score_store.replace(scores)
 
 def add_score(name, score, stars=0):
     """Add a new score to the high scores list with stars, sorted and limited to top 10."""
-    scores = load_highscores()
-    scores.append({"name": name, "score": score, "stars": stars})
-    # Sort descending by score
-    scores.sort(key=lambda x: x["score"], reverse=True)
-    # Keep only top MAX_SCORES
-    scores = scores[:MAX_SCORES]
-    save_highscores(scores)
-    return scores
+    return score_store.add(name, score, stars)
 
 def get_rank_for_score(score):
     """Get the rank of a score if it would be in the high scores list."""
-    scores = load_highscores()
-    if len(scores) < MAX_SCORES:
-        return len(scores) + 1
-    if score > scores[-1]["score"]:
-        return len(scores)
-    return None
+    return score_store.rank_for_score(score)
 
 def calculate_stars(score):
     """Calculate star reward based on score (only if score > 0)."""
@@ -212,52 +170,99 @@ def calculate_stars(score):
 
 # changed: wrap main loop so running the file is safe and controlled via CLI
 def safe_load_model_and_scaler(force_no_model=False):
-    global model, scaler
-    model = None
-    scaler = None
-    if force_no_model:
-        print("Info: --no-model specified; using heuristic AI only.")
-        return
-    if load_model is None:
-        print("Info: Keras/TensorFlow not available; using heuristic AI.")
-        return
-    try:
-        model = load_model("tf_model.h5")
-    except FileNotFoundError:
-        print("Warning: model file 'tf_model.h5' not found — falling back to heuristic AI.")
-        model = None
-    except Exception as e:
-        print(f"Warning: failed to load model: {e}\nFalling back to heuristic AI.")
-        model = None
-
-    if joblib is None:
-        print("Warning: joblib not installed; scaler cannot be loaded — heuristic AI will be used.")
-        scaler = None
-    else:
-        try:
-            scaler = joblib.load("scaler.joblib")
-        except FileNotFoundError:
-            print("Warning: scaler file 'scaler.joblib' not found — heuristic AI will be used.")
-            scaler = None
-        except Exception as e:
-            print(f"Warning: failed to load scaler: {e}\nHeuristic AI will be used.")
-            scaler = None
-
-def main(argv=None):
-    global PIPE_SPEED, AI_DIFFICULTY
+    """Synchronously load the model globals (main() uses the background ModelLoader instead)."""
+    global model, scaler, mlp
+    mlp, model, scaler = load_model_and_scaler(force_no_model)
+
+def make_predictor():
+    """Return predict(feats) -> jump probability for the loaded model, or None for heuristic-only."""
+    return _make_predictor(mlp, model, scaler)
+
+def main(argv=None, frame_hook=None):
+    """Run the game. frame_hook(app_state, frame_seconds) is called after every frame
+    (used by bench.py); returning False from it ends the loop."""
+    global AI_DIFFICULTY
     parser = argparse.ArgumentParser(description="Player vs AI Flappy demo (safe mode).")
-    parser.add_argument("--difficulty", choices=["easy","normal","hard"], default="easy", help="AI difficulty")
+    parser.add_argument("--difficulty", choices=["easy","normal","hard","expert"], default="easy", help="AI difficulty")
     parser.add_argument("--no-model", action="store_true", help="Force heuristic AI (ignore tf_model.h5/scaler.joblib)")
     parser.add_argument("--auto-reset", action="store_true", help="Automatically restart after a crash (unsafe for manual testing)")
+    parser.add_argument("--ai-backend", choices=["model", "table"], default="model",
+                        help="model: MLP on a worker thread; table: precomputed lookup table (see policy_table.py)")
+    parser.add_argument("--policy-table", default=TABLE_FILE, help="Table file for --ai-backend table")
+    parser.add_argument("--expert-budget-ms", type=float, default=EXPERT_BUDGET_MS,
+                        help="Search time per decision for --difficulty expert")
+    parser.add_argument("--ai-deadline-ms", type=float, default=AI_DEADLINE_MS, help="Per-frame wait for the AI model, shared by the ticks of a frame, before reusing its last answer")
+    parser.add_argument("--fps", type=int, default=FPS, help="Frame rate cap (0 = uncapped)")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="Physics ticks per second of game time")
+    parser.add_argument("--sim-speed", type=float, default=1.0,
+                        help="Game-time multiplier (2 = twice real time; 0 = one tick per frame, as fast as frames render with --fps 0)")
+    parser.add_argument("--profile", action="store_true", help="Show the frame profiler overlay at startup (toggle with F3)")
+    parser.add_argument("--dirty-rects", action="store_true", help="Only redraw and update the screen regions that changed")
+    parser.add_argument("--pipe-spacing", type=float, default=PIPE_SPACING,
+                        help=f"Distance between consecutive pipes (default {PIPE_SPACING}: one pipe at a time)")
+    parser.add_argument("--seed", type=int, help="Pipe seed for every match (default: a fresh seed per match)")
+    parser.add_argument("--replay-dir", default=REPLAY_DIR, help="Where finished matches are saved for replay.py")
+    parser.add_argument("--no-replays", action="store_true", help="Don't save match replays")
+    parser.add_argument("--trace", metavar="FILE", help="Record per-section timings and write a Chrome trace JSON on exit")
     args = parser.parse_args(argv)
+    if args.pipe_spacing < MIN_PIPE_SPACING:
+        parser.error(f"--pipe-spacing must be at least {MIN_PIPE_SPACING}")
     AI_DIFFICULTY = args.difficulty
-    safe_load_model_and_scaler(force_no_model=args.no_model)
+    # the lookup table is a small file read once; it replaces the model entirely
+    policy_table = load_table(args.policy_table) if args.ai_backend == "table" and not args.no_model else None
+    if policy_table is not None:
+        print(f"Info: using policy table '{args.policy_table}' ({policy_table.kind}, {policy_table.nbytes // 1024} KiB).")
+    # the expert AI plays by searching the game itself; it needs no model
+    planner = LookaheadPlanner(budget_ms=args.expert_budget_ms) if AI_DIFFICULTY == "expert" else None
+    # load the model in the background so the menu is interactive right away
+    model_loader = ModelLoader(force_no_model=args.no_model or policy_table is not None or planner is not None).start()
+    ai_worker = None
+    ai_deadline = args.ai_deadline_ms / 1000.0
+    startup_reported = False
+    # per-frame section timings; F3 toggles the overlay
+    profiler = FrameProfiler(budget_ms=1000.0 / (args.fps or FPS), trace=bool(args.trace))
+    profiler.show_overlay = args.profile
+    overlay_font = fonts.get("monospace", 13)
+    timestep = FixedTimestep(args.tick_rate, speed=args.sim_speed)
+    renderer = DirtyRectRenderer(screen, background, enabled=args.dirty_rects)
+
+    def ai_jump(game):
+        """AI decision for one tick: model via the background worker, heuristic as fallback."""
+        profiler.lap("physics")
+        if planner is not None:
+            jump = planner.decide(game)
+            profiler.lap("ai")
+            return jump
+        # the AI looks at the nearest pipe it can still hit
+        pipe_x, pipe_top = game.nearest_pipe(AI_BIRD_X)
+        pipe_bottom = pipe_top + PIPE_GAP
+
+        # difficulty parameters
+        diff_threshold = {'easy': 0.8, 'normal': 0.5, 'hard': 0.35}.get(AI_DIFFICULTY, 0.5)
+        heuristic_margin = {'easy': 20.0, 'normal': 0.0, 'hard': -10.0}.get(AI_DIFFICULTY, 0.0)
+
+        # Ask the background worker for a decision; once the frame's wait budget is spent it
+        # repeats the model's last answer. If there is no model answer at all, use a simple heuristic: jump when bird is below gap center plus a margin.
+        prob = None
+        if policy_table is not None:
+            prob = policy_table.prob(game.a_bird_y, pipe_top, pipe_x)
+        elif ai_worker is not None:
+            feats = make_features(game.a_bird_y, pipe_top, pipe_bottom, pipe_x)
+            prob = ai_worker.decide(feats)
+        if prob is None:
+            gap_center = (pipe_top + pipe_bottom) / 2.0
+            jump = game.a_bird_y > gap_center + heuristic_margin
+        else:
+            jump = prob > diff_threshold
+        profiler.lap("ai")
+        return jump
 
     current_player_name = "Player"
     app_state = "menu"  # States: menu, name_input, game, game_over, high_scores
-    game = new_game()
-    PIPE_SPEED = 5
+    game = new_game(args.seed, args.pipe_spacing)
     running = True
+    # bird positions and distance scrolled at the previous physics tick, for interpolated drawing
+    prev = (game.p_bird_y, game.a_bird_y, game.scroll)
     
     # Text input for player name
     input_text = ""
@@ -279,54 +284,69 @@ def main(argv=None):
     
     try:
         while running:
-            clock.tick(45)
-            screen.blit(background, (0, 0))
+            if args.fps:
+                clock.tick(args.fps)
+            frame_start = time.perf_counter()
+            frame_state = app_state
+            profiler.begin_frame()
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                    renderer.invalidate()
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    renderer.invalidate()
+            if profiler.show_overlay:
+                renderer.invalidate()  # the overlay covers static content; redraw it all
+            profiler.lap("events")
+            # redraw: the whole scene must be drawn (always true without --dirty-rects);
+            # otherwise only moving things are drawn over their restored background
+            redraw = renderer.begin_frame((app_state, input_text) if app_state == "name_input" else app_state)
+            profiler.lap("sprites")
 
             # ================================================================
             # MENU SCREEN
             # ================================================================
             if app_state == "menu":
-                # Title with larger font
-                title_surf = pygame.font.SysFont("Arial", 56, bold=True).render("Flappy AI", True, (255, 215, 0))
-                title_rect = title_surf.get_rect(center=(WIDTH//2, 80))
-                screen.blit(title_surf, title_rect)
-                
-                # Separator line
-                pygame.draw.line(screen, (255, 215, 0), (40, 130), (WIDTH-40, 130), 2)
-                
                 # Get mouse position for hover effect
                 mouse_pos = pygame.mouse.get_pos()
                 btn_start.update_hover(mouse_pos)
                 btn_high_scores.update_hover(mouse_pos)
                 btn_change_name.update_hover(mouse_pos)
                 btn_quit.update_hover(mouse_pos)
-                
-                # Draw buttons
-                btn_start.draw(screen)
-                btn_high_scores.draw(screen)
-                btn_change_name.draw(screen)
-                btn_quit.draw(screen)
-                
-                # Bottom separator and player info
-                pygame.draw.line(screen, (255, 215, 0), (40, HEIGHT-70), (WIDTH-40, HEIGHT-70), 2)
-                
-                player_label = pygame.font.SysFont("Arial", 16).render("CURRENT PLAYER:", True, (200, 200, 200))
-                label_rect = player_label.get_rect(center=(WIDTH//2, HEIGHT-50))
-                screen.blit(player_label, label_rect)
-                
-                player_name_surf = pygame.font.SysFont("Arial", 28, bold=True).render(current_player_name, True, (100, 255, 100))
-                name_rect = player_name_surf.get_rect(center=(WIDTH//2, HEIGHT-20))
-                screen.blit(player_name_surf, name_rect)
-
-                for event in pygame.event.get():
+
+                if redraw:
+                    # Title with larger font
+                    title_surf = render_text("Flappy AI", 56, (255, 215, 0), bold=True)
+                    title_rect = title_surf.get_rect(center=(WIDTH//2, 80))
+                    screen.blit(title_surf, title_rect)
+
+                    # Separator line
+                    pygame.draw.line(screen, (255, 215, 0), (40, 130), (WIDTH-40, 130), 2)
+
+                    # Bottom separator and player info
+                    pygame.draw.line(screen, (255, 215, 0), (40, HEIGHT-70), (WIDTH-40, HEIGHT-70), 2)
+
+                    player_label = render_text("CURRENT PLAYER:", 16, (200, 200, 200))
+                    label_rect = player_label.get_rect(center=(WIDTH//2, HEIGHT-50))
+                    screen.blit(player_label, label_rect)
+
+                    player_name_surf = render_text(current_player_name, 28, (100, 255, 100), bold=True)
+                    name_rect = player_name_surf.get_rect(center=(WIDTH//2, HEIGHT-20))
+                    screen.blit(player_name_surf, name_rect)
+
+                # Draw buttons (in dirty-rect mode only those whose hover changed)
+                renderer.draw_buttons((btn_start, btn_high_scores, btn_change_name, btn_quit), redraw)
+
+                profiler.lap("text")
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                     # Handle mouse click
                     if event.type == pygame.MOUSEBUTTONDOWN:
                         if btn_start.is_clicked(event.pos):
                             app_state = "game"
-                            game = new_game()
-                            PIPE_SPEED = 5
+                            game = new_game(args.seed, args.pipe_spacing)
                         elif btn_high_scores.is_clicked(event.pos):
                             app_state = "high_scores"
                         elif btn_change_name.is_clicked(event.pos):
@@ -340,8 +360,7 @@ def main(argv=None):
                         touch_pos = (int(event.x * WIDTH), int(event.y * HEIGHT))
                         if btn_start.is_clicked(touch_pos):
                             app_state = "game"
-                            game = new_game()
-                            PIPE_SPEED = 5
+                            game = new_game(args.seed, args.pipe_spacing)
                         elif btn_high_scores.is_clicked(touch_pos):
                             app_state = "high_scores"
                         elif btn_change_name.is_clicked(touch_pos):
@@ -354,8 +373,7 @@ def main(argv=None):
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_s:
                             app_state = "game"
-                            game = new_game()
-                            PIPE_SPEED = 5
+                            game = new_game(args.seed, args.pipe_spacing)
                         elif event.key == pygame.K_h:
                             app_state = "high_scores"
                         elif event.key == pygame.K_q:
@@ -369,44 +387,46 @@ def main(argv=None):
             # NAME INPUT SCREEN
             # ================================================================
             elif app_state == "name_input":
-                # Title
-                title_surf = pygame.font.SysFont("Arial", 48, bold=True).render("Enter Player Name", True, (255, 215, 0))
-                title_rect = title_surf.get_rect(center=(WIDTH//2, 80))
-                screen.blit(title_surf, title_rect)
-                
-                # Separator line
-                pygame.draw.line(screen, (255, 215, 0), (40, 140), (WIDTH-40, 140), 2)
-                
-                # Input box with better styling
-                input_rect = pygame.Rect(WIDTH//2 - 130, 220, 260, 50)
-                pygame.draw.rect(screen, (50, 50, 50), input_rect)
-                pygame.draw.rect(screen, (255, 215, 0), input_rect, 3)
-                
-                # Render input text centered with smaller font to fit
-                input_surf = pygame.font.SysFont("Arial", 26).render(input_text[:20], True, (255, 255, 255))
-                input_text_rect = input_surf.get_rect(center=(input_rect.centerx, input_rect.centery))
-                screen.blit(input_surf, input_text_rect)
-                
-                # Cursor
-                cursor_x = input_text_rect.right + 5
-                pygame.draw.line(screen, (255, 255, 255), (cursor_x, input_rect.top + 10), (cursor_x, input_rect.bottom - 10), 2)
-                
-                # Instructions
-                instr1 = pygame.font.SysFont("Arial", 18).render("Type your name (max 20 characters)", True, (200, 200, 200))
-                instr1_rect = instr1.get_rect(center=(WIDTH//2, 330))
-                screen.blit(instr1, instr1_rect)
-                
-                # Confirm/Cancel instructions
-                confirm_surf = pygame.font.SysFont("Arial", 16, bold=True).render("[ENTER] Confirm  |  [ESC] Cancel", True, (100, 200, 100))
-                confirm_rect = confirm_surf.get_rect(center=(WIDTH//2, HEIGHT - 60))
-                screen.blit(confirm_surf, confirm_rect)
-                
-                # Character count
-                char_count = pygame.font.SysFont("Arial", 14).render(f"Characters: {len(input_text)}/20", True, (150, 150, 150))
-                char_rect = char_count.get_rect(center=(WIDTH//2, HEIGHT - 30))
-                screen.blit(char_count, char_rect)
-
-                for event in pygame.event.get():
+                if redraw:
+                    # Title
+                    title_surf = render_text("Enter Player Name", 48, (255, 215, 0), bold=True)
+                    title_rect = title_surf.get_rect(center=(WIDTH//2, 80))
+                    screen.blit(title_surf, title_rect)
+
+                    # Separator line
+                    pygame.draw.line(screen, (255, 215, 0), (40, 140), (WIDTH-40, 140), 2)
+
+                    # Input box with better styling
+                    input_rect = pygame.Rect(WIDTH//2 - 130, 220, 260, 50)
+                    pygame.draw.rect(screen, (50, 50, 50), input_rect)
+                    pygame.draw.rect(screen, (255, 215, 0), input_rect, 3)
+
+                    # Render input text centered with smaller font to fit
+                    input_surf = render_text(input_text[:20], 26, (255, 255, 255))
+                    input_text_rect = input_surf.get_rect(center=(input_rect.centerx, input_rect.centery))
+                    screen.blit(input_surf, input_text_rect)
+
+                    # Cursor
+                    cursor_x = input_text_rect.right + 5
+                    pygame.draw.line(screen, (255, 255, 255), (cursor_x, input_rect.top + 10), (cursor_x, input_rect.bottom - 10), 2)
+
+                    # Instructions
+                    instr1 = render_text("Type your name (max 20 characters)", 18, (200, 200, 200))
+                    instr1_rect = instr1.get_rect(center=(WIDTH//2, 330))
+                    screen.blit(instr1, instr1_rect)
+
+                    # Confirm/Cancel instructions
+                    confirm_surf = render_text("[ENTER] Confirm  |  [ESC] Cancel", 16, (100, 200, 100), bold=True)
+                    confirm_rect = confirm_surf.get_rect(center=(WIDTH//2, HEIGHT - 60))
+                    screen.blit(confirm_surf, confirm_rect)
+
+                    # Character count
+                    char_count = render_text(f"Characters: {len(input_text)}/20", 14, (150, 150, 150))
+                    char_rect = char_count.get_rect(center=(WIDTH//2, HEIGHT - 30))
+                    screen.blit(char_count, char_rect)
+
+                profiler.lap("text")
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                     if event.type == pygame.KEYDOWN:
@@ -430,118 +450,119 @@ def main(argv=None):
             # HIGH SCORES SCREEN
             # ================================================================
             elif app_state == "high_scores":
-                # Title
-                title_surf = pygame.font.SysFont("Arial", 52, bold=True).render("HIGH SCORES", True, (255, 215, 0))
-                title_rect = title_surf.get_rect(center=(WIDTH//2, 50))
-                screen.blit(title_surf, title_rect)
-                
-                # Separator line
-                pygame.draw.line(screen, (255, 215, 0), (40, 100), (WIDTH-40, 100), 2)
-                
-                scores = load_highscores()
-                
-                if not scores:
-                    no_scores = pygame.font.SysFont("Arial", 32).render("No scores yet!", True, (150, 150, 150))
-                    no_rect = no_scores.get_rect(center=(WIDTH//2, HEIGHT//2))
-                    screen.blit(no_scores, no_rect)
-                    
-                    hint = pygame.font.SysFont("Arial", 20).render("Start a game to see scores appear here", True, (100, 100, 100))
-                    hint_rect = hint.get_rect(center=(WIDTH//2, HEIGHT//2 + 60))
-                    screen.blit(hint, hint_rect)
-                else:
-                    # Header
-                    header_y = 130
-                    header_font = pygame.font.SysFont("Arial", 18, bold=True)
-                    
-                    # Column headers with better spacing
-                    rank_header = header_font.render("Rank", True, (255, 215, 0))
-                    rank_rect = rank_header.get_rect(topleft=(20, header_y))
-                    screen.blit(rank_header, rank_rect)
-                    
-                    name_header = header_font.render("Player Name", True, (255, 215, 0))
-                    name_rect = name_header.get_rect(topleft=(70, header_y))
-                    screen.blit(name_header, name_rect)
-                    
-                    score_header = header_font.render("Score", True, (255, 215, 0))
-                    score_rect = score_header.get_rect(topleft=(240, header_y))
-                    screen.blit(score_header, score_rect)
-                    
-                    stars_header = header_font.render("Stars", True, (255, 215, 0))
-                    stars_rect = stars_header.get_rect(topleft=(310, header_y))
-                    screen.blit(stars_header, stars_rect)
-                    
-                    # Separator line below header
-                    pygame.draw.line(screen, (100, 100, 100), (40, 160), (WIDTH-40, 160), 1)
-                    
-                    # Draw scores
-                    entry_font = pygame.font.SysFont("Arial", 18)
-                    y_pos = 180
-                    
-                    # Column widths for fixed layout
-                    rank_col_width = 40
-                    name_col_width = 150
-                    score_col_width = 60
-                    stars_col_width = 100
-                    
-                    for idx, entry in enumerate(scores, 1):
-                        # Draw background row boxes
-                        if idx % 2 == 0:
-                            pygame.draw.rect(screen, (30, 30, 40), (20, y_pos - 5, WIDTH - 40, 35))
-                        
-                        # Rank box with medal
-                        rank_box = pygame.Rect(20, y_pos - 5, rank_col_width, 35)
-                        if idx == 1:
-                            color = (255, 215, 0)
-                        elif idx == 2:
-                            color = (192, 192, 192)
-                        elif idx == 3:
-                            color = (205, 127, 50)
-                        else:
-                            color = (200, 200, 200)
-                        
-                        rank_text = entry_font.render(f"{idx}.", True, color)
-                        rank_rect = rank_text.get_rect(center=(rank_box.centerx, rank_box.centery))
-                        screen.blit(rank_text, rank_rect)
-                        
-                        # Name box - max 10 characters with smaller font
-                        name_box = pygame.Rect(rank_col_width + 20, y_pos - 5, name_col_width, 35)
-                        display_name = entry["name"][:10]
-                        name_text = entry_font.render(display_name, True, (100, 200, 255))
-                        name_rect = name_text.get_rect(topleft=(name_box.left + 5, name_box.centery - name_text.get_height()//2))
-                        screen.blit(name_text, name_rect)
-                        
-                        # Score box
-                        score_box = pygame.Rect(rank_col_width + name_col_width + 20, y_pos - 5, score_col_width, 35)
-                        score_text = entry_font.render(str(entry["score"]), True, (150, 255, 150))
-                        score_rect = score_text.get_rect(center=(score_box.centerx, score_box.centery))
-                        screen.blit(score_text, score_rect)
-                        
-                        # Stars box
-                        stars_box = pygame.Rect(rank_col_width + name_col_width + score_col_width + 20, y_pos - 5, stars_col_width, 35)
-                        stars = entry.get("stars", 0)
-                        stars_display = "⭐ " * stars if stars > 0 else "-"
-                        stars_text = entry_font.render(stars_display[:15], True, (255, 215, 0))
-                        stars_rect = stars_text.get_rect(center=(stars_box.centerx, stars_box.centery))
-                        screen.blit(stars_text, stars_rect)
-                        
-                        y_pos += 35
-                        
-                        if y_pos > HEIGHT - 100:
-                            break
-                
-                # Bottom separator
-                pygame.draw.line(screen, (255, 215, 0), (40, HEIGHT-70), (WIDTH-40, HEIGHT-70), 2)
-                
                 # Get mouse position for button hover
                 mouse_pos = pygame.mouse.get_pos()
                 btn_menu_from_scores.update_hover(mouse_pos)
                 btn_change_from_scores.update_hover(mouse_pos)
-                
-                # Draw buttons
-                btn_menu_from_scores.draw(screen)
-                btn_change_from_scores.draw(screen)
 
-                for event in pygame.event.get():
+                if redraw:
+                    # Title
+                    title_surf = render_text("HIGH SCORES", 52, (255, 215, 0), bold=True)
+                    title_rect = title_surf.get_rect(center=(WIDTH//2, 50))
+                    screen.blit(title_surf, title_rect)
+
+                    # Separator line
+                    pygame.draw.line(screen, (255, 215, 0), (40, 100), (WIDTH-40, 100), 2)
+
+                    scores = score_store.entries()
+
+                    if not scores:
+                        no_scores = render_text("No scores yet!", 32, (150, 150, 150))
+                        no_rect = no_scores.get_rect(center=(WIDTH//2, HEIGHT//2))
+                        screen.blit(no_scores, no_rect)
+
+                        hint = render_text("Start a game to see scores appear here", 20, (100, 100, 100))
+                        hint_rect = hint.get_rect(center=(WIDTH//2, HEIGHT//2 + 60))
+                        screen.blit(hint, hint_rect)
+                    else:
+                        # Header
+                        header_y = 130
+                        header_font = fonts.get("Arial", 18, bold=True)
+
+                        # Column headers with better spacing
+                        rank_header = text_cache.render("Rank", header_font, (255, 215, 0))
+                        rank_rect = rank_header.get_rect(topleft=(20, header_y))
+                        screen.blit(rank_header, rank_rect)
+
+                        name_header = text_cache.render("Player Name", header_font, (255, 215, 0))
+                        name_rect = name_header.get_rect(topleft=(70, header_y))
+                        screen.blit(name_header, name_rect)
+
+                        score_header = text_cache.render("Score", header_font, (255, 215, 0))
+                        score_rect = score_header.get_rect(topleft=(240, header_y))
+                        screen.blit(score_header, score_rect)
+
+                        stars_header = text_cache.render("Stars", header_font, (255, 215, 0))
+                        stars_rect = stars_header.get_rect(topleft=(310, header_y))
+                        screen.blit(stars_header, stars_rect)
+
+                        # Separator line below header
+                        pygame.draw.line(screen, (100, 100, 100), (40, 160), (WIDTH-40, 160), 1)
+
+                        # Draw scores
+                        entry_font = fonts.get("Arial", 18)
+                        y_pos = 180
+
+                        # Column widths for fixed layout
+                        rank_col_width = 40
+                        name_col_width = 150
+                        score_col_width = 60
+                        stars_col_width = 100
+
+                        for idx, entry in enumerate(scores, 1):
+                            # Draw background row boxes
+                            if idx % 2 == 0:
+                                pygame.draw.rect(screen, (30, 30, 40), (20, y_pos - 5, WIDTH - 40, 35))
+
+                            # Rank box with medal
+                            rank_box = pygame.Rect(20, y_pos - 5, rank_col_width, 35)
+                            if idx == 1:
+                                color = (255, 215, 0)
+                            elif idx == 2:
+                                color = (192, 192, 192)
+                            elif idx == 3:
+                                color = (205, 127, 50)
+                            else:
+                                color = (200, 200, 200)
+
+                            rank_text = text_cache.render(f"{idx}.", entry_font, color)
+                            rank_rect = rank_text.get_rect(center=(rank_box.centerx, rank_box.centery))
+                            screen.blit(rank_text, rank_rect)
+
+                            # Name box - max 10 characters with smaller font
+                            name_box = pygame.Rect(rank_col_width + 20, y_pos - 5, name_col_width, 35)
+                            display_name = entry["name"][:10]
+                            name_text = text_cache.render(display_name, entry_font, (100, 200, 255))
+                            name_rect = name_text.get_rect(topleft=(name_box.left + 5, name_box.centery - name_text.get_height()//2))
+                            screen.blit(name_text, name_rect)
+
+                            # Score box
+                            score_box = pygame.Rect(rank_col_width + name_col_width + 20, y_pos - 5, score_col_width, 35)
+                            score_text = text_cache.render(str(entry["score"]), entry_font, (150, 255, 150))
+                            score_rect = score_text.get_rect(center=(score_box.centerx, score_box.centery))
+                            screen.blit(score_text, score_rect)
+
+                            # Stars box
+                            stars_box = pygame.Rect(rank_col_width + name_col_width + score_col_width + 20, y_pos - 5, stars_col_width, 35)
+                            stars = entry.get("stars", 0)
+                            stars_display = "⭐ " * stars if stars > 0 else "-"
+                            stars_text = text_cache.render(stars_display[:15], entry_font, (255, 215, 0))
+                            stars_rect = stars_text.get_rect(center=(stars_box.centerx, stars_box.centery))
+                            screen.blit(stars_text, stars_rect)
+
+                            y_pos += 35
+
+                            if y_pos > HEIGHT - 100:
+                                break
+
+                    # Bottom separator
+                    pygame.draw.line(screen, (255, 215, 0), (40, HEIGHT-70), (WIDTH-40, HEIGHT-70), 2)
+
+                # Draw buttons (in dirty-rect mode only those whose hover changed)
+                renderer.draw_buttons((btn_menu_from_scores, btn_change_from_scores), redraw)
+
+                profiler.lap("text")
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                     # Handle mouse click
@@ -574,310 +595,300 @@ def main(argv=None):
             # GAMEPLAY
             # ================================================================
             elif app_state == "game":
-                for event in pygame.event.get():
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                     # Handle mouse click for jump/start
                     if event.type == pygame.MOUSEBUTTONDOWN:
-                        if not game["started"]:
-                            game["started"] = True
-                            game["end_time"] = None
+                        if not game.started:
+                            game.started = True
+                            game.end_time = None
                         else:
-                            if game["player_alive"] and game["end_time"] is None and not game.get("paused", False):
-                                game["p_velocity"] = JUMP
-                        if game["end_time"] is not None:
+                            if game.player_alive and game.end_time is None and not game.paused:
+                                game.player_jump()
+                        if game.end_time is not None:
                             app_state = "game_over"
                     # Handle touch input for jump/start
                     if event.type == pygame.FINGERDOWN:
-                        if not game["started"]:
-                            game["started"] = True
-                            game["end_time"] = None
+                        if not game.started:
+                            game.started = True
+                            game.end_time = None
                         else:
-                            if game["player_alive"] and game["end_time"] is None and not game.get("paused", False):
-                                game["p_velocity"] = JUMP
-                        if game["end_time"] is not None:
+                            if game.player_alive and game.end_time is None and not game.paused:
+                                game.player_jump()
+                        if game.end_time is not None:
                             app_state = "game_over"
                     # Keep keyboard as fallback
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_SPACE:
                             # If game not started, start on SPACE
-                            if not game["started"]:
-                                game["started"] = True
-                                game["end_time"] = None
+                            if not game.started:
+                                game.started = True
+                                game.end_time = None
                             else:
                                 # normal player jump when playing
-                                if game["player_alive"] and game["end_time"] is None and not game.get("paused", False):
-                                    game["p_velocity"] = JUMP
+                                if game.player_alive and game.end_time is None and not game.paused:
+                                    game.player_jump()
                             # if game over, go to game over screen on SPACE
-                            if game["end_time"] is not None:
+                            if game.end_time is not None:
                                 app_state = "game_over"
                                 continue
                         if event.key == pygame.K_p:
                             # toggle pause when game started and not ended
-                            if game["started"] and game["end_time"] is None:
-                                game["paused"] = not game.get("paused", False)
+                            if game.started and game.end_time is None:
+                                game.paused = not game.paused
                         if event.key == pygame.K_r:
                             # manual restart to menu
                             app_state = "menu"
                             continue
 
-                # only update game physics when started, not paused, and not finished
-                if game["started"] and not game.get("paused", False) and game["end_time"] is None:
-                    # player physics
-                    if game["player_alive"]:
-                        game["p_velocity"] += GRAVITY
-                        game["p_bird_y"] += game["p_velocity"]
-
-                    # ai decision + physics
-                    if game["ai_alive"]:
-                        pipe_bottom = game["pipe_top"] + PIPE_GAP
-
-                        # difficulty parameters
-                        diff_threshold = {'easy': 0.8, 'normal': 0.5, 'hard': 0.35}.get(AI_DIFFICULTY, 0.5)
-                        heuristic_margin = {'easy': 20.0, 'normal': 0.0, 'hard': -10.0}.get(AI_DIFFICULTY, 0.0)
-
-                        # If model or scaler missing, use a simple heuristic: jump when bird is below gap center plus a margin.
-                        if model is None or scaler is None:
-                            gap_center = (game["pipe_top"] + pipe_bottom) / 2.0
-                            if game["a_bird_y"] > gap_center + heuristic_margin:
-                                game["a_velocity"] = JUMP
-                        else:
-                            feats = make_features(game["a_bird_y"], game["pipe_top"], pipe_bottom, game["pipe_x"])
-                            try:
-                                feats_scaled = scaler.transform(feats.reshape(1, -1))
-                                prob = float(model.predict(feats_scaled, verbose=0)[0][0])
-                                if prob > diff_threshold:
-                                    game["a_velocity"] = JUMP
-                            except Exception as e:
-                                # On any runtime error with model/scaler, fallback to heuristic
-                                print(f"Model runtime error: {e} — using heuristic AI this frame")
-                                gap_center = (game["pipe_top"] + pipe_bottom) / 2.0
-                                if game["a_bird_y"] > gap_center + heuristic_margin:
-                                    game["a_velocity"] = JUMP
-
-                        game["a_velocity"] += GRAVITY
-                        game["a_bird_y"] += game["a_velocity"]
-
-                    # pipe movement
-                    game["pipe_x"] -= PIPE_SPEED
-                    # scoring: when bird passes pipe
-                    if (game["pipe_x"] + PIPE_WIDTH) < BIRD_X and not game.get("pipe_passed", False):
-                        game["score"] += 1
-                        game["pipe_passed"] = True
-
-                    if game["pipe_x"] < -PIPE_WIDTH:
-                        game["pipe_x"] = WIDTH
-                        game["pipe_top"] = random.randint(60, 350)
-                        game["pipe_passed"] = False
-                        # gradually increase difficulty
-                        PIPE_SPEED += 0.15
-
-                pipe_bottom = game["pipe_top"] + PIPE_GAP
+                profiler.lap("events")
+
+                # only update game physics when started, not paused, and not finished;
+                # physics runs in fixed ticks, independent of the frame rate
+                if game.started and not game.paused and game.end_time is None:
+                    if planner is not None:
+                        planner.begin_frame()
+                    if ai_worker is not None:
+                        ai_worker.begin_frame(ai_deadline)
+                    for _ in range(timestep.advance()):
+                        prev = (game.p_bird_y, game.a_bird_y, game.scroll)
+                        game.step(ai_jump)
+                        profiler.lap("physics")
+                        game.apply_collisions()
+                        profiler.lap("collision")
+                        if game.end_time is not None:
+                            break
+                else:
+                    timestep.reset()
+                    prev = (game.p_bird_y, game.a_bird_y, game.scroll)
+                # a finished match is saved once, as soon as it ends
+                if game.end_time is not None and not game.saved:
+                    game.saved = True
+                    if not args.no_replays:
+                        settings = {"difficulty": AI_DIFFICULTY, "ai_backend": args.ai_backend,
+                                    "ai_model": policy_table is not None or ai_worker is not None,
+                                    "tick_rate": args.tick_rate, "pipe_spacing": args.pipe_spacing}
+                        print(f"Saved replay to {save_replay(game, settings, args.replay_dir, current_player_name)}")
+                # draw between the previous and current tick; every pipe moved by the same speed
+                alpha = timestep.alpha if game.end_time is None else 1.0
+                p_draw_y = lerp(prev[0], game.p_bird_y, alpha)
+                a_draw_y = lerp(prev[1], game.a_bird_y, alpha)
+                scroll_offset = game.scroll - lerp(prev[2], game.scroll, alpha)
 
                 # draw birds
-                if game["player_alive"]:
-                    pygame.draw.circle(screen, (255, 255, 0), (BIRD_X, int(game["p_bird_y"])), 15)
+                if game.player_alive:
+                    renderer.mark(pygame.draw.circle(screen, (255, 255, 0), (BIRD_X, int(p_draw_y)), 15))
+                profiler.lap("sprites")
 
                 # draw player name
-                draw_outline_text("YOU", BIRD_X - 18, int(game["p_bird_y"]) - 35, (255,255,255))
+                renderer.mark(draw_outline_text("YOU", BIRD_X - 18, int(p_draw_y) - 35, (255,255,255)))
+                profiler.lap("text")
 
-                if game["ai_alive"]:
-                    pygame.draw.circle(screen, (255,0,0), (BIRD_X+40, int(game["a_bird_y"])), 15)
+                if game.ai_alive:
+                    renderer.mark(pygame.draw.circle(screen, (255,0,0), (BIRD_X+40, int(a_draw_y)), 15))
+                profiler.lap("sprites")
                 # draw AI name
-                draw_outline_text("AI", BIRD_X + 40 - 10, int(game["a_bird_y"]) - 35, (255,255,0))
+                renderer.mark(draw_outline_text("AI", BIRD_X + 40 - 10, int(a_draw_y) - 35, (255,255,0)))
+                profiler.lap("text")
 
                 # draw pipes (top and bottom). bottom height = remaining screen height
-                if pipe_img is None:
-                    pygame.draw.rect(screen, (0,200,0), (game["pipe_x"], 0, PIPE_WIDTH, game["pipe_top"]))
-                    pygame.draw.rect(screen, (0,200,0), (game["pipe_x"], pipe_bottom, PIPE_WIDTH, HEIGHT - pipe_bottom))
-                else:
-                    top_h = max(1, int(game["pipe_top"]))
-                    bottom_h = max(1, int(HEIGHT - pipe_bottom))
-                    try:
-                        top_surf = pygame.transform.scale(pipe_img, (PIPE_WIDTH, top_h))
-                        top_surf = pygame.transform.flip(top_surf, False, True)
-                        screen.blit(top_surf, (game["pipe_x"], 0))
-                    except Exception:
-                        pygame.draw.rect(screen, (0,200,0), (game["pipe_x"], 0, PIPE_WIDTH, game["pipe_top"]))
-                    try:
-                        bottom_surf = pygame.transform.scale(pipe_img, (PIPE_WIDTH, bottom_h))
-                        screen.blit(bottom_surf, (game["pipe_x"], pipe_bottom))
-                    except Exception:
-                        pygame.draw.rect(screen, (0,200,0), (game["pipe_x"], pipe_bottom, PIPE_WIDTH, HEIGHT - pipe_bottom))
-
-                # collision check
-                def check_collision(bird_x, bird_y):
-                    # bird represented as a circle with radius 15
-                    r = 15
-                    bird_top = bird_y - r
-                    bird_bottom = bird_y + r
-                    bird_left = bird_x - r
-                    bird_right = bird_x + r
-
-                    pipe_left = game["pipe_x"]
-                    pipe_right = game["pipe_x"] + PIPE_WIDTH
-
-                    # horizontal overlap between bird and pipe
-                    hit_pipe_x = (bird_right > pipe_left) and (bird_left < pipe_right)
-
-                    # vertical overlap with pipes (true if bird is above bottom of top pipe OR below top of bottom pipe)
-                    hit_pipe_y = (bird_top < game["pipe_top"]) or (bird_bottom > pipe_bottom)
-
-                    # out of bounds if bird touches floor or ceiling
-                    out = (bird_bottom >= HEIGHT) or (bird_top <= 0)
-
-                    return (hit_pipe_x and hit_pipe_y) or out
-
-                if game["player_alive"] and check_collision(BIRD_X, game["p_bird_y"]):
-                    game["player_alive"] = False
-                    game["end_time"] = time.time()
-                if game["ai_alive"] and check_collision(BIRD_X+40, game["a_bird_y"]):
-                    game["ai_alive"] = False
-                    game["end_time"] = time.time()
+                for pipe_x, pipe_top in game.pipes():
+                    pipe_draw_x = pipe_x + scroll_offset
+                    if pipe_draw_x >= WIDTH:
+                        continue
+                    pipe_bottom = pipe_top + PIPE_GAP
+                    if pipe_img is None:
+                        renderer.mark(pygame.draw.rect(screen, (0,200,0), (pipe_draw_x, 0, PIPE_WIDTH, pipe_top)))
+                        renderer.mark(pygame.draw.rect(screen, (0,200,0), (pipe_draw_x, pipe_bottom, PIPE_WIDTH, HEIGHT - pipe_bottom)))
+                    else:
+                        top_h = max(1, int(pipe_top))
+                        bottom_h = max(1, int(HEIGHT - pipe_bottom))
+                        try:
+                            top_surf = pipe_cache.get(PIPE_WIDTH, top_h, flip=True)
+                            renderer.mark(screen.blit(top_surf, (pipe_draw_x, 0)))
+                        except Exception:
+                            renderer.mark(pygame.draw.rect(screen, (0,200,0), (pipe_draw_x, 0, PIPE_WIDTH, pipe_top)))
+                        try:
+                            bottom_surf = pipe_cache.get(PIPE_WIDTH, bottom_h)
+                            renderer.mark(screen.blit(bottom_surf, (pipe_draw_x, pipe_bottom)))
+                        except Exception:
+                            renderer.mark(pygame.draw.rect(screen, (0,200,0), (pipe_draw_x, pipe_bottom, PIPE_WIDTH, HEIGHT - pipe_bottom)))
+                profiler.lap("sprites")
 
                 # draw UI
                 # Score and stats
-                draw_center_text(f"Score: {game['score']}", 26, (255,255,255))
-                draw_center_text(f"Player: {current_player_name}", HEIGHT - 30, (200,255,200))
-
-                if game["end_time"]:
-                    if not game["player_alive"] and game["ai_alive"]:
-                        draw_text("AI Wins! You Lost 💀", HEIGHT//2 - 10, (255, 0, 0))
-                    elif not game["ai_alive"] and game["player_alive"]:
-                        draw_text("You Win! AI Lost 🏆", HEIGHT//2 - 10, (0, 200, 0))
+                renderer.mark(draw_center_text(f"Score: {game.score}", 26, (255,255,255)))
+                renderer.mark(draw_center_text(f"Player: {current_player_name}", HEIGHT - 30, (200,255,200)))
+
+                if game.end_time:
+                    if not game.player_alive and game.ai_alive:
+                        renderer.mark(draw_text("AI Wins! You Lost 💀", HEIGHT//2 - 10, (255, 0, 0)))
+                    elif not game.ai_alive and game.player_alive:
+                        renderer.mark(draw_text("You Win! AI Lost 🏆", HEIGHT//2 - 10, (0, 200, 0)))
                     else:
-                        draw_text("Draw! Both crashed.", HEIGHT//2 - 10, (200,200,200))
-                    draw_center_text("Press SPACE to save score", HEIGHT//2 + 30, (255,255,255))
+                        renderer.mark(draw_text("Draw! Both crashed.", HEIGHT//2 - 10, (200,200,200)))
+                    renderer.mark(draw_center_text("Press SPACE to save score", HEIGHT//2 + 30, (255,255,255)))
 
                 # start screen
-                if not game["started"]:
-                    draw_center_text("Flappy AI", HEIGHT//2 - 40, (255,255,255))
-                    draw_center_text("Press SPACE to start", HEIGHT//2 + 10, (255,255,255))
-                    draw_center_text("P to pause — R to menu", HEIGHT//2 + 50, (240,240,240))
+                if not game.started:
+                    renderer.mark(draw_center_text("Flappy AI", HEIGHT//2 - 40, (255,255,255)))
+                    renderer.mark(draw_center_text("Press SPACE to start", HEIGHT//2 + 10, (255,255,255)))
+                    renderer.mark(draw_center_text("P to pause — R to menu", HEIGHT//2 + 50, (240,240,240)))
+                profiler.lap("text")
 
             # ================================================================
             # GAME OVER SCREEN
             # ================================================================
             elif app_state == "game_over":
                 # Determine if player won
-                player_won = not game["ai_alive"] and game["player_alive"]
-                stars_earned = calculate_stars(game['score']) if player_won else 0
-                
-                # Title
-                title_color = (100, 255, 100) if player_won else (255, 100, 100)
-                title_text = "VICTORY!" if player_won else "GAME OVER"
-                title_surf = pygame.font.SysFont("Arial", 56, bold=True).render(title_text, True, title_color)
-                title_rect = title_surf.get_rect(center=(WIDTH//2, 50))
-                screen.blit(title_surf, title_rect)
-                
-                # Separator line
-                pygame.draw.line(screen, title_color, (40, 110), (WIDTH-40, 110), 2)
-                
-                # Result box
-                result_y = 160
-                box_color = (30, 40, 30) if player_won else (40, 30, 30)
-                border_color = (100, 255, 100) if player_won else (255, 100, 100)
-                pygame.draw.rect(screen, box_color, (30, result_y, WIDTH - 60, 240))
-                pygame.draw.rect(screen, border_color, (30, result_y, WIDTH - 60, 240), 2)
-                
-                # Player name
-                player_name_surf = pygame.font.SysFont("Arial", 26).render(f"Player: {current_player_name}", True, (100, 200, 255))
-                player_rect = player_name_surf.get_rect(center=(WIDTH//2, result_y + 30))
-                screen.blit(player_name_surf, player_rect)
-                
-                # Final score - large and prominent
-                score_surf = pygame.font.SysFont("Arial", 48, bold=True).render(f"{game['score']}", True, (255, 255, 100))
-                score_rect = score_surf.get_rect(center=(WIDTH//2, result_y + 95))
-                screen.blit(score_surf, score_rect)
-                
-                score_label = pygame.font.SysFont("Arial", 20).render("FINAL SCORE", True, (200, 200, 200))
-                label_rect = score_label.get_rect(center=(WIDTH//2, result_y + 140))
-                screen.blit(score_label, label_rect)
-                
-                # Star reward display (only if player won)
-                if player_won:
-                    # Draw stars
-                    stars_text = " ".join(["⭐"] * stars_earned)
-                    stars_surf = pygame.font.SysFont("Arial", 36).render(stars_text, True, (255, 215, 0))
-                    stars_rect = stars_surf.get_rect(center=(WIDTH//2, result_y + 185))
-                    screen.blit(stars_surf, stars_rect)
-                    
-                    star_label = pygame.font.SysFont("Arial", 16).render(f"REWARD: {stars_earned} STAR{'S' if stars_earned != 1 else ''}", True, (255, 215, 0))
-                    star_label_rect = star_label.get_rect(center=(WIDTH//2, result_y + 220))
-                    screen.blit(star_label, star_label_rect)
-                else:
-                    defeat_msg = pygame.font.SysFont("Arial", 18).render("You were defeated by the AI", True, (255, 150, 150))
-                    defeat_rect = defeat_msg.get_rect(center=(WIDTH//2, result_y + 195))
-                    screen.blit(defeat_msg, defeat_rect)
-                
-                # Check if this is a high score
-                rank = get_rank_for_score(game['score'])
-                if rank and game['score'] > 0:
-                    rank_text = pygame.font.SysFont("Arial", 22, bold=True).render(f"🎉 Rank #{rank} - NEW HIGH SCORE! 🎉", True, (255, 215, 0))
-                    rank_rect = rank_text.get_rect(center=(WIDTH//2, 420))
-                    screen.blit(rank_text, rank_rect)
-                else:
-                    if player_won:
-                        no_rank = pygame.font.SysFont("Arial", 18).render("Keep playing to make the high scores!", True, (150, 150, 150))
-                    else:
-                        no_rank = pygame.font.SysFont("Arial", 18).render("Keep practicing to defeat the AI!", True, (150, 150, 150))
-                    no_rank_rect = no_rank.get_rect(center=(WIDTH//2, 420))
-                    screen.blit(no_rank, no_rank_rect)
-                
-                # Separator line
-                pygame.draw.line(screen, border_color, (40, 460), (WIDTH-40, 460), 2)
-                
+                player_won = not game.ai_alive and game.player_alive
+                stars_earned = calculate_stars(game.score) if player_won else 0
+
                 # Get mouse position for button hover
                 mouse_pos = pygame.mouse.get_pos()
                 btn_menu_from_over.update_hover(mouse_pos)
                 btn_play_again.update_hover(mouse_pos)
-                
-                # Draw buttons
-                btn_menu_from_over.draw(screen)
-                btn_play_again.draw(screen)
 
-                for event in pygame.event.get():
+                if redraw:
+                    # Title
+                    title_color = (100, 255, 100) if player_won else (255, 100, 100)
+                    title_text = "VICTORY!" if player_won else "GAME OVER"
+                    title_surf = render_text(title_text, 56, title_color, bold=True)
+                    title_rect = title_surf.get_rect(center=(WIDTH//2, 50))
+                    screen.blit(title_surf, title_rect)
+
+                    # Separator line
+                    pygame.draw.line(screen, title_color, (40, 110), (WIDTH-40, 110), 2)
+
+                    # Result box
+                    result_y = 160
+                    box_color = (30, 40, 30) if player_won else (40, 30, 30)
+                    border_color = (100, 255, 100) if player_won else (255, 100, 100)
+                    pygame.draw.rect(screen, box_color, (30, result_y, WIDTH - 60, 240))
+                    pygame.draw.rect(screen, border_color, (30, result_y, WIDTH - 60, 240), 2)
+
+                    # Player name
+                    player_name_surf = render_text(f"Player: {current_player_name}", 26, (100, 200, 255))
+                    player_rect = player_name_surf.get_rect(center=(WIDTH//2, result_y + 30))
+                    screen.blit(player_name_surf, player_rect)
+
+                    # Final score - large and prominent
+                    score_surf = render_text(f"{game.score}", 48, (255, 255, 100), bold=True)
+                    score_rect = score_surf.get_rect(center=(WIDTH//2, result_y + 95))
+                    screen.blit(score_surf, score_rect)
+
+                    score_label = render_text("FINAL SCORE", 20, (200, 200, 200))
+                    label_rect = score_label.get_rect(center=(WIDTH//2, result_y + 140))
+                    screen.blit(score_label, label_rect)
+
+                    # Star reward display (only if player won)
+                    if player_won:
+                        # Draw stars
+                        stars_text = " ".join(["⭐"] * stars_earned)
+                        stars_surf = render_text(stars_text, 36, (255, 215, 0))
+                        stars_rect = stars_surf.get_rect(center=(WIDTH//2, result_y + 185))
+                        screen.blit(stars_surf, stars_rect)
+
+                        star_label = render_text(f"REWARD: {stars_earned} STAR{'S' if stars_earned != 1 else ''}", 16, (255, 215, 0))
+                        star_label_rect = star_label.get_rect(center=(WIDTH//2, result_y + 220))
+                        screen.blit(star_label, star_label_rect)
+                    else:
+                        defeat_msg = render_text("You were defeated by the AI", 18, (255, 150, 150))
+                        defeat_rect = defeat_msg.get_rect(center=(WIDTH//2, result_y + 195))
+                        screen.blit(defeat_msg, defeat_rect)
+
+                    # Check if this is a high score
+                    rank = get_rank_for_score(game.score)
+                    if rank and game.score > 0:
+                        rank_text = render_text(f"🎉 Rank #{rank} - NEW HIGH SCORE! 🎉", 22, (255, 215, 0), bold=True)
+                        rank_rect = rank_text.get_rect(center=(WIDTH//2, 420))
+                        screen.blit(rank_text, rank_rect)
+                    else:
+                        if player_won:
+                            no_rank = render_text("Keep playing to make the high scores!", 18, (150, 150, 150))
+                        else:
+                            no_rank = render_text("Keep practicing to defeat the AI!", 18, (150, 150, 150))
+                        no_rank_rect = no_rank.get_rect(center=(WIDTH//2, 420))
+                        screen.blit(no_rank, no_rank_rect)
+
+                    # Separator line
+                    pygame.draw.line(screen, border_color, (40, 460), (WIDTH-40, 460), 2)
+
+                # Draw buttons (in dirty-rect mode only those whose hover changed)
+                renderer.draw_buttons((btn_menu_from_over, btn_play_again), redraw)
+
+                profiler.lap("text")
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                     # Handle mouse click
                     if event.type == pygame.MOUSEBUTTONDOWN:
                         if btn_menu_from_over.is_clicked(event.pos):
-                            add_score(current_player_name, game['score'], stars_earned)
+                            add_score(current_player_name, game.score, stars_earned)
                             app_state = "menu"
                         elif btn_play_again.is_clicked(event.pos):
-                            add_score(current_player_name, game['score'], stars_earned)
+                            add_score(current_player_name, game.score, stars_earned)
                             app_state = "game"
-                            game = new_game()
-                            PIPE_SPEED = 5
+                            game = new_game(args.seed, args.pipe_spacing)
                     # Handle touch input
                     if event.type == pygame.FINGERDOWN:
                         touch_pos = (int(event.x * WIDTH), int(event.y * HEIGHT))
                         if btn_menu_from_over.is_clicked(touch_pos):
-                            add_score(current_player_name, game['score'], stars_earned)
+                            add_score(current_player_name, game.score, stars_earned)
                             app_state = "menu"
                         elif btn_play_again.is_clicked(touch_pos):
-                            add_score(current_player_name, game['score'], stars_earned)
+                            add_score(current_player_name, game.score, stars_earned)
                             app_state = "game"
-                            game = new_game()
-                            PIPE_SPEED = 5
+                            game = new_game(args.seed, args.pipe_spacing)
                     # Keep keyboard as fallback
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_m:
                             # Save score before returning to menu
-                            add_score(current_player_name, game['score'], stars_earned)
+                            add_score(current_player_name, game.score, stars_earned)
                             app_state = "menu"
                         elif event.key == pygame.K_p:
                             # Save score and start new game
-                            add_score(current_player_name, game['score'], stars_earned)
+                            add_score(current_player_name, game.score, stars_earned)
                             app_state = "game"
-                            game = new_game()
-                            PIPE_SPEED = 5
-
-            pygame.display.update()
+                            game = new_game(args.seed, args.pipe_spacing)
+
+            profiler.lap("events")
+            profiler.draw_overlay(screen, overlay_font)
+            profiler.lap("overlay")
+            renderer.present()
+            profiler.lap("display")
+            profiler.end_frame(frame_state)
+
+            if "first_frame" not in startup_timings:
+                startup_timings["first_frame"] = time.perf_counter() - _import_start
+            # hand the model to the AI worker once the background load finishes
+            if not startup_reported and model_loader.ready:
+                startup_reported = True
+                if model_loader.predictor is not None:
+                    ai_worker = AIDecisionWorker(model_loader.predictor)
+                startup_timings.update(model_loader.timings)
+                print(format_startup_report(startup_timings))
+
+            if frame_hook is not None and frame_hook(frame_state, time.perf_counter() - frame_start) is False:
+                running = False
 
     except KeyboardInterrupt:
         pass
     finally:
+        if ai_worker is not None:
+            ai_worker.stop()
+            ai_worker.report()
+        if planner is not None:
+            planner.report()
+        if pipe_cache is not None:
+            pipe_cache.report("Pipe sprite cache")
+        text_cache.report()
+        print(profiler.summary())
+        renderer.report()
+        if args.trace:
+            profiler.dump_trace(args.trace)
+        score_store.close()
         pygame.quit()
         sys.exit(0)
 
@@ -0,0 +1,209 @@
+# policy_table.py
+# The trained policy, precomputed over a quantized state grid.
+#
+# The model only really sees three numbers: bird_y, pipe_top and pipe_x (the
+# other features in make_features are derived from them). `build_table`
+# evaluates the model once over a regular grid of that space and stores the
+# jump probability per cell as a uint8 (0..255), or, for one fixed threshold,
+# as a packed bitset. In the game the AI decision then becomes an O(1) array
+# lookup of the nearest grid cell, with no model, scaler or worker thread.
+#
+#   python policy_table.py                       # build policy_table.npz
+#   python policy_table.py --step-y 2 --bits 0.5 # finer grid, 1 bit per cell
+#   python player_vs_ai.py --ai-backend table
+import argparse
+import os
+import time
+
+import numpy as np
+
+from sim_engine import HEIGHT, PIPE_TOP_MAX, PIPE_TOP_MIN, PIPE_WIDTH, WIDTH, state_features
+
+TABLE_FILE = "policy_table.npz"
+AXES = ("bird_y", "pipe_top", "pipe_x")
+BOUNDS = {"bird_y": (0.0, float(HEIGHT)), "pipe_top": (float(PIPE_TOP_MIN), float(PIPE_TOP_MAX)),
+          "pipe_x": (float(-PIPE_WIDTH), float(WIDTH))}
+DEFAULT_STEPS = {"bird_y": 4.0, "pipe_top": 2.0, "pipe_x": 4.0}
+DIFFICULTY_THRESHOLDS = {"easy": 0.8, "normal": 0.5, "hard": 0.35}  # keep in sync with player_vs_ai.py
+
+
+class PolicyTable:
+    """Jump probabilities (kind 'prob8') or jump bits (kind 'bits') on a (bird_y, pipe_top, pipe_x) grid."""
+
+    def __init__(self, lo, step, shape, data, kind="prob8", threshold=None):
+        self.lo = tuple(float(v) for v in lo)
+        self.step = tuple(float(v) for v in step)
+        self.shape = tuple(int(v) for v in shape)
+        self.kind = kind
+        self.threshold = threshold
+        self.data = np.ascontiguousarray(data, dtype=np.uint8).ravel()
+        self._raw = self.data.tobytes()  # plain bytes index faster than a NumPy array per scalar lookup
+
+    @property
+    def cells(self):
+        return self.shape[0] * self.shape[1] * self.shape[2]
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def _flat_index(self, bird_y, pipe_top, pipe_x):
+        idx = 0
+        for v, lo, step, n in zip((bird_y, pipe_top, pipe_x), self.lo, self.step, self.shape):
+            i = int((v - lo) / step + 0.5)
+            idx = idx * n + (0 if i < 0 else n - 1 if i >= n else i)
+        return idx
+
+    def prob(self, bird_y, pipe_top, pipe_x):
+        """Jump probability of the nearest grid cell (0.0/1.0 for a bitset table)."""
+        idx = self._flat_index(bird_y, pipe_top, pipe_x)
+        if self.kind == "bits":
+            return float((self._raw[idx >> 3] >> (7 - (idx & 7))) & 1)
+        return self._raw[idx] / 255.0
+
+    def prob_batch(self, bird_y, pipe_top, pipe_x):
+        """Vectorized prob() over arrays of states."""
+        idx = np.zeros(np.broadcast(bird_y, pipe_top, pipe_x).shape, dtype=np.int64)
+        for v, lo, step, n in zip((bird_y, pipe_top, pipe_x), self.lo, self.step, self.shape):
+            i = np.clip(np.floor((np.asarray(v, dtype=np.float64) - lo) / step + 0.5), 0, n - 1).astype(np.int64)
+            idx = idx * n + i
+        if self.kind == "bits":
+            return ((self.data[idx >> 3] >> (7 - (idx & 7)).astype(np.uint8)) & 1).astype(np.float64)
+        return self.data[idx] / 255.0
+
+    def save(self, path=TABLE_FILE):
+        np.savez(path, lo=np.array(self.lo), step=np.array(self.step), shape=np.array(self.shape),
+                 data=self.data, kind=np.array(self.kind),
+                 threshold=np.array(np.nan if self.threshold is None else self.threshold))
+
+    @classmethod
+    def load(cls, path=TABLE_FILE):
+        with np.load(path) as f:
+            threshold = float(f["threshold"])
+            return cls(f["lo"], f["step"], f["shape"], f["data"], kind=str(f["kind"]),
+                       threshold=None if np.isnan(threshold) else threshold)
+
+
+def load_table(path=TABLE_FILE):
+    """Load a policy table, or return None (with a warning) if it is unusable."""
+    if not os.path.exists(path):
+        print(f"Warning: policy table '{path}' not found — run policy_table.py to build it.")
+        return None
+    try:
+        return PolicyTable.load(path)
+    except Exception as e:
+        print(f"Warning: failed to load policy table '{path}': {e}")
+        return None
+
+
+def grid_axes(steps=None):
+    """Grid point coordinates per axis (from each lower bound to the upper bound inclusive)."""
+    steps = {**DEFAULT_STEPS, **(steps or {})}
+    axes = []
+    for name in AXES:
+        lo, hi = BOUNDS[name]
+        n = int(np.floor((hi - lo) / steps[name] + 1e-9)) + 1
+        axes.append(lo + steps[name] * np.arange(n))
+    return axes, tuple(steps[name] for name in AXES)
+
+
+def build_table(predict_batch, steps=None, bits_threshold=None, chunk_cells=1 << 18):
+    """Evaluate predict_batch(X) -> (N,) over the whole grid and return a PolicyTable."""
+    axes, step = grid_axes(steps)
+    shape = tuple(len(a) for a in axes)
+    probs = np.empty(shape, dtype=np.float32)
+    # one bird_y slab at a time keeps the feature matrix bounded
+    rows_per_chunk = max(1, chunk_cells // (shape[1] * shape[2]))
+    top, px = np.meshgrid(axes[1], axes[2], indexing="ij")
+    for start in range(0, shape[0], rows_per_chunk):
+        ys = axes[0][start:start + rows_per_chunk]
+        X = state_features(ys[:, None, None], top[None], px[None])
+        probs[start:start + len(ys)] = np.asarray(predict_batch(X), dtype=np.float32).reshape(len(ys), *shape[1:])
+    lo = tuple(a[0] for a in axes)
+    if bits_threshold is not None:
+        data = np.packbits((probs > bits_threshold).ravel())
+        return PolicyTable(lo, step, shape, data, kind="bits", threshold=bits_threshold)
+    data = np.round(np.clip(probs, 0.0, 1.0) * 255.0).astype(np.uint8)
+    return PolicyTable(lo, step, shape, data)
+
+
+def sample_states(n, seed=0):
+    """n uniformly random in-bounds states (pipe_top integer, like random.randint)."""
+    rng = np.random.default_rng(seed)
+    bird_y = rng.uniform(*BOUNDS["bird_y"], size=n)
+    pipe_top = rng.integers(PIPE_TOP_MIN, PIPE_TOP_MAX + 1, size=n).astype(np.float64)
+    pipe_x = rng.uniform(*BOUNDS["pipe_x"], size=n)
+    return bird_y, pipe_top, pipe_x
+
+
+def agreement(table, predict_batch, states, thresholds=None):
+    """{threshold: fraction of states where the table and the model make the same jump decision}."""
+    if thresholds is None:
+        thresholds = [table.threshold] if table.kind == "bits" else sorted(set(DIFFICULTY_THRESHOLDS.values()))
+    bird_y, pipe_top, pipe_x = states
+    model_p = np.asarray(predict_batch(state_features(bird_y, pipe_top, pipe_x)), dtype=np.float64)
+    table_p = table.prob_batch(bird_y, pipe_top, pipe_x)
+    out = {}
+    for t in thresholds:
+        # a bitset stores the decision itself; compare it against the model at its own threshold
+        table_jump = table_p > 0.5 if table.kind == "bits" else table_p > t
+        out[t] = float(np.mean(table_jump == (model_p > t)))
+    return out
+
+
+def dataset_states(ds):
+    """(bird_y, pipe_top, pipe_x) table coordinates of every row of an open .fcol dataset."""
+    # the dataset names the pipe top by its feature column, top_pipe_y
+    return ds.column("bird_y"), ds.column("top_pipe_y"), ds.column("pipe_x")
+
+
+def table_policy(table, threshold):
+    """BatchSim policy (see sim_engine.py) that decides from the table."""
+    def policy(sim):
+        return table.prob_batch(sim.bird_y, sim.pipe_top, sim.pipe_x) > threshold
+    return policy
+
+
+def main(argv=None):
+    from columnar_dataset import open_dataset
+    from model_loader import load_model_and_scaler, make_batch_predictor
+
+    parser = argparse.ArgumentParser(description="Precompute the trained policy over a quantized state grid.")
+    parser.add_argument("--out", default=TABLE_FILE)
+    parser.add_argument("--step-y", type=float, default=DEFAULT_STEPS["bird_y"], help="bird_y resolution (pixels)")
+    parser.add_argument("--step-top", type=float, default=DEFAULT_STEPS["pipe_top"], help="pipe_top resolution (pixels)")
+    parser.add_argument("--step-x", type=float, default=DEFAULT_STEPS["pipe_x"], help="pipe_x resolution (pixels)")
+    parser.add_argument("--bits", type=float, metavar="THRESHOLD",
+                        help="store 1 bit per cell (jump if prob > THRESHOLD) instead of a uint8 probability")
+    parser.add_argument("--keras", action="store_true", help="evaluate tf_model.h5 + scaler even if the NumPy bundle exists")
+    parser.add_argument("--samples", type=int, default=200_000, help="random states for the agreement check (0 to skip)")
+    parser.add_argument("--data", help="also measure agreement on the states of this .fcol dataset")
+    args = parser.parse_args(argv)
+
+    mlp, model, scaler = load_model_and_scaler(use_bundle=not args.keras)
+    predict_batch = make_batch_predictor(mlp, model, scaler)
+    if predict_batch is None:
+        raise SystemExit("No trained model available; run train_model.py first.")
+
+    steps = {"bird_y": args.step_y, "pipe_top": args.step_top, "pipe_x": args.step_x}
+    start = time.perf_counter()
+    table = build_table(predict_batch, steps, bits_threshold=args.bits)
+    elapsed = time.perf_counter() - start
+    table.save(args.out)
+    print(f"Built {args.out}: {'x'.join(map(str, table.shape))} = {table.cells:,} cells, "
+          f"{table.kind}, {table.nbytes / 1024:.0f} KiB, {elapsed:.1f}s")
+
+    checks = []
+    if args.samples:
+        checks.append((f"{args.samples:,} random states", sample_states(args.samples)))
+    if args.data:
+        ds = open_dataset(args.data)
+        checks.append((f"{len(ds):,} states from {args.data}", dataset_states(ds)))
+    for label, states in checks:
+        rates = agreement(table, predict_batch, states)
+        print(f"Agreement with the model on {label}: "
+              + ", ".join(f"{100.0 * r:.2f}% @ {t:g}" for t, r in rates.items()))
+
+
+if __name__ == "__main__":
+    main()
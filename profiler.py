@@ -0,0 +1,158 @@
+# profiler.py
+# Low-overhead per-frame profiler for the game loop.
+#
+# The loop calls `lap(section)` at section boundaries; the time since the
+# previous lap is charged to that section. Each finished frame goes into a
+# fixed-size ring buffer, from which the overlay shows rolling p50/p95/p99
+# per section and flags frames that missed the budget. Optionally every lap
+# is also kept as a Chrome trace event ("X" phase) that `dump_trace` writes
+# out for chrome://tracing or Perfetto.
+import collections
+import json
+import time
+
+import numpy as np
+import pygame
+
+SECTIONS = ("events", "ai", "physics", "collision", "sprites", "text", "overlay", "display")
+
+
+class FrameProfiler:
+    """Ring-buffered section timings with an on-screen overlay and trace dump."""
+
+    def __init__(self, budget_ms=1000.0 / 45, window=240, sections=SECTIONS, trace=False, max_trace_events=200000):
+        self.budget = budget_ms / 1000.0
+        self.window = window
+        self.sections = tuple(sections)
+        self._index = {name: i for i, name in enumerate(self.sections)}
+        self._ring = np.zeros((window, len(self.sections) + 1), dtype=np.float64)  # last column = frame total
+        self._pos = 0
+        self._filled = 0
+        self._current = np.zeros(len(self.sections), dtype=np.float64)
+        self._frame_start = None
+        self._last = None
+        self.frames = 0
+        self.missed = 0
+        self.last_missed = False
+        self.show_overlay = False
+        self._overlay = None
+        self._overlay_age = 0
+        self.trace = trace
+        self._events = collections.deque(maxlen=max_trace_events)
+        self._t0 = time.perf_counter()
+
+    # ------------------------------------------------------------------
+    # recording
+    # ------------------------------------------------------------------
+    def begin_frame(self):
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last = now
+        self._current[:] = 0.0
+
+    def lap(self, section):
+        """Charge the time since the previous lap (or frame start) to section."""
+        now = time.perf_counter()
+        if self._last is None:
+            return
+        dt = now - self._last
+        self._current[self._index[section]] += dt
+        if self.trace:
+            self._events.append((section, self._last, dt))
+        self._last = now
+
+    def end_frame(self, state=None):
+        if self._frame_start is None:
+            return
+        now = time.perf_counter()
+        total = now - self._frame_start
+        row = self._ring[self._pos]
+        row[:-1] = self._current
+        row[-1] = total
+        self._pos = (self._pos + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        self.frames += 1
+        self.last_missed = total > self.budget
+        if self.last_missed:
+            self.missed += 1
+        if self.trace:
+            self._events.append((f"frame:{state}" if state else "frame", self._frame_start, total))
+        self._frame_start = None
+        self._last = None
+
+    # ------------------------------------------------------------------
+    # reporting
+    # ------------------------------------------------------------------
+    def stats(self):
+        """{section: (p50, p95, p99) in ms} over the rolling window, plus 'frame'."""
+        if not self._filled:
+            return {}
+        data = self._ring[:self._filled] * 1000.0
+        pct = np.percentile(data, [50, 95, 99], axis=0)
+        names = self.sections + ("frame",)
+        return {name: tuple(pct[:, i]) for i, name in enumerate(names)}
+
+    def window_misses(self):
+        return int(np.count_nonzero(self._ring[:self._filled, -1] > self.budget))
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self._overlay = None
+
+    def draw_overlay(self, surface, font, refresh_every=10):
+        """Blit the stats panel (rebuilt every refresh_every frames) onto surface."""
+        if not self.show_overlay:
+            return
+        self._overlay_age += 1
+        if self._overlay is None or self._overlay_age >= refresh_every:
+            self._overlay = self._build_overlay(font)
+            self._overlay_age = 0
+        x = surface.get_width() - self._overlay.get_width() - 4
+        surface.blit(self._overlay, (x, 4))
+        if self.last_missed:
+            pygame.draw.rect(surface, (255, 60, 60), surface.get_rect(), 3)
+
+    def _build_overlay(self, font):
+        stats = self.stats()
+        lines = [("section     p50    p95    p99 ms", (255, 215, 0))]
+        for name in self.sections + ("frame",):
+            if name not in stats:
+                continue
+            p50, p95, p99 = stats[name]
+            color = (255, 255, 255)
+            if name == "frame" and p95 > self.budget * 1000.0:
+                color = (255, 90, 90)
+            lines.append((f"{name:<9s} {p50:6.2f} {p95:6.2f} {p99:6.2f}", color))
+        misses = self.window_misses()
+        lines.append((f"budget {self.budget * 1000.0:.1f} ms  missed {misses}/{self._filled}",
+                      (255, 90, 90) if misses else (150, 255, 150)))
+        surfs = [font.render(text, True, color) for text, color in lines]
+        w = max(s.get_width() for s in surfs) + 8
+        h = sum(s.get_height() for s in surfs) + 8
+        panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        y = 4
+        for s in surfs:
+            panel.blit(s, (4, y))
+            y += s.get_height()
+        return panel
+
+    def summary(self):
+        stats = self.stats()
+        parts = [f"{name} p50 {v[0]:.2f}/p99 {v[2]:.2f}" for name, v in stats.items()]
+        return (f"Frame profile ({self.frames} frames, {self.missed} over {self.budget * 1000.0:.1f} ms budget): "
+                + ", ".join(parts))
+
+    def dump_trace(self, path):
+        """Write recorded laps as a Chrome trace JSON file."""
+        events = [{
+            "name": name,
+            "ph": "X",
+            "ts": (start - self._t0) * 1e6,
+            "dur": dur * 1e6,
+            "pid": 0,
+            "tid": 0 if name.startswith("frame") else 1,
+        } for name, start, dur in self._events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Wrote {len(events)} trace events to {path}")
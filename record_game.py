@@ -1,8 +1,19 @@
 # record_game_improved.py
+import argparse
 import pygame
-import csv
 import random
 import os
+from stream_recorder import StreamingRecorder
+from timestep import FixedTimestep, lerp
+
+TICK_RATE = 40  # physics (and recorded rows) per second of game time
+FPS = 60        # render cap; independent of the tick rate
+
+parser = argparse.ArgumentParser(description="Record gameplay frames for training.")
+parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="Physics ticks (recorded rows) per second")
+parser.add_argument("--speed", type=float, default=1.0, help="Game-time multiplier (<1 slow motion, >1 faster than real time)")
+parser.add_argument("--fps", type=int, default=FPS, help="Frame rate cap (0 = uncapped)")
+args = parser.parse_args()
 
 pygame.init()
 
@@ -23,7 +34,8 @@ OUT_FILE = "training_data_improved.csv"
 if os.path.exists(OUT_FILE):
     print(f"Appending to existing {OUT_FILE}. Delete it to start fresh.")
 
-gameplay_data = []
+# frames are streamed to OUT_FILE in chunks while recording (crash-safe, flat memory)
+recorder = StreamingRecorder(OUT_FILE, chunk_size=400)
 
 def new_game():
     return {
@@ -35,19 +47,20 @@ def new_game():
 
 game = new_game()
 running = True
-
-while running:
-    clock.tick(40)  # higher FPS -> smoother data
-    screen.fill((135, 206, 235))
-
+# physics runs in fixed ticks; one row is recorded per tick, so the data
+# matches the game regardless of how fast frames are drawn
+timestep = FixedTimestep(args.tick_rate, speed=args.speed)
+jump_pending = False
+prev_y, prev_x = game["bird_y"], game["pipe_x"]  # positions at the previous tick
+
+def step():
+    """Advance one physics tick and record the row the player acted on."""
+    global jump_pending
     action = 0
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-            game["velocity"] = JUMP
-            action = 1
+    if jump_pending:
+        game["velocity"] = JUMP
+        action = 1
+        jump_pending = False
 
     # bird physics
     game["velocity"] += GRAVITY
@@ -66,35 +79,47 @@ while running:
     gap_center = (game["pipe_top"] + pipe_bottom) / 2.0
     gap_size = PIPE_GAP
 
-    # draw
-    pygame.draw.circle(screen, (255, 255, 0), (BIRD_X, int(game["bird_y"])), 15)
-    pygame.draw.rect(screen, (0, 200, 0), (game["pipe_x"], 0, PIPE_WIDTH, game["pipe_top"]))
-    pygame.draw.rect(screen, (0, 200, 0), (game["pipe_x"], pipe_bottom, PIPE_WIDTH, HEIGHT))
-
     # record frame (use floats)
-    gameplay_data.append([
-        float(game["bird_y"]),
-        float(game["pipe_top"]),
-        float(pipe_bottom),
-        float(game["pipe_x"]),
-        float(distance_to_pipe),
-        float(gap_center),
-        float(gap_size),
-        int(action)
-    ])
-
-    pygame.display.update()
-
-pygame.quit()
-
-# save CSV (append if file exists)
-header = ["bird_y", "top_pipe_y", "bottom_pipe_y", "pipe_x", "distance_to_pipe", "gap_center", "gap_size", "action"]
-write_mode = "a" if os.path.exists(OUT_FILE) else "w"
-with open(OUT_FILE, write_mode, newline="") as f:
-    import csv
-    writer = csv.writer(f)
-    if write_mode == "w":
-        writer.writerow(header)
-    writer.writerows(gameplay_data)
-
-print(f"Saved {len(gameplay_data)} rows to {OUT_FILE}")
+    recorder.append((
+        game["bird_y"],
+        game["pipe_top"],
+        pipe_bottom,
+        game["pipe_x"],
+        distance_to_pipe,
+        gap_center,
+        gap_size,
+    ), action)
+
+try:
+    while running:
+        if args.fps:
+            clock.tick(args.fps)
+        screen.fill((135, 206, 235))
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                # applied (and recorded) on the next physics tick
+                jump_pending = True
+
+        for _ in range(timestep.advance()):
+            prev_y, prev_x = game["bird_y"], game["pipe_x"]
+            step()
+
+        # draw interpolated between the last two ticks (no sliding back on pipe recycle)
+        bird_y = lerp(prev_y, game["bird_y"], timestep.alpha)
+        pipe_x = lerp(prev_x, game["pipe_x"], timestep.alpha) if game["pipe_x"] <= prev_x else game["pipe_x"]
+        pipe_bottom = game["pipe_top"] + PIPE_GAP
+        pygame.draw.circle(screen, (255, 255, 0), (BIRD_X, int(bird_y)), 15)
+        pygame.draw.rect(screen, (0, 200, 0), (pipe_x, 0, PIPE_WIDTH, game["pipe_top"]))
+        pygame.draw.rect(screen, (0, 200, 0), (pipe_x, pipe_bottom, PIPE_WIDTH, HEIGHT))
+
+        pygame.display.update()
+finally:
+    pygame.quit()
+    # write whatever is still buffered
+    rows = recorder.close()
+
+print(f"Saved {rows} rows to {OUT_FILE}")
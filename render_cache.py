@@ -0,0 +1,133 @@
+# render_cache.py
+# Caches for surfaces that the game loop used to rebuild every frame.
+#
+# Pipe sprites only change size when a new pipe spawns, so scaling and
+# flipping them once per size and reusing the result removes the per-frame
+# allocation and scaling cost. Fonts and static labels on the menu, name
+# input, high-score and game-over screens are likewise created once.
+from collections import OrderedDict
+
+import pygame
+
+
+class SpriteCache:
+    """Scaled (and optionally flipped) copies of one source image, LRU-bounded."""
+
+    def __init__(self, source, max_entries=32):
+        self.source = source
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, width, height, flip=False):
+        """Return a ready-to-blit surface of size (width, height), flipped vertically if flip."""
+        key = (int(width), int(height), bool(flip))
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = pygame.transform.scale(self.source, key[:2])
+        if flip:
+            surf = pygame.transform.flip(surf, False, True)
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self, name="Sprite cache"):
+        print(f"{name}: {self.hits} hits, {self.misses} misses ({100.0 * self.hit_rate():.1f}% hit rate), "
+              f"{self.evictions} evictions, {len(self._surfaces)}/{self.max_entries} entries")
+
+
+class FontRegistry:
+    """Creates each (face, size, bold) SysFont once and hands out the same object afterwards."""
+
+    def __init__(self):
+        self._fonts = {}
+
+    def get(self, face, size, bold=False):
+        key = (face, int(size), bool(bold))
+        font = self._fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(face, key[1], bold=key[2])
+            self._fonts[key] = font
+        return font
+
+    def __len__(self):
+        return len(self._fonts)
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, font, color), LRU-bounded.
+
+    Outlined labels are composed once into a single surface instead of
+    five renders and five blits per frame.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return surf
+
+    def _store(self, key, surf):
+        self._surfaces[key] = surf
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surf
+
+    def render(self, text, font, color):
+        """Antialiased font.render(text, True, color), cached."""
+        key = (text, font, tuple(color))
+        surf = self._lookup(key)
+        if surf is None:
+            surf = self._store(key, font.render(text, True, color))
+        return surf
+
+    def render_outline(self, text, font, color, outline_color=(0, 0, 0)):
+        """Text with a 1px outline; blit the result at (x - 1, y - 1)."""
+        key = (text, font, tuple(color), tuple(outline_color))
+        surf = self._lookup(key)
+        if surf is None:
+            outline = font.render(text, True, outline_color)
+            w, h = outline.get_size()
+            surf = pygame.Surface((w + 2, h + 2), pygame.SRCALPHA)
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                surf.blit(outline, (1 + dx, 1 + dy))
+            surf.blit(font.render(text, True, color), (1, 1))
+            self._store(key, surf)
+        return surf
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self, name="Text cache"):
+        print(f"{name}: {self.hits} hits, {self.misses} misses ({100.0 * self.hit_rate():.1f}% hit rate), "
+              f"{self.evictions} evictions, {len(self._surfaces)}/{self.max_entries} entries")
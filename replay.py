@@ -0,0 +1,204 @@
+# replay.py
+# Seeded match replays and a headless re-simulator.
+#
+# A replay is a small JSON file: the match seed, the rules and settings it
+# was played with, the ticks at which each bird jumped (delta-encoded), and
+# the final result plus a digest of the final physics state. Re-running the
+# match with game_core (no pygame, no frame cap) reproduces it bit-exactly
+# at thousands of times real time.
+#
+#   python replay.py replays/*.json              # verify recorded matches
+#   python replay.py --ai table replays/x.json   # re-decide the AI, report divergence
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+from game_core import AI_BIRD_X, PIPE_GAP, PIPE_SPACING, RULES, new_game
+from timestep import TICK_RATE
+
+REPLAY_DIR = "replays"
+VERSION = 4  # 2: multiple pipes (pipe_spacing setting); 3: in-state pipe generator, snapshot digest;
+#             4: pipes move by x -= speed (BatchSim arithmetic)
+MAX_TICKS = 10_000_000
+
+
+def _deltas(ticks):
+    out, prev = [], 0
+    for t in ticks:
+        out.append(t - prev)
+        prev = t
+    return out
+
+
+def _undelta(deltas):
+    out, t = [], 0
+    for d in deltas:
+        t += d
+        out.append(t)
+    return out
+
+
+def state_digest(game):
+    """Digest of the physics state; any float drift changes it."""
+    return hashlib.sha256(game.snapshot().tobytes()).hexdigest()[:16]
+
+
+def match_result(game):
+    return {"ticks": game.tick, "score": game.score, "player_alive": game.player_alive,
+            "ai_alive": game.ai_alive, "digest": state_digest(game)}
+
+
+def make_replay(game, settings):
+    return {
+        "version": VERSION,
+        "seed": game.seed,
+        "rules": RULES,
+        "settings": settings,
+        "jumps": _deltas(game.jumps),
+        "ai_jumps": _deltas(game.ai_jumps),
+        "result": match_result(game),
+    }
+
+
+def save_replay(game, settings, replay_dir=REPLAY_DIR, player="player"):
+    """Write the finished match to replay_dir; returns the path."""
+    os.makedirs(replay_dir, exist_ok=True)
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in player)[:20] or "player"
+    base = os.path.join(replay_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}-{game.seed}")
+    path, n = base + ".json", 1
+    while os.path.exists(path):  # same seed within the same second
+        path, n = f"{base}-{n}.json", n + 1
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(make_replay(game, settings), f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def load_replay(path):
+    with open(path, "r") as f:
+        rec = json.load(f)
+    if rec.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported replay version {rec.get('version')}")
+    return rec
+
+
+def recorded_ai(rec):
+    """ai_jump callback that repeats the recorded AI decisions."""
+    ticks = set(_undelta(rec["ai_jumps"]))
+    return lambda game: game.tick in ticks
+
+
+def _ai_state(game):
+    """(bird_y, pipe_top, pipe_x) the AI decides on: its bird and the nearest pipe ahead of it."""
+    pipe_x, pipe_top = game.nearest_pipe(AI_BIRD_X)
+    return game.a_bird_y, pipe_top, pipe_x
+
+
+def policy_ai(backend, difficulty, table_path=None):
+    """ai_jump callback that decides afresh (heuristic, model or table), as player_vs_ai would."""
+    if difficulty == "expert":
+        # the lookahead search needs no model; its time budget makes it machine-dependent
+        from lookahead import LookaheadPlanner
+        return LookaheadPlanner().decide
+    from policy_table import DIFFICULTY_THRESHOLDS, TABLE_FILE, load_table
+    from eval_model import HEURISTIC_MARGINS
+    threshold = DIFFICULTY_THRESHOLDS[difficulty]
+    if backend == "heuristic":
+        margin = HEURISTIC_MARGINS[difficulty]
+        return lambda game: game.a_bird_y > (2 * game.nearest_pipe(AI_BIRD_X)[1] + PIPE_GAP) / 2.0 + margin
+    if backend == "table":
+        table = load_table(table_path or TABLE_FILE)
+        if table is None:
+            raise SystemExit("No policy table to replay with.")
+        return lambda game: table.prob(*_ai_state(game)) > threshold
+    from model_loader import load_model_and_scaler, make_predictor
+    from sim_engine import state_features
+    predict = make_predictor(*load_model_and_scaler())
+    if predict is None:
+        raise SystemExit("No model to replay with.")
+    return lambda game: predict(state_features(*_ai_state(game))[0]) > threshold
+
+
+def simulate(rec, ai_jump=None, max_ticks=MAX_TICKS):
+    """Re-run a replay headless; returns the finished GameState."""
+    if rec["rules"] != RULES:
+        print(f"Warning: replay was recorded with different rules: {rec['rules']}")
+    game = new_game(rec["seed"], rec["settings"].get("pipe_spacing", PIPE_SPACING))
+    game.started = True
+    ai_jump = ai_jump or recorded_ai(rec)
+    jumps = _undelta(rec["jumps"])
+    j = 0
+    while game.end_time is None and game.tick < max_ticks:
+        # a recorded jump is applied before the tick it was recorded at, like the game's event handling
+        if j < len(jumps) and jumps[j] == game.tick:
+            game.player_jump()
+            j += 1
+        game.step(ai_jump)
+        game.apply_collisions()
+    return game
+
+
+def first_divergence(rec, game):
+    """First tick where the AI decided differently from the recording (None if identical)."""
+    recorded, replayed = _undelta(rec["ai_jumps"]), game.ai_jumps
+    for a, b in zip(recorded, replayed):
+        if a != b:
+            return min(a, b)
+    if len(recorded) != len(replayed):
+        longer = recorded if len(recorded) > len(replayed) else replayed
+        return longer[min(len(recorded), len(replayed))]
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate recorded matches headless and check them.")
+    parser.add_argument("replays", nargs="*", help="replay files or directories (default: replays/)")
+    parser.add_argument("--ai", choices=["recorded", "heuristic", "model", "table"], default="recorded",
+                        help="recorded: verify bit-exactly; otherwise re-decide the AI and report divergence")
+    parser.add_argument("--policy-table", help="table file for --ai table")
+    parser.add_argument("--repeat", type=int, default=1, help="re-run each replay N times (throughput)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for p in args.replays or [REPLAY_DIR]:
+        paths.extend(sorted(glob.glob(os.path.join(p, "*.json"))) if os.path.isdir(p) else [p])
+    if not paths:
+        raise SystemExit("No replays found.")
+
+    mismatches = 0
+    total_ticks = 0
+    game_seconds = 0.0
+    start = time.perf_counter()
+    for path in paths:
+        rec = load_replay(path)
+        settings = rec.get("settings", {})
+        for _ in range(args.repeat):
+            ai = None if args.ai == "recorded" else policy_ai(args.ai, settings.get("difficulty", "normal"), args.policy_table)
+            game = simulate(rec, ai)
+            total_ticks += game.tick
+            game_seconds += game.tick / settings.get("tick_rate", TICK_RATE)
+        result = match_result(game)
+        if args.ai == "recorded":
+            ok = result == rec["result"]
+            mismatches += not ok
+            print(f"{'OK  ' if ok else 'DIFF'} {path}: {result['ticks']} ticks, score {result['score']}"
+                  + ("" if ok else f" (recorded {rec['result']}, replayed {result})"))
+        else:
+            tick = first_divergence(rec, game)
+            print(f"{path}: AI {'matches the recording' if tick is None else f'diverges at tick {tick}'}; "
+                  f"score {rec['result']['score']} -> {result['score']}, "
+                  f"AI {'alive' if rec['result']['ai_alive'] else 'dead'} -> {'alive' if result['ai_alive'] else 'dead'}")
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {total_ticks:,} ticks in {elapsed:.3f}s ({total_ticks / elapsed:,.0f} ticks/s, "
+          f"{game_seconds / elapsed:,.0f}x real time)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# score_store.py
+# Process-local high-score table.
+#
+# The JSON file is read once; after that the table lives in memory, sorted
+# by score (descending), and new entries are placed with a bisect insert.
+# Writes go through to disk on a background thread using a temp file +
+# os.replace, so a crash mid-write never leaves a truncated highscores.json
+# and the game loop never waits on disk I/O.
+import bisect
+import json
+import os
+import tempfile
+import threading
+
+
+class ScoreStore:
+    """Sorted top-N score table with asynchronous, atomic persistence."""
+
+    def __init__(self, path, max_scores=10):
+        self.path = path
+        self.max_scores = max_scores
+        self._scores = None   # list of {"name", "score", "stars"} dicts, best first
+        self._keys = None     # -score for each entry, ascending (for bisect)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._requested = 0   # write generations asked for
+        self._written = 0     # write generations on disk
+        self._stopped = False
+        self._writer = None
+
+    # ------------------------------------------------------------------
+    # loading
+    # ------------------------------------------------------------------
+    def _ensure_loaded(self):
+        if self._scores is not None:
+            return
+        scores = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    scores = json.load(f)
+            except Exception as e:
+                print(f"Warning: Failed to load high scores: {e}")
+                scores = []
+        scores.sort(key=lambda x: x["score"], reverse=True)
+        self._scores = scores[:self.max_scores]
+        self._keys = [-entry["score"] for entry in self._scores]
+
+    def reload(self):
+        """Drop the in-memory table and read the file again on next access."""
+        with self._lock:
+            self._scores = None
+            self._keys = None
+
+    # ------------------------------------------------------------------
+    # queries (no I/O after the first load)
+    # ------------------------------------------------------------------
+    def entries(self):
+        """The live, sorted table. Treat as read-only."""
+        self._ensure_loaded()
+        return self._scores
+
+    def rank_for_score(self, score):
+        """Same rules as get_rank_for_score: rank if the score makes the table, else None."""
+        scores = self.entries()
+        if len(scores) < self.max_scores:
+            return len(scores) + 1
+        if score > scores[-1]["score"]:
+            return len(scores)
+        return None
+
+    # ------------------------------------------------------------------
+    # updates
+    # ------------------------------------------------------------------
+    def add(self, name, score, stars=0):
+        """Insert a score in order (after existing equal scores), truncate, persist in background."""
+        with self._lock:
+            self._ensure_loaded()
+            idx = bisect.bisect_right(self._keys, -score)
+            if idx >= self.max_scores:
+                return self._scores
+            self._keys.insert(idx, -score)
+            self._scores.insert(idx, {"name": name, "score": score, "stars": stars})
+            del self._keys[self.max_scores:]
+            del self._scores[self.max_scores:]
+        self._schedule_write()
+        return self._scores
+
+    def replace(self, scores):
+        """Replace the whole table (sorted and truncated) and persist it."""
+        with self._lock:
+            scores = sorted(scores, key=lambda x: x["score"], reverse=True)[:self.max_scores]
+            self._scores = scores
+            self._keys = [-entry["score"] for entry in scores]
+        self._schedule_write()
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    def _schedule_write(self):
+        with self._cond:
+            self._requested += 1
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="score-writer", daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while self._written == self._requested and not self._stopped:
+                    self._cond.wait()
+                if self._written == self._requested:
+                    return
+                target = self._requested
+            with self._lock:
+                snapshot = [dict(entry) for entry in self._scores]
+            self._write_atomic(snapshot)
+            with self._cond:
+                self._written = target
+                self._cond.notify_all()
+
+    def _write_atomic(self, scores):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(self.path) + "-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(scores, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            print(f"Warning: Failed to save high scores: {e}")
+
+    def flush(self, timeout=2.0):
+        """Block until every pending write has reached disk."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written == self._requested, timeout)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
@@ -0,0 +1,175 @@
+# sim_engine.py
+# Headless, vectorized Flappy simulation.
+#
+# Steps N independent games at once as NumPy arrays. The rules mirror the
+# gameplay branch of player_vs_ai.main exactly (same constants, same update
+# order, same collision test), but there is no pygame dependency and no frame
+# cap, so policies can be evaluated at millions of frames per second.
+import numpy as np
+
+# game rules (keep in sync with player_vs_ai.py)
+WIDTH, HEIGHT = 400, 600
+BIRD_X = 50
+AI_BIRD_X = BIRD_X + 40
+BIRD_RADIUS = 15
+GRAVITY = 0.4
+JUMP = -7
+PIPE_GAP = 150
+PIPE_WIDTH = 60
+PIPE_SPEED = 5
+PIPE_SPEED_STEP = 0.15
+PIPE_TOP_MIN = 60
+PIPE_TOP_MAX = 350  # inclusive, like random.randint(60, 350)
+
+N_FEATURES = 7
+
+
+def state_features(bird_y, pipe_top, pipe_x):
+    """(N, 7) model inputs for the (bird_y, pipe_top, pipe_x) state; the rest is derived."""
+    bird_y, pipe_top, pipe_x = np.broadcast_arrays(
+        np.asarray(bird_y, dtype=np.float64), np.asarray(pipe_top, dtype=np.float64), np.asarray(pipe_x, dtype=np.float64))
+    out = np.empty((bird_y.size, N_FEATURES), dtype=np.float64)
+    pipe_bottom = pipe_top + PIPE_GAP
+    out[:, 0] = bird_y.ravel()
+    out[:, 1] = pipe_top.ravel()
+    out[:, 2] = pipe_bottom.ravel()
+    out[:, 3] = pipe_x.ravel()
+    out[:, 4] = pipe_x.ravel() - BIRD_X
+    out[:, 5] = ((pipe_top + pipe_bottom) / 2.0).ravel()
+    out[:, 6] = (pipe_bottom - pipe_top).ravel()
+    return out
+
+
+class BatchSim:
+    """N independent single-bird games stepped together.
+
+    Each lane owns its bird (bird_y, velocity), its pipe (pipe_x, pipe_top),
+    its own pipe speed, score and frame counter. Dead lanes are frozen.
+    """
+
+    def __init__(self, n, bird_x=AI_BIRD_X, seed=None):
+        self.n = int(n)
+        self.bird_x = bird_x
+        self.rng = np.random.default_rng(seed)
+        self.bird_y = np.empty(self.n, dtype=np.float64)
+        self.velocity = np.empty(self.n, dtype=np.float64)
+        self.pipe_x = np.empty(self.n, dtype=np.float64)
+        self.pipe_top = np.empty(self.n, dtype=np.float64)
+        self.pipe_speed = np.empty(self.n, dtype=np.float64)
+        self.pipe_passed = np.empty(self.n, dtype=bool)
+        self.alive = np.empty(self.n, dtype=bool)
+        self.score = np.empty(self.n, dtype=np.int64)
+        self.frames = np.empty(self.n, dtype=np.int64)
+        self.reset()
+
+    def _random_pipe_tops(self, k):
+        return self.rng.integers(PIPE_TOP_MIN, PIPE_TOP_MAX + 1, size=k).astype(np.float64)
+
+    def reset(self, mask=None):
+        """Start new games in every lane (or only the lanes selected by mask)."""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        k = int(np.count_nonzero(mask))
+        self.bird_y[mask] = HEIGHT // 2
+        self.velocity[mask] = 0.0
+        self.pipe_x[mask] = WIDTH
+        self.pipe_top[mask] = self._random_pipe_tops(k)
+        self.pipe_speed[mask] = PIPE_SPEED
+        self.pipe_passed[mask] = False
+        self.alive[mask] = True
+        self.score[mask] = 0
+        self.frames[mask] = 0
+
+    @property
+    def pipe_bottom(self):
+        return self.pipe_top + PIPE_GAP
+
+    def features(self):
+        """Return the (N, 7) feature matrix, same columns as player_vs_ai.make_features."""
+        return state_features(self.bird_y, self.pipe_top, self.pipe_x)
+
+    def collisions(self):
+        """Vectorized check_collision from player_vs_ai.main for every lane."""
+        r = BIRD_RADIUS
+        bird_top = self.bird_y - r
+        bird_bottom = self.bird_y + r
+        hit_pipe_x = (self.bird_x + r > self.pipe_x) & (self.bird_x - r < self.pipe_x + PIPE_WIDTH)
+        hit_pipe_y = (bird_top < self.pipe_top) | (bird_bottom > self.pipe_bottom)
+        out = (bird_bottom >= HEIGHT) | (bird_top <= 0)
+        return (hit_pipe_x & hit_pipe_y) | out
+
+    def step(self, jump):
+        """Advance every live lane by one frame.
+
+        jump is a boolean array (or scalar) with the decision for this frame;
+        it is applied before gravity, like the AI branch of the game loop.
+        Returns the alive mask after the step.
+        """
+        live = self.alive
+        if not live.any():
+            return live
+        jump = np.broadcast_to(np.asarray(jump, dtype=bool), (self.n,))
+
+        # bird physics
+        self.velocity = np.where(live & jump, JUMP, self.velocity)
+        self.velocity = np.where(live, self.velocity + GRAVITY, self.velocity)
+        self.bird_y = np.where(live, self.bird_y + self.velocity, self.bird_y)
+
+        # pipe movement
+        self.pipe_x = np.where(live, self.pipe_x - self.pipe_speed, self.pipe_x)
+
+        # scoring: when the bird passes the pipe
+        passed = live & ((self.pipe_x + PIPE_WIDTH) < BIRD_X) & ~self.pipe_passed
+        self.score += passed
+        self.pipe_passed |= passed
+
+        # recycle pipes that left the screen
+        recycle = live & (self.pipe_x < -PIPE_WIDTH)
+        k = int(np.count_nonzero(recycle))
+        if k:
+            self.pipe_x[recycle] = WIDTH
+            self.pipe_top[recycle] = self._random_pipe_tops(k)
+            self.pipe_passed[recycle] = False
+            self.pipe_speed[recycle] += PIPE_SPEED_STEP
+
+        self.frames += live
+        self.alive = live & ~self.collisions()
+        return self.alive
+
+    def run(self, policy, max_frames=100000):
+        """Step until every lane is dead (or max_frames); policy(sim) -> jump mask."""
+        for _ in range(max_frames):
+            if not self.step(policy(self)).any():
+                break
+        return self.score.copy(), self.frames.copy()
+
+
+def heuristic_policy(margin=0.0):
+    """Vectorized gap-center heuristic from player_vs_ai.main."""
+    def policy(sim):
+        gap_center = (sim.pipe_top + sim.pipe_bottom) / 2.0
+        return sim.bird_y > gap_center + margin
+    return policy
+
+
+def model_policy(predict_batch, threshold=0.5):
+    """Policy from predict_batch((k, 7) features) -> (k,) jump probabilities; only live lanes are evaluated."""
+    def policy(sim):
+        jump = np.zeros(sim.n, dtype=bool)
+        live = np.flatnonzero(sim.alive)
+        if len(live):
+            jump[live] = predict_batch(sim.features()[live]) > threshold
+        return jump
+    return policy
+
+
+if __name__ == "__main__":
+    import time
+
+    n = 10000
+    sim = BatchSim(n, seed=0)
+    start = time.perf_counter()
+    scores, frames = sim.run(heuristic_policy(0.0), max_frames=5000)
+    elapsed = time.perf_counter() - start
+    print(f"{n} games, {int(frames.sum())} frames in {elapsed:.2f}s "
+          f"({frames.sum() / elapsed:,.0f} frames/s), mean score {scores.mean():.2f}")
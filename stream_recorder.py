@@ -0,0 +1,169 @@
+# stream_recorder.py
+# Streaming, crash-safe CSV writer for recorded gameplay.
+#
+# Frames go into a preallocated float64 chunk (plus a uint8 action column)
+# instead of a Python list of lists. Each full chunk is handed to a
+# background thread that appends it to the CSV and fsyncs, so memory stays
+# flat and a crash loses at most one chunk. Re-opening an interrupted file
+# drops a half-written last line and keeps appending.
+import os
+import queue
+import threading
+
+import numpy as np
+
+HEADER = ["bird_y", "top_pipe_y", "bottom_pipe_y", "pipe_x", "distance_to_pipe", "gap_center", "gap_size", "action"]
+N_FEATURES = len(HEADER) - 1
+
+
+def _repair_tail(path):
+    """Truncate a trailing partial line left by an interrupted write; return bytes removed."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0
+    with open(path, "rb+") as f:
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        # walk back to the last newline
+        pos = size
+        step = 4096
+        while pos > 0:
+            start = max(0, pos - step)
+            f.seek(start)
+            block = f.read(pos - start)
+            idx = block.rfind(b"\n")
+            if idx != -1:
+                keep = start + idx + 1
+                f.truncate(keep)
+                return size - keep
+            pos = start
+        f.truncate(0)
+        return size
+
+
+def count_rows(path):
+    """Number of data rows in an existing CSV (header excluded)."""
+    lines = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+    return max(0, lines - 1)
+
+
+class StreamingRecorder:
+    """Append-only CSV recorder that flushes fixed-size chunks in the background."""
+
+    def __init__(self, path, chunk_size=400, header=HEADER):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.header = list(header)
+        self.n_features = len(self.header) - 1
+        self.rows_written = 0
+        self.resumed_rows = 0
+        self._open_file()
+        self._feats = np.empty((chunk_size, self.n_features), dtype=np.float64)
+        self._actions = np.empty(chunk_size, dtype=np.uint8)
+        self._n = 0
+        # recycled buffers so steady-state recording does not allocate
+        self._free = queue.Queue()
+        self._jobs = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._write_loop, name="recorder", daemon=True)
+        self._thread.start()
+
+    def _open_file(self):
+        header_line = ",".join(self.header) + "\n"
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            dropped = _repair_tail(self.path)
+            if dropped:
+                print(f"Recovered {self.path}: dropped {dropped} bytes of an interrupted row.")
+            with open(self.path, "r", newline="") as f:
+                existing = f.readline()
+            if existing and existing.rstrip("\r\n") != header_line.rstrip("\n"):
+                raise ValueError(f"{self.path} has a different header: {existing.strip()!r}")
+            if existing:
+                self.resumed_rows = count_rows(self.path)
+                print(f"Resuming {self.path} ({self.resumed_rows} rows already recorded).")
+        self._file = open(self.path, "a", newline="")
+        if self._file.tell() == 0:
+            self._file.write(header_line)
+            self._flush_to_disk()
+
+    def _flush_to_disk(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, features, action):
+        """Record one frame: the feature values (in header order) and the action."""
+        self._feats[self._n] = features
+        self._actions[self._n] = action
+        self._n += 1
+        if self._n == self.chunk_size:
+            self._submit()
+
+    def extend(self, features, actions):
+        """Record many frames at once: an (n, n_features) array and n actions."""
+        features = np.asarray(features)
+        actions = np.asarray(actions)
+        i = 0
+        while i < len(features):
+            take = min(self.chunk_size - self._n, len(features) - i)
+            self._feats[self._n:self._n + take] = features[i:i + take]
+            self._actions[self._n:self._n + take] = actions[i:i + take]
+            self._n += take
+            i += take
+            if self._n == self.chunk_size:
+                self._submit()
+
+    def _submit(self):
+        if self._error is not None:
+            raise self._error
+        if self._n == 0:
+            return
+        self._jobs.put((self._feats, self._actions, self._n))
+        try:
+            self._feats, self._actions = self._free.get_nowait()
+        except queue.Empty:
+            self._feats = np.empty((self.chunk_size, self.n_features), dtype=np.float64)
+            self._actions = np.empty(self.chunk_size, dtype=np.uint8)
+        self._n = 0
+
+    def _write_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            feats, actions, n = job
+            try:
+                # same text as csv.writer: repr() of each float, int action
+                lines = [",".join(map(repr, row)) + f",{a}\n"
+                         for row, a in zip(feats[:n].tolist(), actions[:n].tolist())]
+                self._file.write("".join(lines))
+                self._flush_to_disk()
+                self.rows_written += n
+            except Exception as e:
+                self._error = e
+                print(f"Warning: recorder failed to write {self.path}: {e}")
+            self._free.put((feats, actions))
+
+    def flush(self):
+        """Push the current partial chunk to the writer."""
+        self._submit()
+
+    def close(self):
+        """Write everything still buffered and close the file."""
+        self._submit()
+        self._jobs.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+        return self.rows_written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,132 @@
+# stream_train.py
+# Out-of-core helpers for training on datasets larger than RAM.
+#
+# Works on a memory-mapped columnar dataset (see columnar_dataset.py):
+#   * hash_split assigns every row to train/validation from a hash of its
+#     row index, so the split is deterministic and needs no shuffled copy;
+#   * fit_scaler_streaming fits the StandardScaler in one pass over chunks;
+#   * batch_stream yields scaled, shuffled minibatches chunk by chunk from a
+#     background prefetch thread.
+# Memory use is bounded by chunk_rows and the prefetch depth, not by the
+# dataset size.
+import queue
+import threading
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+CHUNK_ROWS = 1 << 18
+PREFETCH = 4
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x):
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * _M1
+    x = (x ^ (x >> np.uint64(27))) * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+def hash_split(start, stop, val_fraction=0.15, seed=42):
+    """Boolean mask for rows [start, stop): True = validation row.
+
+    The assignment depends only on (row index, seed), so it is the same on
+    every pass and every machine, and appending rows never reshuffles old ones.
+    """
+    idx = np.arange(start, stop, dtype=np.uint64) ^ np.uint64(seed)
+    with np.errstate(over="ignore"):
+        h = _splitmix64(idx)
+    # top 53 bits -> uniform float in [0, 1)
+    u = (h >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+    return u < val_fraction
+
+
+def iter_chunks(n_rows, chunk_rows=CHUNK_ROWS):
+    for start in range(0, n_rows, chunk_rows):
+        yield start, min(start + chunk_rows, n_rows)
+
+
+def fit_scaler_streaming(X, val_fraction=0.15, seed=42, chunk_rows=CHUNK_ROWS):
+    """Fit a StandardScaler on the training rows of X in a single chunked pass.
+
+    Returns (scaler, n_train, n_val).
+    """
+    scaler = StandardScaler()
+    n_train = n_val = 0
+    for start, stop in iter_chunks(len(X), chunk_rows):
+        val = hash_split(start, stop, val_fraction, seed)
+        train_rows = np.asarray(X[start:stop][~val], dtype=np.float64)
+        if len(train_rows):
+            scaler.partial_fit(train_rows)
+        n_train += len(train_rows)
+        n_val += int(val.sum())
+    return scaler, n_train, n_val
+
+
+def _batches(X, y, scaler, subset, batch_size, val_fraction, seed, chunk_rows, shuffle, epoch):
+    rng = np.random.default_rng((seed, epoch))
+    chunks = list(iter_chunks(len(X), chunk_rows))
+    if shuffle:
+        rng.shuffle(chunks)
+    mean = scaler.mean_.astype(np.float32)
+    scale = scaler.scale_.astype(np.float32)
+    carry_x = carry_y = None
+    for start, stop in chunks:
+        val = hash_split(start, stop, val_fraction, seed)
+        keep = val if subset == "val" else ~val
+        xb = (np.asarray(X[start:stop][keep], dtype=np.float32) - mean) / scale
+        yb = np.asarray(y[start:stop][keep], dtype=np.float32)
+        if shuffle:
+            order = rng.permutation(len(xb))
+            xb, yb = xb[order], yb[order]
+        if carry_x is not None:
+            xb = np.concatenate([carry_x, xb])
+            yb = np.concatenate([carry_y, yb])
+        full = len(xb) - len(xb) % batch_size
+        for i in range(0, full, batch_size):
+            yield xb[i:i + batch_size], yb[i:i + batch_size]
+        carry_x, carry_y = xb[full:], yb[full:]
+    if carry_x is not None and len(carry_x):
+        yield carry_x, carry_y
+
+
+def _prefetch(gen, depth):
+    """Run a generator on a background thread, buffering up to depth items."""
+    q = queue.Queue(maxsize=depth)
+    done = object()
+    errors = []
+
+    def worker():
+        try:
+            for item in gen:
+                q.put(item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=worker, name="batch-prefetch", daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            if errors:
+                raise errors[0]
+            return
+        yield item
+
+
+def batch_stream(X, y, scaler, subset="train", batch_size=64, val_fraction=0.15, seed=42,
+                 chunk_rows=CHUNK_ROWS, shuffle=True, epochs=None, prefetch=PREFETCH):
+    """Yield (x, y) float32 minibatches of the train or val subset, forever unless epochs is set."""
+    epoch = 0
+    while epochs is None or epoch < epochs:
+        gen = _batches(X, y, scaler, subset, batch_size, val_fraction, seed, chunk_rows, shuffle, epoch)
+        yield from _prefetch(gen, prefetch)
+        epoch += 1
+
+
+def steps_for(n_rows, batch_size):
+    return max(1, -(-n_rows // batch_size))
@@ -0,0 +1,271 @@
+# sweep.py
+# Parallel hyperparameter sweep for the imitation model (train_model.py).
+#
+# The dataset is loaded, split and scaled once in the parent, exactly as
+# train_model.train does it, and written to .npy files that every worker
+# memory-maps read-only: one copy in the page cache however many workers
+# run. Each worker process is pinned to its own slice of CPUs, with
+# TensorFlow's thread pools sized to match, so concurrent fits don't fight
+# over cores. Configurations come from a grid (every combination) or from
+# random search over the same parameters, where "lo:hi" is a log-uniform
+# range. Inference latency is measured afterwards in the parent, one
+# configuration at a time, on the NumPy forward pass the game runs.
+#
+#   python sweep.py                                        # default grid
+#   python sweep.py --param hidden=128/64/32,64/32 --param lr=1e-3,3e-3
+#   python sweep.py --random 20 --param lr=1e-4:1e-2 --param batch_size=32,64,256
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from balanced_sampler import BalancedBatchSampler, balanced_batches, build_class_index, prior_shift
+from numpy_mlp import NumpyMLP, save_bundle
+
+RESULTS_FILE = "sweep_results.csv"
+
+# parameter -> value parser; hidden layers are written 128/64/32
+PARAMS = {
+    "hidden": lambda s: tuple(int(h) for h in s.split("/") if h),
+    "dropout": float,
+    "lr": float,
+    "batch_size": int,
+    "balance_alpha": float,
+}
+DEFAULT_GRID = {
+    "hidden": [(128, 64, 32), (64, 32), (32,)],
+    "lr": [1e-3, 3e-3],
+    "batch_size": [64, 256],
+}
+
+_worker = {}  # per-process data and settings, set by _init_worker
+
+
+def parse_param(spec):
+    """'name=v1,v2' -> (name, [values]); 'name=lo:hi' -> (name, (lo, hi)) for random search."""
+    name, sep, values = spec.partition("=")
+    if not sep or name not in PARAMS:
+        raise ValueError(f"expected one of {', '.join(PARAMS)} as name=values, got {spec!r}")
+    if ":" in values:
+        if name == "hidden":
+            raise ValueError("hidden takes a list of layer shapes, not a range")
+        lo, hi = (float(v) for v in values.split(":"))
+        if not 0 < lo < hi:
+            raise ValueError(f"{name}: range needs 0 < lo < hi, got {values}")
+        return name, (lo, hi)
+    return name, [PARAMS[name](v) for v in values.split(",") if v]
+
+
+def grid_configs(space):
+    """Every combination of the listed values."""
+    names = list(space)
+    if any(isinstance(space[n], tuple) for n in names):
+        raise ValueError("ranges (lo:hi) need --random")
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_configs(space, n, seed=0):
+    """n configurations: a uniform pick from each value list, log-uniform within each range."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                value = float(np.exp(rng.uniform(np.log(values[0]), np.log(values[1]))))
+                config[name] = int(round(value)) if PARAMS[name] is int else value
+            else:
+                config[name] = values[rng.integers(len(values))]
+        configs.append(config)
+    return configs
+
+
+def available_cpus():
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_slices(workers, threads=None):
+    """Disjoint CPU sets, one per worker."""
+    cpus = available_cpus()
+    threads = threads or max(1, len(cpus) // workers)
+    if workers * threads > len(cpus):
+        raise ValueError(f"{workers} workers x {threads} threads needs {workers * threads} CPUs, have {len(cpus)}")
+    return [cpus[i * threads:(i + 1) * threads] for i in range(workers)]
+
+
+def _init_worker(slots, data_dir, epochs, seed):
+    cpus = slots.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    # thread pools are sized when the libraries load, so this has to come before the import
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[var] = str(len(cpus))
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(len(cpus))
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _worker.update({name: np.load(os.path.join(data_dir, name + ".npy"), mmap_mode="r")
+                    for name in ("X_train", "y_train", "X_val", "y_val")})
+    _worker.update(cpus=cpus, epochs=epochs, seed=seed)
+
+
+def _fit(task):
+    """Worker entry point: train one configuration, return its scores and weights."""
+    import tensorflow as tf
+    from numpy_mlp import _dense_layers
+    from train_model import fit_model
+    i, config = task
+    w = _worker
+    X_train, y_train, X_val, y_val = w["X_train"], w["y_train"], w["X_val"], w["y_val"]
+    tf.keras.utils.set_random_seed(w["seed"])
+
+    # batches are gathered from the shared memory map; alpha 1 keeps the natural class mix
+    alpha = config.get("balance_alpha", 1.0)
+    batch_size = config.get("batch_size", 64)
+    sampler = BalancedBatchSampler(build_class_index(y_train), batch_size, alpha, w["seed"])
+    shift = prior_shift(sampler.index.counts, sampler.shares) if alpha != 1.0 else None
+    signature = (tf.TensorSpec(shape=(None, X_train.shape[1]), dtype=tf.float32),
+                 tf.TensorSpec(shape=(None,), dtype=tf.float32))
+    ds = tf.data.Dataset.from_generator(lambda: balanced_batches(X_train, y_train, sampler),
+                                        output_signature=signature)
+    val_batches = lambda: ((X_val[j:j + 8192], y_val[j:j + 8192]) for j in range(0, len(X_val), 8192))
+    model_params = {k: v for k, v in (("hidden", config.get("hidden")), ("dropout", config.get("dropout")),
+                                      ("learning_rate", config.get("lr"))) if v is not None}
+
+    start = time.perf_counter()
+    model, losses = fit_model(X_train.shape[1], (ds,), sampler.steps_per_epoch, (np.asarray(X_val), np.asarray(y_val)),
+                              None, w["epochs"], val_batches=val_batches if shift is not None else None,
+                              shift=shift, model_params=model_params, checkpoint=None, verbose=0)
+    train_s = time.perf_counter() - start
+    loss, accuracy = model.evaluate(np.asarray(X_val), np.asarray(y_val), batch_size=8192, verbose=0)
+    kernels, biases, activations = zip(*_dense_layers(model))
+    return {"id": i, "config": config, "val_accuracy": float(accuracy), "val_loss": float(loss),
+            "epochs": len(losses), "train_s": train_s, "cpus": w["cpus"],
+            "kernels": kernels, "biases": biases, "activations": activations}
+
+
+def inference_latency(mlp, row, calls=2000):
+    """Median microseconds for one single-row forward pass (the per-frame cost in the game)."""
+    mlp.predict_proba(row)  # warm-up
+    times = np.empty(calls)
+    for j in range(calls):
+        start = time.perf_counter()
+        mlp.predict_proba(row)
+        times[j] = time.perf_counter() - start
+    return float(np.median(times) * 1e6)
+
+
+def sweep(X, y, configs, workers=None, threads=None, epochs=30, seed=42):
+    """Train every configuration on a process pool; returns (results sorted by val loss, scaler)."""
+    from train_model import split_and_scale
+    if workers is None:
+        workers = len(available_cpus()) // (threads or 1)
+    slices = cpu_slices(max(1, min(workers, len(configs))), threads)
+    X_train, X_val, y_train, y_val, scaler = split_and_scale(X, y)
+    data_dir = tempfile.mkdtemp(prefix="flappy-sweep-")
+    try:
+        for name, a in (("X_train", X_train), ("y_train", y_train), ("X_val", X_val), ("y_val", y_val)):
+            np.save(os.path.join(data_dir, name + ".npy"), np.ascontiguousarray(a, dtype=np.float32))
+        print(f"Sweeping {len(configs)} configurations on {len(slices)} workers x {len(slices[0])} CPUs "
+              f"({len(X_train)} train / {len(X_val)} validation rows, up to {epochs} epochs)")
+
+        ctx = mp.get_context("spawn")  # fresh interpreters: TensorFlow must not be loaded before pinning
+        slots = ctx.Queue()
+        for cpus in slices:
+            slots.put(cpus)
+        results = []
+        start = time.perf_counter()
+        with ctx.Pool(len(slices), initializer=_init_worker, initargs=(slots, data_dir, epochs, seed)) as pool:
+            for r in pool.imap_unordered(_fit, list(enumerate(configs))):
+                results.append(r)
+                print(f"[{len(results)}/{len(configs)}] {format_config(r['config'])}: "
+                      f"acc {r['val_accuracy']:.4f}, loss {r['val_loss']:.4f}, {r['train_s']:.1f}s")
+        wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    # latency is timed here, one model at a time, so concurrent training doesn't skew it
+    row = X[:1].astype(np.float64)
+    for r in results:
+        r["mlp"] = NumpyMLP(scaler.mean_, scaler.scale_, r.pop("kernels"), r.pop("biases"), r.pop("activations"))
+        r["latency_us"] = inference_latency(r["mlp"], row)
+        r["params"] = sum(w.size + b.size for w, b in zip(r["mlp"].weights, r["mlp"].biases))
+    print(f"Trained {len(results)} configurations in {wall:.1f}s "
+          f"({sum(r['train_s'] for r in results) / wall:.1f}x parallel speedup)")
+    return sorted(results, key=lambda r: r["val_loss"]), scaler
+
+
+def format_config(config):
+    return " ".join(f"{k}={'/'.join(map(str, v)) if isinstance(v, tuple) else f'{v:g}' if isinstance(v, float) else v}"
+                    for k, v in config.items())
+
+
+COLUMNS = ["rank", "config", "val_accuracy", "val_loss", "epochs", "train_s", "latency_us", "params"]
+
+
+def format_table(results):
+    lines = [f"{'rank':>4s}  {'configuration':<48s} {'val acc':>8s} {'val loss':>8s} {'epochs':>6s} "
+             f"{'train s':>8s} {'latency us':>10s} {'params':>7s}"]
+    for rank, r in enumerate(results, 1):
+        lines.append(f"{rank:>4d}  {format_config(r['config']):<48s} {r['val_accuracy']:>8.4f} {r['val_loss']:>8.4f} "
+                     f"{r['epochs']:>6d} {r['train_s']:>8.1f} {r['latency_us']:>10.1f} {r['params']:>7d}")
+    return "\n".join(lines)
+
+
+def write_results(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for rank, r in enumerate(results, 1):
+            writer.writerow([rank, format_config(r["config"]), f"{r['val_accuracy']:.6f}", f"{r['val_loss']:.6f}",
+                             r["epochs"], f"{r['train_s']:.3f}", f"{r['latency_us']:.2f}", r["params"]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train many model configurations in parallel and tabulate them.")
+    parser.add_argument("--data", default=None, help="training data (.csv or .fcol); default as in train_model.py")
+    parser.add_argument("--data-dir", default=".", help="directory whose recordings are merged (see ingest.py)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                        help=f"values to sweep for one of {', '.join(PARAMS)}: comma-separated (hidden layers "
+                             f"as 128/64/32), or lo:hi for a log-uniform range with --random (repeatable)")
+    parser.add_argument("--random", type=int, metavar="N", help="random search: N sampled configurations")
+    parser.add_argument("--epochs", type=int, default=30, help="epoch cap per configuration (early stopping applies)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: as many as the CPUs allow)")
+    parser.add_argument("--threads", type=int, default=None, help="CPUs pinned to each worker (default: even split)")
+    parser.add_argument("--out", default=RESULTS_FILE, help="results table (CSV)")
+    parser.add_argument("--export-best", metavar="FILE", help="also write the best model as a NumPy bundle")
+    args = parser.parse_args(argv)
+
+    try:
+        space = dict(parse_param(p) for p in args.param) or dict(DEFAULT_GRID)
+        configs = random_configs(space, args.random, args.seed) if args.random else grid_configs(space)
+        if args.workers is not None:
+            cpu_slices(min(args.workers, len(configs)), args.threads)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from train_model import default_data_path, load_training_data
+    X, y = load_training_data(args.data or default_data_path(args.data_dir))
+    results, scaler = sweep(X, y, configs, args.workers, args.threads, args.epochs, args.seed)
+    print(format_table(results))
+    write_results(results, args.out)
+    print(f"Results written to {args.out}")
+    if args.export_best:
+        mlp = results[0]["mlp"]
+        save_bundle(args.export_best, mlp.mean, mlp.scale, mlp.weights, mlp.biases, mlp.activation_names)
+        print(f"Exported the best configuration ({format_config(results[0]['config'])}) to {args.export_best}")
+
+
+if __name__ == "__main__":
+    main()
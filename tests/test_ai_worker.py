@@ -0,0 +1,51 @@
+import threading
+import time
+
+import numpy as np
+
+from ai_worker import AIDecisionWorker
+
+
+def test_ticks_of_a_frame_share_one_wait_budget():
+    release = threading.Event()
+
+    def predict(feats):
+        release.wait()
+        return 0.75
+
+    worker = AIDecisionWorker(predict)
+    try:
+        worker.begin_frame(0.02)
+        start = time.perf_counter()
+        first = [worker.decide(np.zeros(4)) for _ in range(10)]
+        # ten catch-up ticks cost one budget, not ten
+        assert time.perf_counter() - start < 0.15
+        assert first == [None] * 10
+        assert worker.fallbacks == 10
+
+        release.set()
+        worker.begin_frame(1.0)
+        assert worker.decide(np.zeros(4)) == 0.75
+    finally:
+        worker.stop()
+
+
+def test_spent_budget_reuses_the_last_answer():
+    gate = threading.Event()
+    gate.set()
+
+    def predict(feats):
+        gate.wait()
+        return float(feats[0])
+
+    worker = AIDecisionWorker(predict)
+    try:
+        worker.begin_frame(1.0)
+        assert worker.decide(np.full(4, 0.25)) == 0.25
+        gate.clear()
+        worker.begin_frame(0.01)
+        assert worker.decide(np.full(4, 0.9)) == 0.25
+        assert worker.reused == 1
+    finally:
+        gate.set()
+        worker.stop()
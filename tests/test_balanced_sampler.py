@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from balanced_sampler import BalancedBatchSampler, build_class_index, prior_shift
+
+
+def labels(n_pos=400, n=10_000, seed=0):
+    y = np.zeros(n, dtype=np.uint8)
+    y[np.random.default_rng(seed).choice(n, n_pos, replace=False)] = 1
+    return y
+
+
+def test_class_index_is_built_in_chunks():
+    y = labels()
+    index = build_class_index(y, chunk_rows=777)
+    np.testing.assert_array_equal(index.counts, [9600, 400])
+    np.testing.assert_array_equal(np.sort(index.of(1)), np.flatnonzero(y))
+
+
+def test_equal_shares_fill_every_batch_half_and_half():
+    y = labels()
+    sampler = BalancedBatchSampler(build_class_index(y), batch_size=64, alpha=0.0)
+    for rows in sampler.epoch():
+        assert len(rows) == 64
+        assert int(y[rows].sum()) == 32
+
+
+@pytest.mark.parametrize("alpha", [0.3, 0.5])
+def test_fractional_quotas_hold_over_a_run_of_batches(alpha):
+    y = labels()
+    sampler = BalancedBatchSampler(build_class_index(y), batch_size=50, alpha=alpha)
+    taken = np.array([int(y[sampler.next_batch()].sum()) for _ in range(1000)])
+    exact = sampler.shares[1] * 50 * np.arange(1, 1001)
+    assert np.all(np.abs(np.cumsum(taken) - exact) < 1.0)
+
+
+def test_minority_rows_cycle_without_duplicates():
+    y = labels(n_pos=100)
+    sampler = BalancedBatchSampler(build_class_index(y), batch_size=20, alpha=0.0)
+    positives = np.concatenate([rows[y[rows] == 1] for rows in (sampler.next_batch() for _ in range(10))])
+    # ten batches of ten positives walk the 100 minority rows once each
+    assert len(positives) == len(np.unique(positives)) == 100
+
+
+def test_prior_shift_restores_the_natural_odds():
+    shift = prior_shift([9600, 400], [0.5, 0.5])
+    assert shift == pytest.approx(np.log(400 / 9600))
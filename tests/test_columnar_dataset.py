@@ -0,0 +1,39 @@
+import numpy as np
+
+from columnar_dataset import FEATURES, convert_csv, open_dataset, write_dataset
+
+
+def test_write_and_memory_map_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, len(FEATURES))).astype(np.float32)
+    y = (rng.random(1000) < 0.1).astype(np.uint8)
+    path = str(tmp_path / "d.fcol")
+    write_dataset(path, X, y)
+
+    ds = open_dataset(path)
+    assert len(ds) == 1000
+    np.testing.assert_array_equal(ds.X, X)
+    np.testing.assert_array_equal(ds.y, y)
+    np.testing.assert_array_equal(ds.column("gap_size"), X[:, FEATURES.index("gap_size")])
+
+
+def test_convert_csv_drops_blank_and_truncated_lines(tmp_path):
+    header = ",".join(FEATURES + ["action"])
+    rows = [f"{300 + i},100,250,{200 - i},{150 - i},175,150,{i % 2}" for i in range(5)]
+    path = tmp_path / "crashed.csv"
+    # a blank line in the middle and a last line cut short, with no newline, as a crash leaves it
+    path.write_text("\n".join([header, rows[0], rows[1], "", rows[2], rows[3], rows[4], "310,100,250,19"]))
+
+    ds = open_dataset(convert_csv([str(path)], str(tmp_path / "out.fcol")))
+    assert len(ds) == 5
+    np.testing.assert_array_equal(ds.y, [0, 1, 0, 1, 0])
+    np.testing.assert_array_equal(ds.column("bird_y"), [300, 301, 302, 303, 304])
+
+
+def test_convert_legacy_five_column_csv(tmp_path):
+    path = tmp_path / "legacy.csv"
+    path.write_text("bird_y,pipe_top,pipe_bottom,pipe_x,action\n300,100,250,200,1\n310,120,270,195,0\n")
+    ds = open_dataset(convert_csv(str(path), str(tmp_path / "out.fcol")))
+    np.testing.assert_array_equal(ds.column("gap_center"), [175, 195])
+    np.testing.assert_array_equal(ds.column("distance_to_pipe"), [150, 145])
+    np.testing.assert_array_equal(ds.y, [1, 0])
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from game_core import AI_BIRD_X, PIPE_GAP, PIPE_SPEED, new_game
+from sim_engine import BatchSim
+
+
+@pytest.mark.parametrize("seed", [0, 1, 7])
+def test_game_state_matches_batch_sim_tick_for_tick(seed):
+    # both birds are kept alive so the pipes run long enough for the speed to
+    # pick up many non-integer steps, where rounding differences would show
+    game = new_game(seed)
+    game.player_alive = False
+    sim = BatchSim(1, seed=0)
+    sim.pipe_top[0] = game.pipe_at(game.pipe_head)[1]
+    rng = np.random.default_rng(seed)
+    for _ in range(3000):
+        x, top = game.nearest_pipe(AI_BIRD_X)
+        assert (sim.bird_y[0], sim.pipe_x[0], sim.pipe_top[0]) == (game.a_bird_y, x, top)
+        assert bool(sim.collisions()[0]) == game.check_collision(AI_BIRD_X, game.a_bird_y)
+        jump = bool(game.a_bird_y > top + PIPE_GAP / 2.0 + rng.normal(0.0, 20.0))
+        tail = game.pipe_tail
+        game.step(lambda _: jump)
+        sim.alive[0] = True
+        sim.step(np.array([jump]))
+        if game.pipe_tail != tail:
+            # same pipe heights on both sides
+            sim.pipe_top[0] = game.pipe_at(game.pipe_tail - 1)[1]
+        assert (sim.pipe_speed[0], sim.score[0]) == (game.pipe_speed, game.score)
+    assert game.pipe_speed > PIPE_SPEED + 1
+
+
+def test_restore_rolls_back_to_snapshot():
+    game = new_game(3)
+    for _ in range(50):
+        game.step(lambda g: g.tick % 15 == 0)
+    snap, jumps = game.snapshot(), list(game.ai_jumps)
+    for _ in range(200):
+        game.step(lambda g: g.tick % 11 == 0)
+    game.restore(snap)
+    assert game.snapshot() == snap
+    assert game.ai_jumps == jumps
@@ -0,0 +1,22 @@
+import os
+
+import numpy as np
+
+from columnar_dataset import open_dataset
+from gen_data import generate_shard
+from ingest import GENERATED_DIR, ingest
+
+
+def test_generated_shards_are_ingested_with_pre_step_labels(tmp_path):
+    os.makedirs(tmp_path / GENERATED_DIR)
+    spec = {"seed": 1, "frames": 3000, "lanes": 8, "format": "csv",
+            "out": str(tmp_path / GENERATED_DIR / "synthetic_000.csv"),
+            "margin": 0.0, "margin_noise": 0.0, "epsilon": 0.0, "max_episode_frames": 20000}
+    generate_shard(spec)
+
+    ds = open_dataset(ingest(str(tmp_path), cache_dir=str(tmp_path / "cache")))
+    assert len(ds) == 3000
+    # a noise-free expert jumps exactly when the bird it saw was below the gap center
+    action = np.asarray(ds.y)
+    expected = ds.column("bird_y") > ds.column("gap_center")
+    np.testing.assert_array_equal(action.astype(bool), expected)
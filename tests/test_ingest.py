@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+import ingest
+from columnar_dataset import FEATURES, LABEL, open_dataset
+
+
+def write_recording(path, n, offset=0):
+    lines = [",".join(FEATURES + [LABEL])]
+    lines += [f"{300 + offset + i},100,250,200,150,175,150,{i % 2}" for i in range(n)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_ingest_reuses_and_rebuilds_the_merge(tmp_path):
+    cache = str(tmp_path / "cache")
+    write_recording(tmp_path / "a.csv", 10)
+    first = ingest.ingest(str(tmp_path), cache_dir=cache)
+    assert ingest.ingest(str(tmp_path), cache_dir=cache) == first
+
+    write_recording(tmp_path / "b.csv", 5, offset=100)
+    second = ingest.ingest(str(tmp_path), cache_dir=cache)
+    assert second != first and len(open_dataset(second)) == 15
+    # the superseded merge is cleaned up
+    assert not os.path.exists(first)
+
+
+def test_failed_merge_leaves_no_dataset_behind(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    write_recording(tmp_path / "a.csv", 10)
+    write_recording(tmp_path / "b.csv", 10, offset=50)
+    real_merge = ingest.merge_datasets
+
+    def crash(parts, out_path):
+        real_merge(parts, out_path)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ingest, "merge_datasets", crash)
+    with pytest.raises(OSError):
+        ingest.ingest(str(tmp_path), cache_dir=str(cache))
+    assert not list(cache.glob("merged-*.fcol"))
+
+    monkeypatch.setattr(ingest, "merge_datasets", real_merge)
+    merged = ingest.ingest(str(tmp_path), cache_dir=str(cache))
+    assert len(open_dataset(merged)) == 20
+    assert not list(cache.glob("*.tmp"))
@@ -0,0 +1,23 @@
+import numpy as np
+
+from columnar_dataset import open_dataset, write_dataset
+from policy_table import agreement, build_table, dataset_states, sample_states
+from sim_engine import PIPE_GAP, state_features
+
+
+def gap_center_policy(X):
+    """Jump probability 1 below the gap center, 0 above (columns as in state_features)."""
+    return (X[:, 0] > X[:, 1] + PIPE_GAP / 2.0).astype(np.float64)
+
+
+def test_build_table_and_check_on_fcol_states(tmp_path):
+    bird_y, pipe_top, pipe_x = sample_states(500, seed=1)
+    path = str(tmp_path / "states.fcol")
+    write_dataset(path, state_features(bird_y, pipe_top, pipe_x), np.zeros(500, dtype=np.uint8))
+
+    table = build_table(gap_center_policy, {"bird_y": 8.0, "pipe_top": 8.0, "pipe_x": 40.0})
+    states = dataset_states(open_dataset(path))
+    np.testing.assert_array_equal(states[0], bird_y.astype(np.float32))
+    np.testing.assert_array_equal(states[1], pipe_top.astype(np.float32))
+    rates = agreement(table, gap_center_policy, states)
+    assert rates[0.5] > 0.9
@@ -0,0 +1,39 @@
+from game_core import AI_BIRD_X, PIPE_GAP, new_game
+from replay import first_divergence, load_replay, match_result, recorded_ai, save_replay, simulate
+
+
+def gap_center_ai(game):
+    return game.a_bird_y > game.nearest_pipe(AI_BIRD_X)[1] + PIPE_GAP / 2.0 + 10.0
+
+
+def play(seed):
+    game = new_game(seed)
+    game.started = True
+    while game.end_time is None:
+        if game.tick % 17 == 0:
+            game.player_jump()
+        game.step(gap_center_ai)
+        game.apply_collisions()
+    return game
+
+
+def test_saved_replay_resimulates_bit_exactly(tmp_path):
+    game = play(5)
+    path = save_replay(game, {"difficulty": "normal"}, replay_dir=str(tmp_path), player="tester")
+    rec = load_replay(path)
+
+    replayed = simulate(rec)
+    assert match_result(replayed) == rec["result"] == match_result(game)
+    assert first_divergence(rec, replayed) is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_first_divergence_finds_a_changed_decision(tmp_path):
+    game = play(6)
+    rec = load_replay(save_replay(game, {}, replay_dir=str(tmp_path)))
+    first = game.ai_jumps[0]
+
+    def late(g):
+        return False if g.tick == first else recorded_ai(rec)(g)
+
+    assert first_divergence(rec, simulate(rec, ai_jump=late)) == first
@@ -0,0 +1,31 @@
+import numpy as np
+
+from stream_train import batch_stream, fit_scaler_streaming, hash_split
+
+
+def test_hash_split_depends_only_on_row_and_seed():
+    whole = hash_split(0, 100_000)
+    chunked = np.concatenate([hash_split(a, min(a + 7919, 100_000)) for a in range(0, 100_000, 7919)])
+    np.testing.assert_array_equal(whole, chunked)
+    # appending rows never moves old ones
+    np.testing.assert_array_equal(hash_split(0, 150_000)[:100_000], whole)
+    assert abs(whole.mean() - 0.15) < 0.01
+    assert (hash_split(0, 100_000, seed=7) != whole).any()
+
+
+def test_val_stream_holds_exactly_the_val_rows():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(5000, 3)).astype(np.float32)
+    X[:, 0] = np.arange(5000)
+    y = (rng.random(5000) < 0.2).astype(np.uint8)
+    scaler, n_train, n_val = fit_scaler_streaming(X, chunk_rows=1024)
+    assert n_train + n_val == 5000
+
+    def rows_of(subset):
+        batches = batch_stream(X, y, scaler, subset=subset, batch_size=64, chunk_rows=1024, epochs=1)
+        xs = np.concatenate([xb for xb, _ in batches])
+        return np.sort(np.rint(xs[:, 0] * scaler.scale_[0] + scaler.mean_[0]).astype(int))
+
+    val = rows_of("val")
+    np.testing.assert_array_equal(val, np.flatnonzero(hash_split(0, 5000)))
+    assert len(np.intersect1d(val, rows_of("train"))) == 0
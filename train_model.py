@@ -1,94 +1,317 @@
 # train_tf.py
+import argparse
 import pandas as pd
 import numpy as np
-import os
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import joblib
 import tensorflow as tf
 from tensorflow.keras import layers, models, callbacks
+from numpy_mlp import export_bundle, BUNDLE_FILE
+from columnar_dataset import FEATURES, LABEL, derive_features, open_dataset
+from ingest import ingest
+from stream_train import CHUNK_ROWS, batch_stream, fit_scaler_streaming, hash_split, steps_for
+from balanced_sampler import (BalancedBatchSampler, balanced_batches, build_class_index, calibrated_log_loss,
+                              epochs_to_reach, prior_shift)
+
+HIDDEN = (128, 64, 32)
+DROPOUT = (0.25, 0.2, 0.0)  # after each hidden layer
+LEARNING_RATE = 1e-3
+
+
+def default_data_path(data_dir="."):
+    """Merge every recording in data_dir (see ingest.py) and return the merged dataset.
+
+    A training_data.fcol lying around is only used when passed as --data, so a
+    stale conversion never hides newer recordings.
+    """
+    return ingest(data_dir)
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    # if old CSV (no extra columns), compute distance and gap_center
+    derive_features(df)
+    X = df[FEATURES].astype(float).values
+    y = df[LABEL].astype(int).values
+    return X, y
+
+
+def load_columnar(path):
+    """Memory-map an .fcol dataset; X and y are views into the file (no copy)."""
+    ds = open_dataset(path)
+    missing = [c for c in FEATURES if c not in ds.features]
+    if missing:
+        raise SystemExit(f"{path} is missing feature columns: {missing}")
+    if ds.features != FEATURES:
+        # reorder columns (this one does copy)
+        X = np.stack([ds.column(c) for c in FEATURES], axis=1)
+    else:
+        X = ds.X
+    return X, ds.y
+
+
+def load_training_data(path):
+    print("Loading", path)
+    if path.endswith(".fcol"):
+        return load_columnar(path)
+    return load_csv(path)
 
-# load best available CSV
-if os.path.exists("training_data_improved.csv"):
-    path = "training_data_improved.csv"
-elif os.path.exists("training_data.csv"):
-    path = "training_data.csv"
-else:
-    raise SystemExit("No training CSV found. Run record_game_improved.py first.")
-
-print("Loading", path)
-df = pd.read_csv(path)
-
-# if old CSV (no extra columns), compute distance and gap_center
-if "distance_to_pipe" not in df.columns:
-    df["distance_to_pipe"] = df["pipe_x"] - 50
-if "gap_center" not in df.columns:
-    df["gap_center"] = (df["top_pipe_y"] + df["bottom_pipe_y"]) / 2.0
-if "gap_size" not in df.columns:
-    df["gap_size"] = df["bottom_pipe_y"] - df["top_pipe_y"]
-
-# choose features
-FEATURES = ["bird_y", "top_pipe_y", "bottom_pipe_y", "pipe_x", "distance_to_pipe", "gap_center", "gap_size"]
-# some old CSVs use slightly different names; try alternatives
-for col in FEATURES:
-    if col not in df.columns:
-        # try legacy names
-        if col == "top_pipe_y" and "pipe_top" in df.columns:
-            df["top_pipe_y"] = df["pipe_top"]
-        if col == "bottom_pipe_y" and "pipe_bottom" in df.columns:
-            df["bottom_pipe_y"] = df["pipe_bottom"]
-        if col == "pipe_x" and "pipe_x" not in df.columns:
-            # maybe older files used 'pipe_x' already; otherwise error later
-            pass
-
-# final check
-X = df[FEATURES].astype(float).values
-y = df["action"].astype(int).values
-
-print("Dataset shape:", X.shape, "Labels:", np.bincount(y))
-
-# split
-X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.15, random_state=42, stratify=y)
-
-# scaler
-scaler = StandardScaler()
-X_train = scaler.fit_transform(X_train)
-X_val = scaler.transform(X_val)
-
-joblib.dump(scaler, "scaler.joblib")
-print("Scaler saved to scaler.joblib")
 
 # build model
-def build_model(input_dim):
+def default_dropout(n_layers):
+    """The DROPOUT pattern fitted to n_layers hidden layers: its rates (the last repeated) on all but the last."""
+    rates = [r for r in DROPOUT if r] or [0.0]
+    return tuple(rates[min(i, len(rates) - 1)] for i in range(n_layers - 1)) + (0.0,)
+
+
+def build_model(input_dim, hidden=HIDDEN, dropout=None, learning_rate=LEARNING_RATE):
+    """ReLU MLP with a sigmoid jump output.
+
+    dropout is one rate for every hidden layer but the last, one rate per
+    layer, or None for default_dropout(len(hidden)).
+    """
+    if dropout is None:
+        dropout = default_dropout(len(hidden))
+    elif isinstance(dropout, (int, float)):
+        dropout = [dropout] * (len(hidden) - 1) + [0.0]
     model = models.Sequential()
     model.add(layers.Input(shape=(input_dim,)))
-    model.add(layers.Dense(128, activation="relu"))
-    model.add(layers.Dropout(0.25))
-    model.add(layers.Dense(64, activation="relu"))
-    model.add(layers.Dropout(0.2))
-    model.add(layers.Dense(32, activation="relu"))
+    for units, rate in zip(hidden, dropout):
+        model.add(layers.Dense(units, activation="relu"))
+        if rate:
+            model.add(layers.Dropout(rate))
     model.add(layers.Dense(1, activation="sigmoid"))  # output probability of jump
-    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=1e-3),
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
                   loss="binary_crossentropy",
                   metrics=["accuracy"])
     return model
 
-model = build_model(X_train.shape[1])
-model.summary()
-
-# callbacks
-es = callbacks.EarlyStopping(monitor="val_loss", patience=7, restore_best_weights=True)
-mc = callbacks.ModelCheckpoint("tf_model.h5", monitor="val_loss", save_best_only=True)
-
-history = model.fit(
-    X_train, y_train,
-    validation_data=(X_val, y_val),
-    epochs=80,
-    batch_size=64,
-    callbacks=[es, mc],
-    verbose=2
-)
-
-# save final model (best already saved by checkpoint)
-model.save("tf_model.h5")
-print("Model saved to tf_model.h5")
+
+class CalibratedValLoss(callbacks.Callback):
+    """Logs val_calibrated_loss: validation BCE with the output logit moved by `shift`.
+
+    A model trained on balanced batches over-predicts jumps by exactly the
+    prior shift; judged after the correction, balanced and natural runs are
+    compared on the natural class mix.
+    """
+
+    def __init__(self, val_batches, shift=0.0):
+        super().__init__()
+        self.val_batches = val_batches
+        self.shift = shift
+        self.history = []
+
+    def on_epoch_end(self, epoch, logs=None):
+        probs, labels = [], []
+        for xb, yb in self.val_batches():
+            probs.append(self.model.predict_on_batch(xb))
+            labels.append(yb)
+        loss = calibrated_log_loss(np.concatenate(probs), np.concatenate(labels), self.shift)
+        self.history.append(loss)
+        if logs is not None:
+            logs["val_calibrated_loss"] = loss
+        print(f"  val_calibrated_loss: {loss:.4f}")
+
+
+def shift_output_bias(model, shift):
+    """Add shift to the logit of the sigmoid output (its Dense bias)."""
+    kernel, bias = model.layers[-1].get_weights()
+    model.layers[-1].set_weights([kernel, bias + np.float32(shift)])
+
+
+def fit_model(input_dim, train_data, steps, validation_data, validation_steps, epochs,
+              batch_size=None, val_batches=None, shift=None, model_params=None, checkpoint="tf_model.h5", verbose=2):
+    """Build and fit a model on train_data ((X, y) arrays or a dataset of batches).
+
+    Returns (model, per-epoch validation losses). With val_batches, those
+    are the calibrated losses: shift is the prior shift of the balanced
+    sampler (0 for the natural mix); it is monitored for early stopping and
+    folded into the output bias after training. model_params go to
+    build_model; checkpoint=None skips the best-epoch file.
+    """
+    model = build_model(input_dim, **(model_params or {}))
+    if verbose:
+        model.summary()
+
+    # callbacks (the tracker first: the others read the loss it logs)
+    tracker = [] if val_batches is None else [CalibratedValLoss(val_batches, shift or 0.0)]
+    monitor = "val_loss" if shift is None else "val_calibrated_loss"
+    es = callbacks.EarlyStopping(monitor=monitor, patience=7, mode="min", restore_best_weights=True)
+    mc = [] if checkpoint is None else [
+        callbacks.ModelCheckpoint(checkpoint, monitor=monitor, mode="min", save_best_only=True)]
+
+    fit = model.fit(
+        *train_data,
+        steps_per_epoch=steps,
+        validation_data=validation_data,
+        validation_steps=validation_steps,
+        epochs=epochs,
+        batch_size=batch_size,
+        callbacks=tracker + [es] + mc,
+        verbose=verbose
+    )
+    if shift:
+        shift_output_bias(model, shift)
+    return model, (tracker[0].history if tracker else fit.history["val_loss"])
+
+
+def report_balance(natural, balanced, tolerance=0.01):
+    """Print the epochs each run needed to reach the natural run's best validation loss (and within tolerance of it)."""
+    best = min(natural)
+    print(f"Best validation loss on the natural mix: {best:.4f}; balanced best: {min(balanced):.4f}")
+    for label, target in (("best", best), (f"within {100 * tolerance:g}%", best * (1 + tolerance))):
+        n, b = epochs_to_reach(natural, target), epochs_to_reach(balanced, target)
+        print(f"  epochs to {label} ({target:.4f}): natural {n}, balanced "
+              + (str(b) if b is not None else f"not reached in {len(balanced)}"))
+
+
+def split_and_scale(X, y, val_fraction=0.15, seed=42):
+    """Stratified train/validation split, standardized with a scaler fit on the training rows.
+
+    Returns (X_train, X_val, y_train, y_val, scaler).
+    """
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=val_fraction, random_state=seed, stratify=y)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_val = scaler.transform(X_val)
+    return X_train, X_val, y_train, y_val, scaler
+
+
+def train(X, y, epochs=80, batch_size=64, balance_alpha=None, compare=False, model_params=None):
+    print("Dataset shape:", X.shape, "Labels:", np.bincount(y))
+
+    # split + scaler
+    X_train, X_val, y_train, y_val, scaler = split_and_scale(X, y)
+
+    joblib.dump(scaler, "scaler.joblib")
+    print("Scaler saved to scaler.joblib")
+
+    val_batches = lambda: ((X_val[i:i + 8192], y_val[i:i + 8192]) for i in range(0, len(X_val), 8192))
+    natural = None
+    if balance_alpha is None or compare:
+        model, natural = fit_model(X_train.shape[1], (X_train, y_train), None, (X_val, y_val), None, epochs,
+                                   batch_size=batch_size, val_batches=val_batches if compare else None,
+                                   model_params=model_params)
+    if balance_alpha is not None:
+        # balanced batches index into X_train; nothing is copied or oversampled in memory
+        index = build_class_index(y_train)
+        sampler = BalancedBatchSampler(index, batch_size, balance_alpha)
+        shift = prior_shift(index.counts, sampler.shares)
+        print(f"Balanced sampling (alpha {balance_alpha}), output logit shift {shift:+.3f}:")
+        print(sampler.describe())
+        signature = (tf.TensorSpec(shape=(None, X_train.shape[1]), dtype=tf.float32),
+                     tf.TensorSpec(shape=(None,), dtype=tf.float32))
+        ds = tf.data.Dataset.from_generator(lambda: balanced_batches(X_train, y_train, sampler),
+                                            output_signature=signature)
+        model, balanced = fit_model(X_train.shape[1], (ds,), sampler.steps_per_epoch, (X_val, y_val), None, epochs,
+                                    val_batches=val_batches, shift=shift, model_params=model_params)
+        if natural is not None:
+            report_balance(natural, balanced)
+
+    # save final model (best already saved by checkpoint)
+    model.save("tf_model.h5")
+    print("Model saved to tf_model.h5")
+
+    # export weights + scaler for TensorFlow-free inference in the game
+    export_bundle(model, scaler, BUNDLE_FILE)
+    return model, scaler
+
+
+def train_streaming(path, epochs=80, batch_size=64, chunk_rows=CHUNK_ROWS, val_fraction=0.15, seed=42,
+                    balance_alpha=None, compare=False, model_params=None):
+    """Out-of-core training on a columnar dataset: memory use stays flat regardless of size."""
+    X, y = load_columnar(path)
+    print("Dataset shape:", X.shape, "(streaming)")
+
+    # one pass over the data: deterministic hash split + incremental scaler fit
+    scaler, n_train, n_val = fit_scaler_streaming(X, val_fraction, seed, chunk_rows)
+    print(f"Train rows: {n_train}, validation rows: {n_val}")
+    joblib.dump(scaler, "scaler.joblib")
+    print("Scaler saved to scaler.joblib")
+
+    signature = (tf.TensorSpec(shape=(None, len(FEATURES)), dtype=tf.float32),
+                 tf.TensorSpec(shape=(None,), dtype=tf.float32))
+
+    def make_ds(subset, shuffle):
+        gen = lambda: batch_stream(X, y, scaler, subset, batch_size, val_fraction, seed, chunk_rows, shuffle)
+        return tf.data.Dataset.from_generator(gen, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+    val_steps = steps_for(n_val, batch_size)
+    val_batches = lambda: batch_stream(X, y, scaler, "val", 8192, val_fraction, seed, chunk_rows, False, epochs=1)
+    natural = None
+    if balance_alpha is None or compare:
+        model, natural = fit_model(len(FEATURES), (make_ds("train", True),), steps_for(n_train, batch_size),
+                                   make_ds("val", False), val_steps, epochs,
+                                   val_batches=val_batches if compare else None, model_params=model_params)
+    if balance_alpha is not None:
+        # index of the training rows by class (4-8 bytes per row); batches are gathered from the memory map
+        index = build_class_index(y, lambda start, stop: ~hash_split(start, stop, val_fraction, seed), chunk_rows)
+        sampler = BalancedBatchSampler(index, batch_size, balance_alpha, seed)
+        shift = prior_shift(index.counts, sampler.shares)
+        print(f"Balanced sampling (alpha {balance_alpha}), output logit shift {shift:+.3f}:")
+        print(sampler.describe())
+        ds = tf.data.Dataset.from_generator(lambda: balanced_batches(X, y, sampler, scaler),
+                                            output_signature=signature).prefetch(tf.data.AUTOTUNE)
+        model, balanced = fit_model(len(FEATURES), (ds,), sampler.steps_per_epoch, make_ds("val", False), val_steps,
+                                    epochs, val_batches=val_batches, shift=shift, model_params=model_params)
+        if natural is not None:
+            report_balance(natural, balanced)
+
+    model.save("tf_model.h5")
+    print("Model saved to tf_model.h5")
+    export_bundle(model, scaler, BUNDLE_FILE)
+    return model, scaler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the Flappy AI MLP on recorded gameplay.")
+    parser.add_argument("--data", default=None,
+                        help="training data (.csv or columnar .fcol); default: every recording in --data-dir, merged")
+    parser.add_argument("--data-dir", default=".", help="directory whose recordings are merged (see ingest.py)")
+    parser.add_argument("--epochs", type=int, default=80)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--hidden", default=",".join(map(str, HIDDEN)), help="hidden layer sizes")
+    parser.add_argument("--dropout", default=None,
+                        help="dropout after each hidden layer, or one rate for all but the last "
+                             f"(default: {','.join(map(str, DROPOUT))}, fitted to the --hidden depth)")
+    parser.add_argument("--lr", type=float, default=LEARNING_RATE, help="Adam learning rate")
+    parser.add_argument("--stream", action="store_true",
+                        help="out-of-core training: chunked scaler fit, hash split, prefetched batches (needs .fcol data)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows read per chunk in --stream mode")
+    parser.add_argument("--balance", action="store_true",
+                        help="class-balanced minibatches from a per-class row index (see balanced_sampler.py)")
+    parser.add_argument("--balance-alpha", type=float, default=0.0,
+                        help="class share per batch ~ count ** alpha: 0 = equal classes, 1 = natural mix")
+    parser.add_argument("--compare-balance", action="store_true",
+                        help="train on the natural mix, then balanced; report epochs to the same validation loss")
+    args = parser.parse_args(argv)
+    if not 0.0 <= args.balance_alpha <= 1.0:
+        parser.error("--balance-alpha must be between 0 and 1")
+    balance_alpha = args.balance_alpha if args.balance or args.compare_balance else None
+    hidden = tuple(int(h) for h in args.hidden.split(",") if h)
+    if not hidden:
+        parser.error("--hidden needs at least one layer")
+    dropout = None
+    if args.dropout is not None:
+        dropout = [float(d) for d in args.dropout.split(",") if d]
+        if len(dropout) not in (1, len(hidden)):
+            parser.error("--dropout needs one rate or one per hidden layer")
+        dropout = dropout[0] if len(dropout) == 1 else tuple(dropout)
+    model_params = {"hidden": hidden, "dropout": dropout,
+                    "learning_rate": args.lr}
+
+    path = args.data or default_data_path(args.data_dir)
+    if args.stream:
+        if not path.endswith(".fcol"):
+            raise SystemExit("--stream needs a columnar .fcol dataset (see columnar_dataset.py / ingest.py)")
+        train_streaming(path, epochs=args.epochs, batch_size=args.batch_size, chunk_rows=args.chunk_rows,
+                        balance_alpha=balance_alpha, compare=args.compare_balance, model_params=model_params)
+        return
+    X, y = load_training_data(path)
+    train(X, y, epochs=args.epochs, batch_size=args.batch_size, balance_alpha=balance_alpha,
+          compare=args.compare_balance, model_params=model_params)
+
+
+if __name__ == "__main__":
+    main()